@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Paquet AIOps : modèles de maintenance prédictive et outils associés
+pour l'écosystème cloud automatisé.
+"""
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistance non bloquante, atomique et versionnée des artefacts de modèles.
+
+Un thread d'arrière-plan sérialise les objets avec joblib directement dans
+des fichiers temporaires, les synchronise sur le disque et les renomme
+atomiquement : un lecteur ne voit jamais un fichier partiellement écrit, et
+ni la sérialisation ni une copie en mémoire du modèle ne pèsent sur le
+thread d'entraînement ou de requête. Les modèles ne modifient pas en place
+les objets qu'ils sauvegardent (l'entraînement ajuste une copie de
+l'estimateur, voir BaseAIOpsModel._fit_estimator), ce qui permet de les
+sérialiser après le retour de save(). Chaque répertoire tient un
+manifeste (manifest.json) des artefacts publiés, avec leur somme SHA-256,
+leur taille et un numéro de version ; les artefacts sauvegardés ensemble
+partagent une même génération. Les lecteurs interrogent le manifeste,
+relu seulement lorsqu'il a changé, au lieu d'examiner chaque fichier.
+
+Un répertoire (graphe TensorFlow exporté) ne peut pas remplacer un
+répertoire existant en un seul renommage : il est publié sous un nom
+versionné par sa somme de contrôle ({nom}.{sha256[:16]}), vers lequel
+pointe le champ 'location' de son entrée du manifeste (voir resolve()).
+La version précédente est conservée pour les lecteurs en cours de
+chargement ; les plus anciennes sont supprimées.
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou limité au processus
+    fcntl = None
+
+# Écriture en arrière-plan (sinon dans le thread appelant) et nombre de threads d'écriture
+ARTIFACT_ASYNC = os.environ.get('ARTIFACT_ASYNC', 'true').lower() in ('1', 'true', 'yes')
+ARTIFACT_WRITERS = int(os.environ.get('ARTIFACT_WRITERS', '1'))
+
+MANIFEST_NAME = 'manifest.json'
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def _checksum(path):
+    """Somme SHA-256 d'un fichier, ou d'un répertoire (chemins relatifs et contenus, dans l'ordre)."""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.relpath(os.path.join(root, name), path)
+            for root, _, names in os.walk(path) for name in names
+        )
+        paths = [(name, os.path.join(path, name)) for name in files]
+    else:
+        paths = [(None, path)]
+
+    size = 0
+    for name, file_path in paths:
+        if name is not None:
+            digest.update(name.encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+                size += len(block)
+    return digest.hexdigest(), size
+
+
+def _fsync_directory(directory):
+    """Rend durables les renommages effectués dans un répertoire."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _publish_directory(tmp_path, target):
+    """Renomme un répertoire temporaire vers son nom versionné (déjà publié si le contenu est identique)."""
+    if os.path.isdir(target):
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    else:
+        os.rename(tmp_path, target)
+
+
+def _prune_directories(directory, name, keep):
+    """Supprime les versions d'un répertoire publié qui ne sont pas dans keep."""
+    pattern = re.compile(re.escape(name) + r'\.[0-9a-f]{16}$')
+    for entry in os.listdir(directory):
+        if pattern.match(entry) and entry not in keep:
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+class ArtifactStore:
+    """Écriture en arrière-plan des artefacts et manifestes versionnés par répertoire."""
+
+    def __init__(self, asynchronous=True, max_workers=1):
+        """
+        Initialise le store.
+
+        Args:
+            asynchronous: Écrire dans un thread d'arrière-plan (sinon dans le thread appelant)
+            max_workers: Nombre de threads d'écriture
+        """
+        self.asynchronous = asynchronous
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._manifest_lock = threading.Lock()
+        self._manifests = {}
+
+        self.saved = 0
+        self.failed = 0
+
+    def save(self, artifacts=None, writers=None, callback=None):
+        """
+        Publie un ensemble d'artefacts.
+
+        La sérialisation joblib, l'écriture sur le disque, les renommages
+        atomiques, la mise à jour des manifestes et l'invalidation du registre
+        ont lieu en arrière-plan : les objets ne doivent plus être modifiés en
+        place par l'appelant.
+
+        Args:
+            artifacts: Objets à sérialiser avec joblib, par chemin de destination
+            writers: Fonctions d'écriture par chemin de destination (fichier ou
+                répertoire), appelées en arrière-plan avec un chemin temporaire
+            callback: Fonction appelée en arrière-plan une fois les artefacts publiés
+
+        Returns:
+            concurrent.futures.Future: Résolu avec le dict des entrées publiées du manifeste
+        """
+        artifacts = dict(artifacts or {})
+        writers = dict(writers or {})
+        directories = {os.path.dirname(os.path.abspath(path)) for path in list(artifacts) + list(writers)}
+
+        def job():
+            return self._write(artifacts, writers, callback)
+
+        if not self.asynchronous:
+            future = Future()
+            try:
+                future.set_result(job())
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            return future
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='aiops-artifacts')
+            future = self._executor.submit(job)
+            for directory in directories:
+                self._pending.setdefault(directory, set()).add(future)
+
+        def done(finished):
+            with self._lock:
+                for directory in directories:
+                    pending = self._pending.get(directory)
+                    if pending is not None:
+                        pending.discard(finished)
+                        if not pending:
+                            del self._pending[directory]
+            if finished.exception() is not None:
+                print(f"Erreur lors de la sauvegarde des artefacts dans {', '.join(sorted(directories))}: "
+                      f"{finished.exception()}")
+
+        future.add_done_callback(done)
+        return future
+
+    def _write(self, artifacts, writers, callback):
+        """Sérialise, écrit, renomme et publie un ensemble d'artefacts (thread d'écriture)."""
+        import joblib
+        from .registry import get_model_registry
+
+        tmp_paths = {}
+        entries = {}
+        try:
+            for path, obj in artifacts.items():
+                tmp_path = self._tmp_path(path)
+                tmp_paths[path] = tmp_path
+                with open(tmp_path, 'wb') as f:
+                    joblib.dump(obj, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                sha256, size = _checksum(tmp_path)
+                entries[path] = {"sha256": sha256, "size": size}
+
+            for path, writer in writers.items():
+                tmp_path = self._tmp_path(path)
+                tmp_paths[path] = tmp_path
+                writer(tmp_path)
+                sha256, size = _checksum(tmp_path)
+                entries[path] = {"sha256": sha256, "size": size}
+                if os.path.isdir(tmp_path):
+                    entries[path]["location"] = f"{os.path.basename(path)}.{sha256[:16]}"
+
+            # Tous les artefacts sont écrits avant le premier renommage
+            for path, tmp_path in tmp_paths.items():
+                location = entries[path].get("location")
+                if location is None:
+                    os.replace(tmp_path, path)
+                else:
+                    _publish_directory(tmp_path, os.path.join(os.path.dirname(path), location))
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            for tmp_path in tmp_paths.values():
+                if os.path.isdir(tmp_path):
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+                elif os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+
+        by_directory = {}
+        for path, entry in entries.items():
+            by_directory.setdefault(os.path.dirname(os.path.abspath(path)), {})[os.path.basename(path)] = entry
+        published = {}
+        for directory, directory_entries in by_directory.items():
+            _fsync_directory(directory)
+            published.update(
+                (os.path.join(directory, name), entry)
+                for name, entry in self._publish(directory, directory_entries).items()
+            )
+
+        registry = get_model_registry()
+        for path in entries:
+            registry.invalidate(path)
+
+        with self._lock:
+            self.saved += 1
+        if callback is not None:
+            callback()
+        return published
+
+    @staticmethod
+    def _tmp_path(path):
+        """Chemin temporaire voisin de path, qui conserve son extension (ex. '.h5')."""
+        root, ext = os.path.splitext(path)
+        return f"{root}.tmp{os.getpid()}-{threading.get_ident()}{ext}"
+
+    def _publish(self, directory, entries):
+        """Ajoute des artefacts au manifeste d'un répertoire, sous verrou inter-processus."""
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+
+        with self._manifest_lock, open(os.path.join(directory, '.manifest.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+            manifest = self._read(manifest_path) or {"generation": 0, "artifacts": {}}
+            generation = manifest["generation"] + 1
+            now = time.time()
+
+            published = {}
+            keep = {}
+            for name, entry in entries.items():
+                previous = manifest["artifacts"].get(name, {})
+                published[name] = manifest["artifacts"][name] = dict(
+                    entry, version=previous.get("version", 0) + 1, generation=generation, written_at=now
+                )
+                if "location" in entry:
+                    keep[name] = {entry["location"], previous.get("location")}
+            manifest["generation"] = generation
+
+            tmp_path = f"{manifest_path}.tmp{os.getpid()}"
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, manifest_path)
+
+            # Le manifeste publié est immédiatement visible des lecteurs du processus
+            st = os.stat(manifest_path)
+            with self._lock:
+                self._manifests[directory] = (time.monotonic(), (st.st_ino, st.st_mtime_ns), manifest)
+
+            # Versions des répertoires antérieures à la précédente
+            for name, locations in keep.items():
+                _prune_directories(directory, name, locations)
+        return published
+
+    @staticmethod
+    def _read(manifest_path):
+        """Lit un manifeste, ou None s'il n'existe pas."""
+        try:
+            with open(manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def manifest(self, directory, max_age=0.0):
+        """
+        Retourne le manifeste d'un répertoire.
+
+        Le fichier n'est examiné qu'au plus une fois par `max_age` secondes, et
+        relu seulement s'il a été remplacé depuis la dernière lecture.
+
+        Args:
+            directory: Répertoire des artefacts
+            max_age: Ancienneté maximale (secondes) du manifeste en cache
+
+        Returns:
+            dict: Manifeste ({"generation", "artifacts": {nom: entrée}}), ou None
+        """
+        directory = os.path.abspath(directory)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._manifests.get(directory)
+        if cached is not None and now - cached[0] < max_age:
+            return cached[2]
+
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        try:
+            st = os.stat(manifest_path)
+        except FileNotFoundError:
+            manifest, signature = None, None
+        else:
+            signature = (st.st_ino, st.st_mtime_ns)
+            if cached is not None and cached[1] == signature:
+                manifest = cached[2]
+            else:
+                manifest = self._read(manifest_path)
+
+        with self._lock:
+            self._manifests[directory] = (now, signature, manifest)
+        return manifest
+
+    def entry(self, path, max_age=0.0):
+        """
+        Retourne l'entrée du manifeste d'un artefact.
+
+        Args:
+            path: Chemin de l'artefact
+            max_age: Ancienneté maximale (secondes) du manifeste en cache
+
+        Returns:
+            dict: {"sha256", "size", "version", "generation", "written_at"}, ou None
+        """
+        manifest = self.manifest(os.path.dirname(os.path.abspath(path)), max_age)
+        if manifest is None:
+            return None
+        return manifest["artifacts"].get(os.path.basename(path))
+
+    def resolve(self, path, max_age=0.0):
+        """
+        Retourne le chemin publié d'un artefact.
+
+        Args:
+            path: Chemin de l'artefact
+            max_age: Ancienneté maximale (secondes) du manifeste en cache
+
+        Returns:
+            str: Répertoire versionné de l'entrée du manifeste, sinon path
+        """
+        entry = self.entry(path, max_age)
+        if entry is None or "location" not in entry:
+            return path
+        return os.path.join(os.path.dirname(path), entry["location"])
+
+    def verify(self, path):
+        """
+        Vérifie qu'un artefact correspond à la somme de contrôle de son manifeste.
+
+        Args:
+            path: Chemin de l'artefact
+
+        Returns:
+            bool: True si l'artefact est intact (False s'il est absent du manifeste)
+        """
+        entry = self.entry(path)
+        if entry is None:
+            return False
+        path = self.resolve(path)
+        return os.path.exists(path) and _checksum(path)[0] == entry["sha256"]
+
+    def wait(self, directory=None, timeout=None):
+        """
+        Attend la fin des écritures en cours du processus.
+
+        Args:
+            directory: Répertoire concerné (par défaut, tous)
+            timeout: Délai maximal d'attente par écriture (secondes)
+        """
+        with self._lock:
+            if directory is None:
+                futures = set().union(*self._pending.values()) if self._pending else set()
+            else:
+                futures = set(self._pending.get(os.path.abspath(directory), ()))
+        for future in futures:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass  # L'erreur est signalée au propriétaire de l'écriture
+
+    def stats(self):
+        """Retourne les statistiques du store."""
+        with self._lock:
+            return {
+                "pending": len(set().union(*self._pending.values())) if self._pending else 0,
+                "saved": self.saved,
+                "failed": self.failed
+            }
+
+
+def get_artifact_store():
+    """Retourne le store partagé du processus, configuré par l'environnement."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ArtifactStore(asynchronous=ARTIFACT_ASYNC, max_workers=ARTIFACT_WRITERS)
+        return _STORE
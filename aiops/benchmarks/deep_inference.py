@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de latence de l'inférence de l'autoencoder LSTM sur CPU.
+
+Un DeepLearningAnomalyModel est entraîné sur des métriques synthétiques,
+puis l'erreur de reconstruction d'un batch de séquences est calculée par
+plusieurs chemins : model.predict() de Keras, predict_on_batch(), le graphe
+exporté, et le graphe exporté compilé avec XLA. Le benchmark rapporte les
+latences médiane et p95 par taille de batch et vérifie que tous les chemins
+produisent les mêmes erreurs.
+
+Usage:
+    python -m aiops.benchmarks.deep_inference [--batch-sizes 1 32 256 4096] [--repeat 30] [--json]
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+from .throughput import generate_metrics
+
+
+def _latencies(function, batch, repeat, warmup=3):
+    """Mesure les latences (ms) d'une fonction sur un batch, après échauffement."""
+    for _ in range(warmup):
+        function(batch)
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(batch)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return latencies
+
+
+def run_benchmark(batch_sizes, repeat=30, rows=5000, sequence_length=10, epochs=1):
+    """
+    Compare les chemins d'inférence de l'autoencoder.
+
+    Args:
+        batch_sizes: Tailles de batch (nombre de séquences) mesurées
+        repeat: Nombre de mesures par chemin et par taille
+        rows: Nombre de lignes synthétiques d'entraînement
+        sequence_length: Longueur des séquences
+        epochs: Époques d'entraînement
+
+    Returns:
+        dict: {taille: {chemin: {"p50_ms", "p95_ms", "max_abs_diff"}}}
+    """
+    import aiops.models as models
+
+    data = generate_metrics(rows)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model = models.DeepLearningAnomalyModel(sequence_length=sequence_length, model_dir=tmp_dir)
+        model.train(data, epochs=epochs)
+        model.wait_saved()
+        keras_model = model._keras_model()
+        graph = models._InferenceGraph(model._published_inference_path(), xla=False)
+        graph_xla = models._InferenceGraph(model._published_inference_path(), xla=True)
+
+    def keras_errors(function):
+        def errors(batch):
+            return np.mean(np.square(batch - function(batch)), axis=(1, 2))
+        return errors
+
+    paths = {
+        "keras_predict": keras_errors(lambda batch: keras_model.predict(batch, verbose=0)),
+        "keras_predict_on_batch": keras_errors(keras_model.predict_on_batch),
+        "graph": graph,
+        "graph_xla": graph_xla
+    }
+
+    sequences = np.ascontiguousarray(model.preprocess_data(data), dtype=np.float32)
+    results = {}
+    for batch_size in batch_sizes:
+        batch = sequences[np.arange(batch_size) % len(sequences)]
+        reference = paths["keras_predict_on_batch"](batch)
+        results[batch_size] = {}
+        for name, function in paths.items():
+            latencies = _latencies(function, batch, repeat)
+            results[batch_size][name] = {
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p95_ms": float(np.percentile(latencies, 95)),
+                "max_abs_diff": float(np.abs(np.asarray(function(batch)) - reference).max())
+            }
+    return results
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Benchmark de latence de l'inférence de l'autoencoder")
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 32, 256, 4096],
+                        help='Nombres de séquences par batch')
+    parser.add_argument('--repeat', type=int, default=30, help='Mesures par chemin et par taille')
+    parser.add_argument('--rows', type=int, default=5000, help="Lignes synthétiques d'entraînement")
+    parser.add_argument('--sequence-length', type=int, default=10, help='Longueur des séquences')
+    parser.add_argument('--json', action='store_true', help='Afficher les résultats au format JSON')
+    args = parser.parse_args()
+
+    # Aucun journal n'est écrit dans les répertoires de production
+    os.environ.setdefault("PREDICTION_LOG_FORMAT", "off")
+    os.environ.setdefault("DATA_PATH", tempfile.mkdtemp(prefix="aiops-deep-inference-"))
+
+    results = run_benchmark(args.batch_sizes, args.repeat, args.rows, args.sequence_length)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for batch_size, paths in results.items():
+            baseline = paths["keras_predict"]["p50_ms"]
+            for name, measures in paths.items():
+                print(f"batch={batch_size:<6d} {name:24s} p50={measures['p50_ms']:8.2f}ms "
+                      f"p95={measures['p95_ms']:8.2f}ms x{baseline / measures['p50_ms']:.1f} "
+                      f"écart={measures['max_abs_diff']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Validation du mode float32 des modèles AIOps.
+
+Chaque modèle est exécuté en float64 puis en float32 sur les mêmes données
+synthétiques ; le script compare les scores produits et la mémoire des
+caractéristiques prétraitées, et échoue si l'écart dépasse la tolérance.
+Les modèles scikit-learn (déterministes) sont entraînés dans chaque mode ;
+l'autoencoder, dont l'entraînement n'est pas reproductible d'un run à
+l'autre, est entraîné une fois et seule son inférence change de mode. Sa
+sauvegarde est attendue avant les mesures : la comparaison float64/float32
+porte sur le modèle Keras, et le graphe d'inférence exporté (float32
+uniquement), chargé par la sauvegarde, est comparé à part au modèle Keras.
+
+Usage:
+    python -m aiops.benchmarks.precision [--models AnomalyDetectionModel ...] [--rows 5000] [--json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+import numpy as np
+
+from .throughput import generate_metrics
+
+# Écarts tolérés entre float64 et float32, par modèle
+TOLERANCES = {
+    "AnomalyDetectionModel": {"max_abs_diff": 1e-3, "min_agreement": 0.995},
+    "ResourcePredictionModel": {"max_rel_diff": 1e-3},
+    "ClusteringModel": {"min_agreement": 0.995},
+    "DeepLearningAnomalyModel": {
+        "max_rel_diff": 1e-3, "min_agreement": 0.995,
+        "max_graph_rel_diff": 1e-3, "min_graph_agreement": 0.995
+    }
+}
+
+
+def _outputs(model, data):
+    """Retourne les scores et décisions d'un modèle entraîné, et la taille de ses entrées prétraitées."""
+    result = model.predict(data, compact=True)
+    preprocessed = model.preprocess_data(data)
+    X = preprocessed[0] if isinstance(preprocessed, tuple) else preprocessed
+    nbytes = np.asarray(X).nbytes
+
+    if "scores" in result:
+        return np.asarray(result["scores"]), np.asarray(result["anomalies"]), nbytes
+    if "reconstruction_errors" in result:
+        return np.asarray(result["reconstruction_errors"]), np.asarray(result["anomalies"]), nbytes
+    if "labels" in result:
+        return None, np.asarray(result["labels"]), nbytes
+    return np.asarray(result["predictions"]), None, nbytes
+
+
+def compare_model(model_name, data, epochs=1):
+    """
+    Compare les sorties d'un modèle en float64 et en float32.
+
+    Args:
+        model_name: Nom de la classe dans aiops.models
+        data: Données synthétiques
+        epochs: Époques d'entraînement de l'autoencoder
+
+    Returns:
+        dict: Écarts mesurés, mémoire des entrées et respect de la tolérance
+    """
+    import aiops.models as models
+
+    model_class = getattr(models, model_name)
+    outputs = {}
+    graph_outputs = None
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if model_name == "DeepLearningAnomalyModel":
+            model = model_class(model_dir=os.path.join(tmp_dir, "float64"), dtype='float64')
+            model.train(data, epochs=epochs)
+            # Le graphe exporté est chargé par la sauvegarde en arrière-plan : elle est
+            # attendue, puis chaque chemin d'inférence est choisi explicitement
+            model.wait_saved()
+            graph, model.inference = model.inference, None
+            for dtype in ('float64', 'float32'):
+                model.dtype = np.dtype(dtype)
+                outputs[dtype] = _outputs(model, data)
+            if graph is not None:
+                model.inference = graph
+                graph_outputs = _outputs(model, data)
+        else:
+            for dtype in ('float64', 'float32'):
+                model = model_class(model_dir=os.path.join(tmp_dir, dtype), dtype=dtype)
+                model.train(data)
+                outputs[dtype] = _outputs(model, data)
+
+    (scores64, decisions64, bytes64), (scores32, decisions32, bytes32) = outputs['float64'], outputs['float32']
+    report = {"input_mb_float64": bytes64 / 1048576.0, "input_mb_float32": bytes32 / 1048576.0}
+
+    if scores64 is not None:
+        diff = np.abs(scores32.astype(np.float64) - scores64)
+        report["max_abs_diff"] = float(diff.max())
+        # Écart rapporté à l'amplitude des scores float64
+        report["max_rel_diff"] = float(diff.max() / max(np.abs(scores64).max(), 1e-12))
+    if decisions64 is not None:
+        report["min_agreement"] = float(np.mean(decisions32 == decisions64))
+    if graph_outputs is not None:
+        # Graphe exporté comparé au modèle Keras, tous deux en float32
+        graph_scores, graph_decisions, _ = graph_outputs
+        diff = np.abs(graph_scores.astype(np.float64) - scores32)
+        report["max_graph_rel_diff"] = float(diff.max() / max(np.abs(scores32).max(), 1e-12))
+        report["min_graph_agreement"] = float(np.mean(graph_decisions == decisions32))
+
+    violations = []
+    for key, limit in TOLERANCES[model_name].items():
+        value = report.get(key)
+        if value is None:
+            continue
+        if key.startswith("min_") and value < limit or key.startswith("max_") and value > limit:
+            violations.append(f"{model_name}: {key}={value:.3g} (tolérance {limit})")
+
+    report["violations"] = violations
+    return report
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Validation du mode float32 des modèles AIOps")
+    parser.add_argument('--models', nargs='+', default=list(TOLERANCES),
+                        choices=list(TOLERANCES), help='Classes de modèles à valider')
+    parser.add_argument('--rows', type=int, default=5000, help='Nombre de lignes synthétiques')
+    parser.add_argument('--epochs', type=int, default=1, help="Époques d'entraînement de l'autoencoder")
+    parser.add_argument('--seed', type=int, default=42, help='Graine des données synthétiques')
+    parser.add_argument('--json', action='store_true', help='Afficher les résultats au format JSON')
+    args = parser.parse_args()
+
+    # Aucun artefact ni journal n'est écrit dans les répertoires de production
+    os.environ.setdefault("PREDICTION_LOG_FORMAT", "off")
+    os.environ.setdefault("DATA_PATH", tempfile.mkdtemp(prefix="aiops-precision-"))
+    data = generate_metrics(args.rows, seed=args.seed)
+
+    results = {model_name: compare_model(model_name, data, args.epochs) for model_name in args.models}
+    violations = [v for report in results.values() for v in report["violations"]]
+
+    if args.json:
+        print(json.dumps({"results": results, "violations": violations}, indent=2))
+    else:
+        for model_name, report in results.items():
+            measures = " ".join(f"{key}={value:.3g}" for key, value in report.items() if key != "violations")
+            print(f"{model_name:28s} {measures}")
+        for violation in violations:
+            print(f"TOLÉRANCE DÉPASSÉE - {violation}")
+
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de la mémoire des workers d'inférence qui servent les mêmes modèles.
+
+Des modèles scikit-learn sont entraînés sur des métriques synthétiques, puis
+N workers sont créés par fork et exécutent chacun une prédiction, dans deux
+configurations : chaque worker charge ses propres modèles ("private"), ou
+les modèles sont chargés une fois dans le processus maître avant le fork
+("preload", comme server.py --processes). Le benchmark additionne la RSS, la
+PSS et la mémoire privée des workers (Linux : /proc/<pid>/smaps_rollup) ; la
+PSS répartit chaque page partagée entre les processus qui la partagent, sa
+somme est donc l'empreinte réelle des workers.
+
+Usage:
+    python -m aiops.benchmarks.shared_memory [--workers 16] [--rows 100000]
+        [--models AnomalyDetectionModel ...] [--json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+from .startup import REPO_ROOT
+from .throughput import generate_metrics
+
+# Modèles partageables par fork (le runtime TensorFlow ne survit pas au fork)
+SHARED_MODELS = ["AnomalyDetectionModel", "ResourcePredictionModel", "ClusteringModel"]
+
+MODES = ["private", "preload"]
+
+
+def _memory_kb(pid):
+    """Retourne la RSS, la PSS et la mémoire privée (Ko) d'un processus."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"]
+    }
+
+
+def train_models(model_names, rows):
+    """
+    Entraîne et sauvegarde les modèles mesurés dans MODEL_PATH.
+
+    Args:
+        model_names: Classes de modèles dans aiops.models
+        rows: Nombre de lignes d'entraînement
+    """
+    import aiops.models as models
+
+    data = generate_metrics(rows)
+    for name in model_names:
+        model = getattr(models, name)()
+        model.train(data)
+        model.wait_saved()
+
+
+def measure_workers(model_names, n_workers, mode):
+    """
+    Crée les workers par fork et mesure leur mémoire une fois la prédiction faite.
+
+    Args:
+        model_names: Classes de modèles dans aiops.models
+        n_workers: Nombre de workers
+        mode: "private" (chargement par worker) ou "preload" (chargement avant le fork)
+
+    Returns:
+        dict: Sommes de RSS, PSS et mémoire privée des workers (Mo)
+    """
+    import aiops.models as models
+    from aiops.registry import prepare_fork
+
+    data = generate_metrics(2000, seed=7)
+
+    def load():
+        return [getattr(models, name)() for name in model_names]
+
+    preloaded = None
+    if mode == "preload":
+        preloaded = load()
+        prepare_fork()
+
+    # Les workers attendent la fermeture de release_w pour se terminer
+    release_r, release_w = os.pipe()
+    children = []
+    for _ in range(n_workers):
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                os.close(release_w)
+                for model in preloaded if preloaded is not None else load():
+                    model.predict(data)
+                os.write(ready_w, b'1')
+                os.read(release_r, 1)
+            except BaseException:
+                status = 1
+            finally:
+                os._exit(status)
+        os.close(ready_w)
+        if not os.read(ready_r, 1):
+            raise RuntimeError(f"Échec du worker {pid}")
+        os.close(ready_r)
+        children.append(pid)
+
+    try:
+        measures = [_memory_kb(pid) for pid in children]
+    finally:
+        os.close(release_w)
+        for pid in children:
+            os.waitpid(pid, 0)
+
+    return {
+        key + "_mb": sum(measure[key] for measure in measures) / 1024.0
+        for key in ("rss", "pss", "private")
+    }
+
+
+def _run(args, env):
+    """Exécute une étape du benchmark dans un processus neuf et retourne sa dernière ligne."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "aiops.benchmarks.shared_memory"] + args,
+        env=env, capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Échec de l'étape {args[0]}: {completed.stderr.strip()[-2000:]}")
+    return completed.stdout.strip().splitlines()[-1]
+
+
+def measure(model_names, n_workers, rows):
+    """
+    Mesure les deux configurations sur les mêmes artefacts.
+
+    Chaque configuration s'exécute dans un processus neuf, pour que le maître
+    du mode "private" n'ait chargé aucun modèle.
+
+    Returns:
+        dict: {mode: mesures de measure_workers()}
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+        env["MODEL_PATH"] = os.path.join(tmp_dir, "models")
+        env["DATA_PATH"] = os.path.join(tmp_dir, "data")
+        # Les workers se terminent par os._exit : aucun journal à vider
+        env["PREDICTION_LOG_FORMAT"] = "off"
+
+        _run(["--train", str(rows), "--models"] + model_names, env)
+        return {
+            mode: json.loads(_run(["--measure", mode, "--workers", str(n_workers),
+                                   "--models"] + model_names, env))
+            for mode in MODES
+        }
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Benchmark de la mémoire partagée entre workers d'inférence")
+    parser.add_argument('--models', nargs='+', default=SHARED_MODELS, choices=SHARED_MODELS,
+                        help='Classes de modèles servies')
+    parser.add_argument('--workers', type=int, default=16, help='Nombre de workers')
+    parser.add_argument('--rows', type=int, default=100000, help="Lignes d'entraînement des modèles")
+    parser.add_argument('--json', action='store_true', help='Afficher les résultats au format JSON')
+    parser.add_argument('--train', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--measure', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.train:
+        train_models(args.models, args.train)
+        print("ok")
+        return
+    if args.measure:
+        print(json.dumps(measure_workers(args.models, args.workers, args.measure)))
+        return
+
+    results = measure(args.models, args.workers, args.rows)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for mode, measures in results.items():
+        print(f"{mode:8s} workers={args.workers} rss={measures['rss_mb']:.0f}Mo "
+              f"pss={measures['pss_mb']:.0f}Mo privée={measures['private_mb']:.0f}Mo")
+    saved = results["private"]["pss_mb"] - results["preload"]["pss_mb"]
+    print(f"Mémoire économisée par le préchargement: {saved:.0f}Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de démarrage des modèles AIOps.
+
+Chaque classe de modèle est importée et construite dans un processus Python
+neuf : le benchmark mesure le temps d'import de aiops.models, le temps de
+construction du modèle, la mémoire résidente maximale et les backends
+effectivement chargés, puis vérifie ces mesures contre des budgets. Une
+classe de modèle de aiops.models sans budget fait échouer le benchmark.
+
+Usage:
+    python -m aiops.benchmarks.startup [--models AnomalyDetectionModel ...] [--json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+# Racine du dépôt, ajoutée au PYTHONPATH des processus mesurés
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Budgets par classe : temps d'import (s), temps import + construction (s),
+# RSS maximale (Mo) et backends qui ne doivent pas être chargés
+STARTUP_BUDGETS = {
+    "AnomalyDetectionModel": {
+        "import_seconds": 2.0, "startup_seconds": 5.0, "max_rss_mb": 300,
+        "forbidden_backends": ["tensorflow", "statsmodels"]
+    },
+    "ResourcePredictionModel": {
+        "import_seconds": 2.0, "startup_seconds": 5.0, "max_rss_mb": 300,
+        "forbidden_backends": ["tensorflow", "statsmodels"]
+    },
+    "ClusteringModel": {
+        "import_seconds": 2.0, "startup_seconds": 5.0, "max_rss_mb": 300,
+        "forbidden_backends": ["tensorflow", "statsmodels"]
+    },
+    "DeepLearningAnomalyModel": {
+        "import_seconds": 2.0, "startup_seconds": 30.0, "max_rss_mb": 1500,
+        "forbidden_backends": ["statsmodels"]
+    },
+    "FleetForecastModel": {
+        "import_seconds": 2.0, "startup_seconds": 5.0, "max_rss_mb": 300,
+        "forbidden_backends": ["tensorflow", "statsmodels"]
+    }
+}
+
+BACKENDS = ["tensorflow", "sklearn", "statsmodels", "joblib"]
+
+# Code exécuté dans le processus mesuré
+_PROBE = """
+import sys, json, time, resource
+start = time.perf_counter()
+import aiops.models as models
+imported = time.perf_counter()
+getattr(models, sys.argv[1])()
+constructed = time.perf_counter()
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss_kb //= 1024
+print(json.dumps({
+    "import_seconds": imported - start,
+    "startup_seconds": constructed - start,
+    "max_rss_mb": rss_kb / 1024.0,
+    "backends": [name for name in sys.argv[2:] if name in sys.modules]
+}))
+"""
+
+
+def measure_startup(model_class):
+    """
+    Mesure le démarrage d'une classe de modèle dans un processus neuf.
+
+    Args:
+        model_class: Nom de la classe dans aiops.models
+
+    Returns:
+        dict: Temps d'import et de démarrage, RSS maximale et backends chargés
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+        # Répertoires vides : aucun artefact existant n'est chargé
+        env["MODEL_PATH"] = os.path.join(tmp_dir, "models")
+        env["DATA_PATH"] = os.path.join(tmp_dir, "data")
+
+        completed = subprocess.run(
+            [sys.executable, "-c", _PROBE, model_class] + BACKENDS,
+            env=env, capture_output=True, text=True, check=False
+        )
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"Échec du démarrage de {model_class}: {completed.stderr.strip()}")
+
+    # La dernière ligne contient les mesures, les précédentes les messages du modèle
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def missing_budgets():
+    """
+    Retourne les classes de modèles de aiops.models qui n'ont pas de budget.
+
+    Returns:
+        list: Noms des sous-classes de BaseAIOpsModel absentes de STARTUP_BUDGETS
+    """
+    import inspect
+    import aiops.models as models
+
+    return sorted(
+        name for name, cls in inspect.getmembers(models, inspect.isclass)
+        if issubclass(cls, models.BaseAIOpsModel) and cls is not models.BaseAIOpsModel
+        and cls.__module__ == models.__name__ and name not in STARTUP_BUDGETS
+    )
+
+
+def check_budget(model_class, measures, budget):
+    """
+    Compare les mesures d'une classe à son budget.
+
+    Returns:
+        list: Dépassements constatés (vide si le budget est respecté)
+    """
+    violations = []
+    for key in ("import_seconds", "startup_seconds", "max_rss_mb"):
+        if measures[key] > budget[key]:
+            violations.append(f"{model_class}: {key}={measures[key]:.2f} > budget {budget[key]}")
+
+    for backend in budget.get("forbidden_backends", []):
+        if backend in measures["backends"]:
+            violations.append(f"{model_class}: le backend '{backend}' est chargé au démarrage")
+
+    return violations
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Benchmark de démarrage des modèles AIOps")
+    parser.add_argument('--models', nargs='+', default=list(STARTUP_BUDGETS),
+                        choices=list(STARTUP_BUDGETS), help='Classes de modèles à mesurer')
+    parser.add_argument('--json', action='store_true', help='Afficher les résultats au format JSON')
+    args = parser.parse_args()
+
+    results = {}
+    violations = [f"{model_class}: aucun budget de démarrage défini" for model_class in missing_budgets()]
+    for model_class in args.models:
+        measures = measure_startup(model_class)
+        results[model_class] = measures
+        violations.extend(check_budget(model_class, measures, STARTUP_BUDGETS[model_class]))
+
+    if args.json:
+        print(json.dumps({"results": results, "violations": violations}, indent=2))
+    else:
+        for model_class, measures in results.items():
+            print(f"{model_class:28s} import={measures['import_seconds']:.3f}s "
+                  f"démarrage={measures['startup_seconds']:.3f}s "
+                  f"rss={measures['max_rss_mb']:.0f}Mo backends={','.join(measures['backends'])}")
+        for violation in violations:
+            print(f"BUDGET DÉPASSÉ - {violation}")
+
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de débit et de mémoire des modèles AIOps.
+
+Des métriques synthétiques reproductibles (saisonnalité journalière, bruit,
+anomalies injectées) sont générées pour chaque cas : classe de modèle,
+nombre de lignes, nombre de caractéristiques supplémentaires et longueur de
+séquence. Chaque cas est exécuté dans un processus Python neuf afin que la
+RSS maximale lui soit propre ; le benchmark mesure le temps de preprocess,
+d'entraînement et de prédiction ainsi que le débit en lignes par seconde.
+
+Les résultats sont ajoutés à un historique JSON Lines et comparés à la
+dernière mesure du même cas dans le même environnement (machine, nombre de
+CPU, versions de Python et des bibliothèques) pour signaler les régressions.
+
+Usage:
+    python -m aiops.benchmarks.throughput [--models ClusteringModel ...] [--rows 1000 10000]
+        [--extra-features 0 20] [--sequence-lengths 10 30] [--history fichier.jsonl] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import tempfile
+import subprocess
+import importlib.metadata
+
+import numpy as np
+import pandas as pd
+
+from .startup import REPO_ROOT
+
+# Historique des résultats (une ligne JSON par cas mesuré)
+BENCHMARK_HISTORY = os.environ.get(
+    'BENCHMARK_HISTORY',
+    os.path.join(os.environ.get('DATA_PATH', '/app/data'), 'benchmarks', 'throughput_history.jsonl')
+)
+
+# Tailles par défaut : le modèle profond est plus coûteux à entraîner
+DEFAULT_ROWS = {
+    "AnomalyDetectionModel": [1000, 10000],
+    "ResourcePredictionModel": [1000, 10000],
+    "ClusteringModel": [1000, 10000],
+    "DeepLearningAnomalyModel": [2000]
+}
+
+# Mesures comparées à l'historique, et sens de l'amélioration
+TRACKED_METRICS = {
+    "preprocess_seconds": "lower",
+    "train_seconds": "lower",
+    "predict_seconds": "lower",
+    "predict_rows_per_second": "higher",
+    "peak_rss_mb": "lower"
+}
+
+LIBRARIES = ["numpy", "pandas", "scikit-learn", "tensorflow", "statsmodels", "joblib"]
+
+# Champs de l'environnement qui doivent être identiques pour comparer deux mesures
+COMPARED_ENVIRONMENT = ["host", "cpus", "python", "libraries"]
+
+BASE_METRICS = [
+    'cpu_usage', 'memory_usage', 'network_in', 'network_out', 'disk_io_read',
+    'disk_io_write', 'request_latency', 'error_rate', 'request_rate', 'pods_running'
+]
+
+
+def generate_metrics(n_rows, extra_features=0, seed=42, freq='10s', anomaly_rate=0.01):
+    """
+    Génère des métriques système synthétiques et reproductibles.
+
+    Les métriques suivent une saisonnalité journalière commune (charge),
+    avec un bruit propre à chaque métrique ; une fraction des lignes reçoit
+    des pics simulant des anomalies.
+
+    Args:
+        n_rows: Nombre de lignes
+        extra_features: Nombre de métriques supplémentaires (metric_0, metric_1...)
+        seed: Graine du générateur
+        freq: Pas de temps entre deux lignes
+        anomaly_rate: Proportion de lignes anormales
+
+    Returns:
+        DataFrame: Métriques horodatées
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range('2024-01-01', periods=n_rows, freq=freq)
+    hours = (timestamps.hour + timestamps.minute / 60.0).to_numpy()
+    load = 0.5 + 0.4 * np.sin(2 * np.pi * (hours - 6) / 24.0)
+
+    def noisy(scale, noise):
+        return scale * load + rng.normal(0, noise, n_rows)
+
+    data = pd.DataFrame({
+        'timestamp': timestamps,
+        'cpu_usage': noisy(80, 3),
+        'memory_usage': noisy(60, 2) + 20,
+        'network_in': noisy(500, 20),
+        'network_out': noisy(400, 20),
+        'disk_io_read': noisy(100, 10),
+        'disk_io_write': noisy(80, 10),
+        'request_latency': 50 + noisy(30, 5),
+        'error_rate': np.abs(rng.normal(0.5, 0.2, n_rows)),
+        'request_rate': noisy(1000, 50),
+        'pods_running': np.round(2 + 8 * load)
+    })
+
+    for i in range(extra_features):
+        data[f'metric_{i}'] = noisy(rng.uniform(10, 100), rng.uniform(1, 5))
+
+    # Pics simultanés sur plusieurs métriques
+    anomalies = rng.random(n_rows) < anomaly_rate
+    for column in ('cpu_usage', 'request_latency', 'error_rate'):
+        data.loc[anomalies, column] *= rng.uniform(2, 4, anomalies.sum())
+
+    return data
+
+
+def _library_versions():
+    """Retourne les versions des bibliothèques installées, sans les importer."""
+    versions = {}
+    for library in LIBRARIES:
+        try:
+            versions[library] = importlib.metadata.version(library)
+        except importlib.metadata.PackageNotFoundError:
+            versions[library] = None
+    return versions
+
+
+def _git_revision():
+    """Retourne le commit courant du dépôt, ou None hors d'un dépôt git."""
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=False
+        )
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def _peak_rss_mb():
+    """Retourne la RSS maximale du processus courant en Mo."""
+    import resource
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss_kb //= 1024
+    return rss_kb / 1024.0
+
+
+def case_key(case):
+    """Identifiant stable d'un cas, utilisé pour la comparaison à l'historique."""
+    key = f"{case['model']}|rows={case['rows']}|features=+{case['extra_features']}"
+    if case.get("sequence_length"):
+        key += f"|seq={case['sequence_length']}"
+    return key
+
+
+def run_case(case):
+    """
+    Exécute un cas dans le processus courant.
+
+    Le preprocess est mesuré sur un modèle neuf (ajustement du scaler
+    compris), puis l'entraînement et la prédiction sur le même jeu de données.
+
+    Args:
+        case: Description du cas (model, rows, extra_features, sequence_length, epochs, seed)
+
+    Returns:
+        dict: Temps, débits et RSS maximale
+    """
+    import aiops.models as models
+
+    data = generate_metrics(case["rows"], case["extra_features"], seed=case.get("seed", 42))
+    extra = [f'metric_{i}' for i in range(case["extra_features"])]
+
+    model_class = getattr(models, case["model"])
+    kwargs = {}
+    if case.get("sequence_length"):
+        kwargs["sequence_length"] = case["sequence_length"]
+    model = model_class(**kwargs)
+    model.features = model.features + extra
+
+    train_kwargs = {}
+    if case["model"] == "DeepLearningAnomalyModel":
+        train_kwargs["epochs"] = case.get("epochs", 1)
+
+    start = time.perf_counter()
+    model.preprocess_data(data)
+    preprocess_seconds = time.perf_counter() - start
+
+    # Le preprocess a pu ajuster le scaler : l'entraînement repart d'un modèle neuf
+    model = model_class(**kwargs)
+    model.features = model.features + extra
+
+    start = time.perf_counter()
+    model.train(data, **train_kwargs)
+    train_seconds = time.perf_counter() - start
+    train_rss_mb = _peak_rss_mb()
+
+    start = time.perf_counter()
+    model.predict(data)
+    predict_seconds = time.perf_counter() - start
+
+    rows = case["rows"]
+    return {
+        "preprocess_seconds": preprocess_seconds,
+        "train_seconds": train_seconds,
+        "predict_seconds": predict_seconds,
+        "preprocess_rows_per_second": rows / preprocess_seconds if preprocess_seconds else None,
+        "train_rows_per_second": rows / train_seconds if train_seconds else None,
+        "predict_rows_per_second": rows / predict_seconds if predict_seconds else None,
+        "data_mb": data.memory_usage(deep=True).sum() / (1024.0 * 1024.0),
+        "train_peak_rss_mb": train_rss_mb,
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+
+def measure_case(case):
+    """
+    Exécute un cas dans un processus neuf, avec des répertoires temporaires.
+
+    Args:
+        case: Description du cas
+
+    Returns:
+        dict: Mesures retournées par run_case()
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+        env["MODEL_PATH"] = os.path.join(tmp_dir, "models")
+        env["DATA_PATH"] = os.path.join(tmp_dir, "data")
+        # La journalisation des prédictions est mesurée séparément
+        env.setdefault("PREDICTION_LOG_FORMAT", "off")
+
+        completed = subprocess.run(
+            [sys.executable, "-m", "aiops.benchmarks.throughput", "--worker", json.dumps(case)],
+            env=env, capture_output=True, text=True, check=False
+        )
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"Échec du cas {case_key(case)}: {completed.stderr.strip()[-2000:]}")
+
+    # La dernière ligne contient les mesures, les précédentes les messages du modèle
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def load_history(path):
+    """
+    Charge l'historique des résultats.
+
+    Returns:
+        list: Enregistrements, du plus ancien au plus récent
+    """
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+def append_history(path, records):
+    """Ajoute des enregistrements à l'historique."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+
+def same_environment(record, other):
+    """Indique si deux mesures ont été prises dans le même environnement (voir COMPARED_ENVIRONMENT)."""
+    environment, other_environment = record.get("environment") or {}, other.get("environment") or {}
+    return all(environment.get(field) == other_environment.get(field) for field in COMPARED_ENVIRONMENT)
+
+
+def compare_to_history(record, history, tolerance):
+    """
+    Compare un résultat à la dernière mesure du même cas, dans le même environnement.
+
+    Les mesures prises sur une autre machine ou avec d'autres versions de
+    bibliothèques sont ignorées : elles signaleraient de fausses régressions.
+
+    Args:
+        record: Résultat courant
+        history: Enregistrements précédents
+        tolerance: Dégradation relative tolérée (0.25 pour 25%)
+
+    Returns:
+        list: Régressions constatées (vide si aucune ou sans référence)
+    """
+    previous = [r for r in history if r["key"] == record["key"] and same_environment(record, r)]
+    if not previous:
+        return []
+    baseline = previous[-1]
+
+    regressions = []
+    for metric, direction in TRACKED_METRICS.items():
+        before = baseline["results"].get(metric)
+        after = record["results"].get(metric)
+        if not before or after is None:
+            continue
+        ratio = after / before if direction == "lower" else before / after if after else float('inf')
+        if ratio > 1.0 + tolerance:
+            regressions.append(
+                f"{record['key']}: {metric} {before:.3f} -> {after:.3f} "
+                f"(réf. {baseline.get('revision') or '?'} du {baseline['date']})"
+            )
+    return regressions
+
+
+def build_cases(args):
+    """Construit la liste des cas à partir des arguments."""
+    cases = []
+    for model in args.models:
+        rows_list = args.rows or DEFAULT_ROWS[model]
+        sequence_lengths = args.sequence_lengths if model == "DeepLearningAnomalyModel" else [None]
+        for rows in rows_list:
+            for extra_features in args.extra_features:
+                for sequence_length in sequence_lengths:
+                    case = {
+                        "model": model,
+                        "rows": rows,
+                        "extra_features": extra_features,
+                        "seed": args.seed
+                    }
+                    if sequence_length:
+                        case["sequence_length"] = sequence_length
+                        case["epochs"] = args.epochs
+                    cases.append(case)
+    return cases
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Benchmark de débit et de mémoire des modèles AIOps")
+    parser.add_argument('--models', nargs='+', default=list(DEFAULT_ROWS),
+                        choices=list(DEFAULT_ROWS), help='Classes de modèles à mesurer')
+    parser.add_argument('--rows', nargs='+', type=int, help='Nombres de lignes (par défaut selon le modèle)')
+    parser.add_argument('--extra-features', nargs='+', type=int, default=[0],
+                        help='Nombres de métriques supplémentaires')
+    parser.add_argument('--sequence-lengths', nargs='+', type=int, default=[10],
+                        help='Longueurs de séquence du modèle profond')
+    parser.add_argument('--epochs', type=int, default=1, help='Époques du modèle profond')
+    parser.add_argument('--seed', type=int, default=42, help='Graine des données synthétiques')
+    parser.add_argument('--history', default=BENCHMARK_HISTORY, help='Fichier historique JSON Lines')
+    parser.add_argument('--no-history', action='store_true', help="Ne pas enregistrer les résultats")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Dégradation relative tolérée avant de signaler une régression')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Retourner un code de sortie non nul en cas de régression')
+    parser.add_argument('--json', action='store_true', help='Afficher les résultats au format JSON')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_case(json.loads(args.worker))))
+        return
+
+    history = load_history(args.history)
+    environment = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "host": socket.gethostname(),
+        "cpus": os.cpu_count(),
+        "libraries": _library_versions()
+    }
+    revision = _git_revision()
+    date = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+    records = []
+    regressions = []
+    for case in build_cases(args):
+        record = {
+            "key": case_key(case),
+            "date": date,
+            "revision": revision,
+            "case": case,
+            "environment": environment,
+            "results": measure_case(case)
+        }
+        regressions.extend(compare_to_history(record, history, args.tolerance))
+        records.append(record)
+
+        if not args.json:
+            results = record["results"]
+            print(f"{record['key']:60s} preprocess={results['preprocess_seconds']:.3f}s "
+                  f"train={results['train_seconds']:.3f}s predict={results['predict_seconds']:.3f}s "
+                  f"({results['predict_rows_per_second']:.0f} lignes/s) "
+                  f"rss={results['peak_rss_mb']:.0f}Mo")
+
+    if not args.no_history:
+        append_history(args.history, records)
+
+    if args.json:
+        print(json.dumps({"results": records, "regressions": regressions}, indent=2))
+    else:
+        for regression in regressions:
+            print(f"RÉGRESSION - {regression}")
+
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Détection en flux de la dérive des caractéristiques.
+
+À l'entraînement, une référence est calculée sur les caractéristiques
+normalisées : moyenne, écart-type et histogramme par caractéristique, sur
+des intervalles définis par les quantiles des données d'entraînement. En
+production, chaque prédiction met à jour des statistiques courantes
+(moyenne et variance par l'algorithme de Welford, généralisé aux lots, et
+comptes par intervalle) dont la taille ne dépend que du nombre de
+caractéristiques. Les scores de dérive (PSI, décalage de la moyenne,
+rapport des écarts-types) indiquent quand un réentraînement est utile.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+# Nombre d'intervalles des histogrammes, seuil de PSI déclenchant un réentraînement
+# et nombre minimal de lignes observées avant de conclure à une dérive
+DRIFT_BINS = int(os.environ.get('DRIFT_BINS', '10'))
+DRIFT_PSI_THRESHOLD = float(os.environ.get('DRIFT_PSI_THRESHOLD', '0.2'))
+DRIFT_MIN_ROWS = int(os.environ.get('DRIFT_MIN_ROWS', '1000'))
+
+# Proportion plancher des intervalles vides dans le calcul du PSI
+_PSI_EPSILON = 1e-4
+
+
+def _bin_counts(X, edges):
+    """Compte les valeurs de chaque colonne par intervalle, en ignorant les NaN."""
+    n_features, n_bins = X.shape[1], edges.shape[1] + 1
+    # Indice d'intervalle = nombre de bornes inférieures ou égales à la valeur
+    bins = (X[:, :, None] >= edges[None, :, :]).sum(axis=2)
+    bins += np.arange(n_features) * n_bins
+    counts = np.bincount(bins[~np.isnan(X)], minlength=n_features * n_bins)
+    return counts.reshape(n_features, n_bins).astype(np.float64)
+
+
+def build_reference(X, columns, bins=DRIFT_BINS):
+    """
+    Calcule la référence de dérive sur les caractéristiques d'entraînement.
+
+    Args:
+        X: Matrice (n, n_features) des caractéristiques normalisées d'entraînement
+        columns: Noms des caractéristiques
+        bins: Nombre d'intervalles par caractéristique
+
+    Returns:
+        dict: Référence (colonnes, moyenne, écart-type, bornes et proportions des intervalles)
+    """
+    X = np.asarray(X, dtype=np.float64)
+    edges = np.nanquantile(X, np.linspace(0, 1, bins + 1)[1:-1], axis=0).T
+    counts = _bin_counts(X, edges)
+
+    return {
+        "columns": list(columns),
+        "rows": len(X),
+        "mean": np.nanmean(X, axis=0),
+        "std": np.nanstd(X, axis=0),
+        "edges": edges,
+        "proportions": counts / np.maximum(counts.sum(axis=1, keepdims=True), 1.0)
+    }
+
+
+class FeatureDriftMonitor:
+    """
+    Statistiques courantes des caractéristiques, comparées à la référence d'entraînement.
+
+    Exemple:
+        monitor = FeatureDriftMonitor(build_reference(X_train, columns))
+        monitor.update(X_live)
+        if monitor.drifted():
+            ...
+    """
+
+    def __init__(self, reference, threshold=None, min_rows=None):
+        """
+        Initialise le moniteur.
+
+        Args:
+            reference: Référence retournée par build_reference()
+            threshold: Seuil de PSI au-delà duquel une caractéristique dérive
+                (par défaut DRIFT_PSI_THRESHOLD)
+            min_rows: Lignes observées avant de conclure à une dérive (par défaut DRIFT_MIN_ROWS)
+        """
+        self.reference = reference
+        self.threshold = DRIFT_PSI_THRESHOLD if threshold is None else threshold
+        self.min_rows = DRIFT_MIN_ROWS if min_rows is None else min_rows
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Remet à zéro les statistiques courantes (par exemple après un réentraînement)."""
+        n_features = len(self.reference["columns"])
+        with self._lock:
+            self.rows = 0
+            self.count = np.zeros(n_features)
+            self.mean = np.zeros(n_features)
+            self.m2 = np.zeros(n_features)
+            self.counts = np.zeros((n_features, self.reference["edges"].shape[1] + 1))
+            self.triggered = False
+
+    def update(self, X):
+        """
+        Ajoute un lot de lignes aux statistiques courantes.
+
+        Args:
+            X: Matrice (n, n_features) normalisée, colonnes dans l'ordre de la référence
+        """
+        X = np.asarray(X)
+        if X.ndim != 2 or not len(X):
+            return
+
+        valid = ~np.isnan(X)
+        batch_count = valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            batch_mean = np.where(batch_count > 0, np.nansum(X, axis=0) / batch_count, 0.0)
+        batch_m2 = np.nansum(np.square(X - batch_mean.astype(X.dtype)), axis=0, dtype=np.float64)
+        batch_counts = _bin_counts(X, self.reference["edges"])
+
+        with self._lock:
+            # Fusion de Welford par lots (Chan et al.)
+            total = self.count + batch_count
+            delta = batch_mean - self.mean
+            with np.errstate(invalid='ignore', divide='ignore'):
+                weight = np.where(total > 0, batch_count / total, 0.0)
+            self.mean += delta * weight
+            self.m2 += batch_m2 + np.square(delta) * self.count * weight
+            self.count = total
+            self.counts += batch_counts
+            self.rows += len(X)
+
+    def scores(self):
+        """
+        Calcule les scores de dérive par caractéristique.
+
+        Returns:
+            dict: {caractéristique: {"psi", "mean_shift", "std_ratio"}}
+        """
+        with self._lock:
+            count, mean, m2, counts = self.count.copy(), self.mean.copy(), self.m2.copy(), self.counts.copy()
+
+        reference = self.reference
+        live = np.maximum(counts / np.maximum(counts.sum(axis=1, keepdims=True), 1.0), _PSI_EPSILON)
+        expected = np.maximum(reference["proportions"], _PSI_EPSILON)
+        psi = np.sum((live - expected) * np.log(live / expected), axis=1)
+
+        ref_std = np.maximum(reference["std"], 1e-12)
+        std = np.sqrt(m2 / np.maximum(count, 1.0))
+        mean_shift = np.abs(mean - reference["mean"]) / ref_std
+        std_ratio = std / ref_std
+
+        return {
+            column: {
+                "psi": float(psi[j]),
+                "mean_shift": float(mean_shift[j]),
+                "std_ratio": float(std_ratio[j])
+            }
+            for j, column in enumerate(reference["columns"])
+        }
+
+    def drifted(self, scores=None):
+        """
+        Indique si la dérive justifie un réentraînement.
+
+        Args:
+            scores: Scores déjà calculés par scores() (optionnel)
+
+        Returns:
+            bool: True si assez de lignes ont été observées et qu'un PSI dépasse le seuil
+        """
+        if self.rows < self.min_rows:
+            return False
+        scores = scores or self.scores()
+        return max(score["psi"] for score in scores.values()) > self.threshold
+
+    def report(self):
+        """
+        Résume l'état de la dérive.
+
+        Returns:
+            dict: Lignes observées, score maximal, seuil, décision et scores par caractéristique
+        """
+        scores = self.scores()
+        return {
+            "rows": self.rows,
+            "drift_score": max((score["psi"] for score in scores.values()), default=0.0),
+            "threshold": self.threshold,
+            "drifted": self.drifted(scores),
+            "features": scores
+        }
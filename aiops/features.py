@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pipeline partagé des caractéristiques dérivées des modèles AIOps.
+
+Les caractéristiques temporelles (heure, jour de la semaine, encodages
+cycliques...) sont déclarées une seule fois dans DERIVED_FEATURES, chacune
+comme une fonction des caractéristiques dont elle dépend. Pour un même
+DataFrame d'entrée, chaque caractéristique est calculée au plus une fois
+et mémorisée : tous les modèles évalués sur la même fenêtre de collecte
+partagent les mêmes tableaux, en lecture seule. Le DataFrame de l'appelant
+n'est jamais modifié ; chaque modèle reçoit un nouveau DataFrame dont les
+colonnes d'origine sont partagées en copie sur écriture.
+"""
+
+import os
+import hashlib
+import weakref
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Nombre de DataFrames d'entrée dont les caractéristiques dérivées sont mémorisées
+FEATURE_CACHE_SIZE = int(os.environ.get('FEATURE_CACHE_SIZE', '8'))
+
+# Caractéristiques dérivées de l'horodatage : nom -> fonction(FrameFeatures) -> tableau
+DERIVED_FEATURES = {
+    'hour': lambda f: f.timestamps.dt.hour.to_numpy(),
+    'minute': lambda f: f.timestamps.dt.minute.to_numpy(),
+    'day_of_week': lambda f: f.timestamps.dt.dayofweek.to_numpy(),
+    'month': lambda f: f.timestamps.dt.month.to_numpy(),
+    'is_weekend': lambda f: (f['day_of_week'] >= 5).astype(int),
+    # Heure décimale (0-24) et fraction de la journée (0-1)
+    'time_of_day': lambda f: f['hour'] + f['minute'] / 60.0,
+    'hour_fraction': lambda f: f['hour'] / 24.0,
+    # Encodages cycliques de l'heure et du jour de la semaine
+    'time_sin': lambda f: np.sin(2 * np.pi * f['time_of_day'] / 24.0),
+    'time_cos': lambda f: np.cos(2 * np.pi * f['time_of_day'] / 24.0),
+    'day_sin': lambda f: np.sin(2 * np.pi * f['day_of_week'] / 7.0),
+    'day_cos': lambda f: np.cos(2 * np.pi * f['day_of_week'] / 7.0)
+}
+
+_PIPELINE = None
+_PIPELINE_LOCK = threading.Lock()
+
+
+def _fingerprint(timestamps):
+    """Empreinte de toute la colonne d'horodatages (négligeable devant le calcul des caractéristiques)."""
+    values = timestamps.to_numpy()
+    digest = hashlib.blake2b(pd.util.hash_array(values).tobytes(), digest_size=16).digest()
+    return (len(values), values.dtype.str, digest)
+
+
+class FrameFeatures:
+    """Caractéristiques dérivées d'un DataFrame, calculées à la demande puis mémorisées."""
+
+    def __init__(self, timestamps):
+        """
+        Args:
+            timestamps: Série des horodatages (convertie en datetime si nécessaire)
+        """
+        self.converted = not pd.api.types.is_datetime64_any_dtype(timestamps)
+        self.timestamps = pd.to_datetime(timestamps) if self.converted else timestamps
+        self.values = {}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, name):
+        with self._lock:
+            values = self.values.get(name)
+            if values is None:
+                values = np.asarray(DERIVED_FEATURES[name](self))
+                # Les tableaux sont partagés entre les modèles : toute écriture doit échouer
+                values.flags.writeable = False
+                self.values[name] = values
+            return values
+
+
+class FeaturePipeline:
+    """
+    Cache LRU des caractéristiques dérivées, indexé par l'identité des DataFrames d'entrée.
+
+    Une entrée est retirée dès que son DataFrame est libéré, pour ne pas garder
+    en mémoire les horodatages et caractéristiques de grands jeux d'entraînement.
+    """
+
+    def __init__(self, max_entries=8):
+        """
+        Args:
+            max_entries: Nombre de DataFrames d'entrée mémorisés
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Réentrant : un finaliseur peut s'exécuter pendant un ramasse-miettes déclenché sous le verrou
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _frame_features(self, data):
+        """Retourne les caractéristiques mémorisées de data, ou une nouvelle entrée."""
+        timestamps = data['timestamp']
+        key = id(data)
+        fingerprint = _fingerprint(timestamps)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            # L'identifiant peut être réutilisé après libération : vérifier l'objet et son contenu
+            if entry is not None and entry[0]() is data and entry[1] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+
+            self.misses += 1
+            if entry is not None:
+                entry[3].detach()
+            features = FrameFeatures(timestamps)
+            ref = weakref.ref(data)
+            finalizer = weakref.finalize(data, self._discard, key, ref)
+            self._entries[key] = (ref, fingerprint, features, finalizer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)[1][3].detach()
+            return features
+
+    def _discard(self, key, ref):
+        """Retire l'entrée d'un DataFrame libéré, sauf si l'identifiant a déjà été réutilisé."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+    def transform(self, data, features):
+        """
+        Retourne data enrichi des caractéristiques dérivées demandées, sans modifier data.
+
+        Args:
+            data: DataFrame pandas avec une colonne 'timestamp'
+            features: Liste de noms de DERIVED_FEATURES, ou dict {colonne: nom} pour
+                exposer une caractéristique sous un autre nom de colonne
+
+        Returns:
+            DataFrame: Nouveau DataFrame (sans colonne ajoutée si data n'a pas de colonne 'timestamp')
+        """
+        if 'timestamp' not in data.columns:
+            return data.copy(deep=False)
+
+        if not isinstance(features, dict):
+            features = {name: name for name in features}
+
+        frame_features = self._frame_features(data)
+        columns = {column: frame_features[name] for column, name in features.items()}
+
+        # Horodatages convertis dans le DataFrame retourné uniquement
+        if frame_features.converted:
+            columns['timestamp'] = frame_features.timestamps
+
+        return data.assign(**columns)
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            for entry in self._entries.values():
+                entry[3].detach()
+            self._entries.clear()
+
+    def stats(self):
+        """Retourne les statistiques du cache."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def get_feature_pipeline():
+    """Retourne le pipeline partagé du processus, configuré par l'environnement."""
+    global _PIPELINE
+    with _PIPELINE_LOCK:
+        if _PIPELINE is None:
+            _PIPELINE = FeaturePipeline(max_entries=FEATURE_CACHE_SIZE)
+        return _PIPELINE
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gestion d'une flotte de modèles AIOps par entité (pod, service...).
+
+Chaque entité possède ses propres artefacts, rangés dans une arborescence
+partitionnée sur le disque. Les modèles sont chargés à la demande et
+conservés dans un cache LRU borné en nombre et en taille (estimée par la
+taille des artefacts sur le disque) ; les modèles évincés restent
+disponibles sur le disque et sont rechargés au besoin. L'éviction retire
+aussi les artefacts de l'entité du registre du processus, qui sinon les
+garderait en mémoire ; seules les références encore détenues par
+l'appelant prolongent la vie d'un modèle évincé.
+"""
+
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .models import MODEL_PATH
+from .registry import get_model_registry
+from .artifacts import get_artifact_store
+
+
+class ModelFleet:
+    """Flotte de modèles d'une même classe, un par entité."""
+
+    def __init__(self, model_class, model_kwargs=None, root=None, n_shards=256,
+                 max_models=256, max_bytes=None, predict_workers=4):
+        """
+        Initialise la flotte.
+
+        Args:
+            model_class: Classe de modèle (ex. AnomalyDetectionModel)
+            model_kwargs: Paramètres transmis au constructeur de chaque modèle
+            root: Répertoire racine des artefacts (par défaut MODEL_PATH/fleet/<classe>)
+            n_shards: Nombre de partitions de l'arborescence
+            max_models: Nombre maximal de modèles gardés en mémoire
+            max_bytes: Taille cumulée maximale (octets des artefacts) des modèles en mémoire
+            predict_workers: Threads de chargement et de prédiction de predict_many()
+        """
+        self.model_class = model_class
+        self.model_kwargs = dict(model_kwargs or {})
+        self.root = root or os.path.join(MODEL_PATH, "fleet", model_class.__name__)
+        self.n_shards = n_shards
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.predict_workers = predict_workers
+
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+        self._executor = None
+
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.save_errors = {}  # Entités dont la dernière sauvegarde a échoué
+
+    def entity_dir(self, entity_id):
+        """
+        Retourne le répertoire des artefacts d'une entité.
+
+        La partition est dérivée d'un hachage stable de l'identifiant, et le
+        nom du répertoire conserve un préfixe lisible suivi du hachage pour
+        éviter toute collision après nettoyage des caractères.
+        """
+        digest = hashlib.sha1(str(entity_id).encode('utf-8')).hexdigest()
+        shard = int(digest[:8], 16) % self.n_shards
+        slug = re.sub(r'[^A-Za-z0-9_.-]', '_', str(entity_id))[:64]
+        return os.path.join(self.root, f"{shard:03d}", f"{slug}-{digest[:12]}")
+
+    @staticmethod
+    def _artifact_size(directory):
+        """Estime l'empreinte d'un modèle par la taille de ses artefacts (d'après le manifeste)."""
+        manifest = get_artifact_store().manifest(directory)
+        if manifest is not None:
+            return sum(entry["size"] for entry in manifest["artifacts"].values())
+        try:
+            return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+        except FileNotFoundError:
+            return 0
+
+    def exists(self, entity_id):
+        """
+        Indique si des artefacts ont été publiés pour une entité.
+
+        Args:
+            entity_id: Identifiant de l'entité
+
+        Returns:
+            bool: True si le répertoire de l'entité contient des artefacts
+        """
+        directory = self.entity_dir(entity_id)
+        store = get_artifact_store()
+        store.wait(directory)
+        if store.manifest(directory) is not None:
+            return True
+        try:
+            return any(entry.is_file() for entry in os.scandir(directory))
+        except FileNotFoundError:
+            return False
+
+    def get(self, entity_id, create=False):
+        """
+        Retourne le modèle d'une entité, chargé depuis le disque si nécessaire.
+
+        Args:
+            entity_id: Identifiant de l'entité
+            create: Si True, crée un modèle non entraîné pour une entité sans artefacts
+                (utilisé par train())
+
+        Returns:
+            BaseAIOpsModel: Modèle de l'entité
+
+        Raises:
+            KeyError: Si l'entité n'a pas d'artefacts et que create est False
+        """
+        with self._lock:
+            entry = self._cache.get(entity_id)
+            if entry is not None:
+                self._cache.move_to_end(entity_id)
+                self.hits += 1
+                return entry["model"]
+
+        # Une entité inconnue ne crée ni répertoire ni entrée de cache
+        if not create and not self.exists(entity_id):
+            raise KeyError(f"Aucun modèle entraîné pour l'entité {entity_id}")
+
+        directory = self.entity_dir(entity_id)
+        model = self.model_class(model_dir=directory, **self.model_kwargs)
+
+        with self._lock:
+            # Un autre thread a pu charger le même modèle entre-temps
+            entry = self._cache.get(entity_id)
+            if entry is not None:
+                self._cache.move_to_end(entity_id)
+                return entry["model"]
+
+            self._cache[entity_id] = {"model": model, "size": self._artifact_size(directory)}
+            self.loads += 1
+            self._evict()
+        return model
+
+    def _evict(self):
+        """Retire de la mémoire les modèles les moins récemment utilisés au-delà des limites."""
+        while len(self._cache) > 1:
+            total = sum(entry["size"] for entry in self._cache.values())
+            over_bytes = self.max_bytes and total > self.max_bytes
+            if len(self._cache) <= self.max_models and not over_bytes:
+                break
+            entity_id, _ = self._cache.popitem(last=False)
+            get_model_registry().invalidate_directory(self.entity_dir(entity_id))
+            self.evictions += 1
+
+    def evict(self, entity_id=None):
+        """
+        Retire un modèle (ou tous) de la mémoire ; les artefacts restent sur le disque.
+
+        Args:
+            entity_id: Identifiant de l'entité, ou None pour vider le cache
+        """
+        with self._lock:
+            entity_ids = list(self._cache) if entity_id is None else [entity_id]
+            for evicted in entity_ids:
+                if self._cache.pop(evicted, None) is not None:
+                    get_model_registry().invalidate_directory(self.entity_dir(evicted))
+
+    def train(self, entity_id, data, **train_kwargs):
+        """
+        Entraîne et sauvegarde le modèle d'une entité.
+
+        Args:
+            entity_id: Identifiant de l'entité
+            data: Données d'entraînement de l'entité
+            **train_kwargs: Paramètres transmis à train()
+
+        Returns:
+            BaseAIOpsModel: Modèle entraîné
+        """
+        model = self.get(entity_id, create=True)
+        model.train(data, **train_kwargs)
+
+        # L'empreinte du modèle change avec ses nouveaux artefacts, une fois publiés
+        pending_save = getattr(model, 'pending_save', None)
+        if pending_save is not None:
+            pending_save.add_done_callback(lambda future: self._update_size(entity_id, future))
+        else:
+            self._update_size(entity_id)
+        return model
+
+    def _update_size(self, entity_id, future=None):
+        """Met à jour l'empreinte d'un modèle en mémoire d'après ses artefacts publiés."""
+        if future is not None and future.exception() is not None:
+            with self._lock:
+                self.save_errors[entity_id] = str(future.exception())
+            print(f"Erreur lors de la sauvegarde du modèle de l'entité {entity_id}: {future.exception()}")
+            return
+        with self._lock:
+            self.save_errors.pop(entity_id, None)
+        size = self._artifact_size(self.entity_dir(entity_id))
+        with self._lock:
+            if entity_id in self._cache:
+                self._cache[entity_id]["size"] = size
+                self._evict()
+
+    def _predict_executor(self):
+        """Retourne le pool de threads de predict_many(), créé au premier appel."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.predict_workers,
+                                                    thread_name_prefix='aiops-fleet')
+            return self._executor
+
+    def _load(self, entity_id):
+        """Retourne le modèle d'une entité, ou l'erreur de chargement (thread de predict_many())."""
+        try:
+            return self.get(entity_id)
+        except Exception as e:
+            return e
+
+    def predict_many(self, data, entity_col='entity_id', **predict_kwargs):
+        """
+        Route les prédictions de nombreuses entités en un seul appel.
+
+        Les lignes sont regroupées par entité, et chaque modèle reçoit un seul
+        appel vectorisé à predict() avec toutes ses lignes. Les entités sont
+        traitées par tranches de max_models : les modèles d'une tranche sont
+        d'abord chargés, puis leurs prédictions exécutées en parallèle dans un
+        pool de threads (scikit-learn libère le GIL pendant la prédiction des
+        arbres). Une erreur sur une entité (modèle absent ou non entraîné)
+        n'interrompt pas le lot : elle est reportée dans "errors", sans créer
+        de modèle pour l'entité.
+
+        Args:
+            data: DataFrame avec une colonne d'entité, ou dict {entité: DataFrame}
+            entity_col: Nom de la colonne identifiant l'entité
+            **predict_kwargs: Paramètres transmis à predict() (ex. compact=True)
+
+        Returns:
+            dict: {"results": {entité: résultat}, "errors": {entité: message}}
+        """
+        if isinstance(data, dict):
+            groups = data.items()
+        else:
+            if entity_col not in data.columns:
+                raise ValueError(f"La colonne '{entity_col}' est manquante dans les données")
+            groups = ((entity_id, group.drop(columns=[entity_col]))
+                      for entity_id, group in data.groupby(entity_col, sort=False))
+        groups = list(groups)
+
+        results = {}
+        errors = {}
+        executor = self._predict_executor()
+        for start in range(0, len(groups), self.max_models):
+            batch = groups[start:start + self.max_models]
+            models = executor.map(self._load, [entity_id for entity_id, _ in batch])
+
+            futures = {}
+            for (entity_id, group), model in zip(batch, models):
+                if isinstance(model, KeyError):
+                    errors[entity_id] = model.args[0]
+                elif isinstance(model, Exception):
+                    errors[entity_id] = str(model)
+                else:
+                    futures[entity_id] = executor.submit(model.predict, group, **predict_kwargs)
+
+            for entity_id, future in futures.items():
+                try:
+                    results[entity_id] = future.result()
+                except Exception as e:
+                    errors[entity_id] = str(e)
+
+        return {"results": results, "errors": errors}
+
+    def stats(self):
+        """Retourne les statistiques du cache de la flotte."""
+        with self._lock:
+            return {
+                "models_in_memory": len(self._cache),
+                "bytes_in_memory": sum(entry["size"] for entry in self._cache.values()),
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "save_errors": len(self.save_errors)
+            }
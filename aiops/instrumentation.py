@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Instrumentation des étapes des modèles AIOps.
+
+Chaque étape (preprocess, estimateur, construction du résultat,
+journalisation...) est chronométrée et son nombre de lignes compté. Les
+mesures sont exportées sous forme d'histogrammes Prometheus lorsque les
+métriques sont activées, et peuvent être collectées appel par appel dans
+un dict de trace. Désactivée, l'instrumentation se réduit à un test par étape.
+"""
+
+import os
+import time
+import functools
+import threading
+
+# Activation des métriques Prometheus et port du serveur d'exposition (0 : pas de serveur)
+AIOPS_METRICS = os.environ.get('AIOPS_METRICS', 'false').lower() in ('1', 'true', 'yes')
+AIOPS_METRICS_PORT = int(os.environ.get('AIOPS_METRICS_PORT', '0'))
+
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+ROWS_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+_state = threading.local()
+_metrics = None
+_enabled = False
+_lock = threading.Lock()
+
+
+class _NullStage:
+    """Étape inactive, retournée lorsque rien n'est mesuré."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Chronomètre d'une étape, imbriquable dans le thread courant."""
+
+    __slots__ = ("model", "name", "rows", "self_stage", "start", "children")
+
+    def __init__(self, model, name, rows=None, self_stage=None):
+        self.model = model
+        self.name = name
+        self.rows = rows
+        self.self_stage = self_stage
+        self.children = 0.0
+
+    def __enter__(self):
+        stack = getattr(_state, "stack", None)
+        if stack is None:
+            stack = _state.stack = []
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        stack = _state.stack
+        stack.pop()
+        if stack:
+            stack[-1].children += elapsed
+
+        _record(self.model, self.name, elapsed, self.rows)
+        # Temps propre de l'étape, hors sous-étapes mesurées
+        if self.self_stage is not None:
+            _record(self.model, self.self_stage, max(0.0, elapsed - self.children), None)
+        return False
+
+
+def _record(model, stage_name, seconds, rows):
+    """Exporte une mesure vers Prometheus et la trace active."""
+    if _enabled:
+        duration, row_counts = _metrics
+        duration.labels(model.name, stage_name).observe(seconds)
+        if rows is not None:
+            row_counts.labels(model.name, stage_name).observe(rows)
+
+    trace = getattr(_state, "trace", None)
+    if trace is not None and trace["_owner"] in (None, model):
+        entry = trace["stages"].get(stage_name)
+        if entry is None:
+            entry = trace["stages"][stage_name] = {"seconds": 0.0, "calls": 0, "rows": 0}
+        entry["seconds"] += seconds
+        entry["calls"] += 1
+        if rows is not None:
+            entry["rows"] += rows
+
+
+def _count_rows(data):
+    """Nombre de lignes d'une entrée tabulaire, ou None."""
+    if hasattr(data, "shape"):
+        return int(data.shape[0]) if data.shape else None
+    if isinstance(data, list):
+        return len(data)
+    return None
+
+
+def stage(model, name, rows=None):
+    """
+    Retourne le chronomètre d'une étape, à utiliser avec `with`.
+
+    Args:
+        model: Modèle mesuré
+        name: Nom de l'étape
+        rows: Nombre de lignes traitées (optionnel)
+
+    Returns:
+        Gestionnaire de contexte (inactif si rien n'est mesuré)
+    """
+    if not _enabled and getattr(_state, "trace", None) is None:
+        return _NULL_STAGE
+    return _Stage(model, name, rows)
+
+
+def instrumented(stage_name, self_stage=None):
+    """
+    Décore une méthode de modèle pour chronométrer chacun de ses appels.
+
+    Args:
+        stage_name: Nom de l'étape
+        self_stage: Nom de l'étape recevant le temps propre de la méthode,
+            hors sous-étapes mesurées (optionnel)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(model, *args, **kwargs):
+            if not _enabled and getattr(_state, "trace", None) is None:
+                return func(model, *args, **kwargs)
+            rows = _count_rows(args[0]) if args else None
+            with _Stage(model, stage_name, rows, self_stage):
+                return func(model, *args, **kwargs)
+        wrapper._instrumented_stage = stage_name
+        return wrapper
+    return decorator
+
+
+class StageTrace:
+    """
+    Collecte les étapes exécutées dans le bloc, pour le thread courant.
+
+    Exemple:
+        with StageTrace(model) as t:
+            model.predict(data)
+        t["stages"]["estimator"]["seconds"]
+    """
+
+    def __init__(self, model=None):
+        """
+        Args:
+            model: Modèle dont les étapes sont collectées (None pour tous)
+        """
+        self.data = {
+            "model": getattr(model, "name", None),
+            "stages": {},
+            "total_seconds": 0.0,
+            "_owner": model
+        }
+
+    def __enter__(self):
+        self._previous = getattr(_state, "trace", None)
+        _state.trace = self.data
+        self._start = time.perf_counter()
+        return self.data
+
+    def __exit__(self, exc_type, exc, tb):
+        self.data["total_seconds"] = time.perf_counter() - self._start
+        self.data.pop("_owner", None)
+        _state.trace = self._previous
+        return False
+
+
+def enable_metrics(port=None):
+    """
+    Active l'export des mesures en histogrammes Prometheus.
+
+    Args:
+        port: Port du serveur HTTP d'exposition à démarrer (optionnel)
+
+    Returns:
+        bool: True si les métriques sont actives
+    """
+    global _metrics, _enabled
+
+    try:
+        from prometheus_client import Histogram, start_http_server
+    except ImportError:
+        print("prometheus_client n'est pas installé, les métriques AIOps sont désactivées")
+        return False
+
+    with _lock:
+        if _metrics is None:
+            _metrics = (
+                Histogram('aiops_stage_duration_seconds', "Durée des étapes des modèles AIOps",
+                          ['model', 'stage'], buckets=DURATION_BUCKETS),
+                Histogram('aiops_stage_rows', "Lignes traitées par étape des modèles AIOps",
+                          ['model', 'stage'], buckets=ROWS_BUCKETS)
+            )
+            if port:
+                start_http_server(port)
+        _enabled = True
+    return True
+
+
+def disable_metrics():
+    """Désactive l'export Prometheus (les histogrammes existants sont conservés)."""
+    global _enabled
+    _enabled = False
+
+
+if AIOPS_METRICS:
+    enable_metrics(AIOPS_METRICS_PORT)
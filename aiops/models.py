@@ -4,71 +4,494 @@
 """
 Modèles AIOps pour la maintenance prédictive et l'optimisation continue
 de l'écosystème cloud automatisé.
+
+Les backends de calcul (scikit-learn, TensorFlow) sont importés à la
+construction du modèle qui en a besoin : un conteneur qui n'exécute que
+des modèles scikit-learn ne charge jamais TensorFlow.
 """
 
 import os
+import copy
 import json
+import math
+import functools
+from collections import deque
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-from tensorflow import keras
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import IsolationForest, RandomForestRegressor
-from sklearn.cluster import DBSCAN
-from statsmodels.tsa.arima.model import ARIMA
-import joblib
+
+from .prediction_log import get_prediction_logger
+from .registry import get_model_registry
+from .artifacts import get_artifact_store
+from .instrumentation import StageTrace, instrumented, stage
+from .sketch import QuantileSketch
+from .drift import FeatureDriftMonitor, build_reference
+from .features import get_feature_pipeline
 
 # Constantes de configuration
 MODEL_PATH = os.environ.get('MODEL_PATH', '/app/models')
 DATA_PATH = os.environ.get('DATA_PATH', '/app/data')
 CONFIG_PATH = os.environ.get('CONFIG_PATH', '/app/config')
 
+# Journalisation des prédictions ('npz', 'parquet', 'jsonl' ou 'off'). Le format par défaut
+# est passé du fichier JSONL unique aux fragments npz : PREDICTION_LOG_FORMAT=jsonl le rétablit.
+# PREDICTION_LOG_MAX_ROWS limite les lignes d'entrée conservées par appel (0 : toutes, comme en JSONL) ;
+# l'échantillonnage et la copie des lignes ont lieu dans le thread d'écriture, pas dans predict()
+PREDICTION_LOG_FORMAT = os.environ.get('PREDICTION_LOG_FORMAT', 'npz')
+PREDICTION_LOG_SAMPLE_RATE = float(os.environ.get('PREDICTION_LOG_SAMPLE_RATE', '1.0'))
+PREDICTION_LOG_MAX_ROWS = int(os.environ.get('PREDICTION_LOG_MAX_ROWS', '0'))
+PREDICTION_LOG_MAX_FILES = int(os.environ.get('PREDICTION_LOG_MAX_FILES', '200'))
+
+# Nombre maximal de séquences envoyées en une fois à l'autoencoder en inférence
+PREDICT_CHUNK_SIZE = int(os.environ.get('PREDICT_CHUNK_SIZE', '4096'))
+
+# Inférence de l'autoencoder : graphe exporté chargé au démarrage, compilation XLA
+# et nombre de threads TensorFlow (0 : valeur par défaut de TensorFlow)
+DEEP_INFERENCE_EXPORT = os.environ.get('DEEP_INFERENCE_EXPORT', 'true').lower() in ('1', 'true', 'yes')
+DEEP_INFERENCE_XLA = os.environ.get('DEEP_INFERENCE_XLA', 'false').lower() in ('1', 'true', 'yes')
+DEEP_INFERENCE_INTRA_THREADS = int(os.environ.get('DEEP_INFERENCE_INTRA_THREADS', '0'))
+DEEP_INFERENCE_INTER_THREADS = int(os.environ.get('DEEP_INFERENCE_INTER_THREADS', '0'))
+
+# Quantile des erreurs de reconstruction utilisé comme seuil de l'autoencoder
+# (0 : moyenne + 3 écarts-types)
+DEEP_THRESHOLD_QUANTILE = float(os.environ.get('DEEP_THRESHOLD_QUANTILE', '0'))
+
+# Taille de l'échantillon d'entraînement constitué lors d'un entraînement hors mémoire
+TRAIN_SAMPLE_SIZE = int(os.environ.get('TRAIN_SAMPLE_SIZE', '100000'))
+
+# Évaluation du clustering : taille de l'échantillon stratifié du score silhouette
+# et mémoire de travail (Mo) des blocs de distances
+EVAL_SILHOUETTE_SAMPLE_SIZE = int(os.environ.get('EVAL_SILHOUETTE_SAMPLE_SIZE', '10000'))
+EVAL_WORKING_MEMORY_MB = int(os.environ.get('EVAL_WORKING_MEMORY_MB', '256'))
+
+# Nombre d'arbres ajoutés à chaque réentraînement incrémental d'un ensemble d'arbres
+ROLLING_NEW_TREES = int(os.environ.get('ROLLING_NEW_TREES', '10'))
+
+# Type flottant des caractéristiques prétraitées ('float64' ou 'float32', deux fois plus compact)
+FEATURE_DTYPE = os.environ.get('AIOPS_FEATURE_DTYPE', 'float64')
+
+# Méthodes chronométrées automatiquement dans les classes dérivées, et nom de leur étape
+INSTRUMENTED_METHODS = {
+    'preprocess_data': 'preprocess',
+    'train': 'train',
+    'train_from_files': 'train_from_files',
+    'train_incremental': 'train_incremental',
+    'predict': 'predict',
+    'predict_next': 'predict_next',
+    'evaluate': 'evaluate'
+}
+
+
+class CompactResult(dict):
+    """
+    Résultat colonnaire retourné par predict(compact=True).
+    
+    Contient les champs de synthèse et des tableaux NumPy par ligne ou par
+    séquence. Les vues détaillées historiques (listes de dicts) ne sont
+    construites qu'au premier accès (indexation, get(), items(), values(),
+    sérialisation JSON...), puis mises en cache : le résultat se comporte
+    comme le dict historique. Chaque vue est décrite par une fonction de
+    niveau module et les tableaux dont elle a besoin, sans référence aux
+    données d'entrée ; le résultat reste sérialisable avec pickle.
+    """
+    
+    def __init__(self, data, lazy_views=None):
+        """
+        Initialise le résultat.
+        
+        Args:
+            data: Champs de synthèse et tableaux NumPy
+            lazy_views: Dict {clé: (fonction, arguments)} des vues construites à la demande
+        """
+        super().__init__(data)
+        self._lazy_views = dict(lazy_views or {})
+    
+    def __missing__(self, key):
+        """Construit une vue détaillée au premier accès."""
+        if key not in self._lazy_views:
+            raise KeyError(key)
+        function, args = self._lazy_views.pop(key)
+        value = function(*args)
+        self[key] = value
+        return value
+    
+    def __contains__(self, key):
+        return super().__contains__(key) or key in self._lazy_views
+    
+    def __iter__(self):
+        yield from super().__iter__()
+        yield from list(self._lazy_views)
+    
+    def __len__(self):
+        return super().__len__() + len(self._lazy_views)
+    
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+    
+    def keys(self):
+        return list(self)
+    
+    def values(self):
+        return [self[key] for key in list(self)]
+    
+    def items(self):
+        return [(key, self[key]) for key in list(self)]
+    
+    def __reduce__(self):
+        return (CompactResult, (self.computed(), self._lazy_views))
+    
+    def computed(self):
+        """Retourne un dict des champs déjà construits, sans construire les vues détaillées."""
+        return {key: dict.__getitem__(self, key) for key in super().__iter__()}
+    
+    def lazy_keys(self):
+        """Retourne les clés des vues détaillées non encore construites."""
+        return list(self._lazy_views)
+
+
+def _timestamp_list(timestamps):
+    """Convertit un tableau d'horodatages en liste (pandas.Timestamp pour les dates)."""
+    return pd.Series(timestamps, copy=False).tolist()
+
+
+def _point_status_view(anomalies, scores, timestamps):
+    """Vue détaillée 'anomaly_status' de la détection d'anomalies par point."""
+    status = [{"status": "anomaly" if a else "normal", "score": s} for a, s in zip(anomalies, scores)]
+    if timestamps is not None:
+        for entry, ts in zip(status, _timestamp_list(timestamps)):
+            entry['timestamp'] = ts
+    return status
+
+
+def _clusters_view(labels, timestamps):
+    """Vue détaillée 'clusters' du clustering : points de chaque cluster."""
+    clusters = {}
+    ts_values = _timestamp_list(timestamps) if timestamps is not None else None
+    for i, label in enumerate(labels.tolist()):
+        item = {"index": i} if ts_values is None else {"index": i, "timestamp": ts_values[i]}
+        clusters.setdefault(str(label), []).append(item)
+    return clusters
+
+
+def _sequence_status_view(anomalies, mse, threshold, sequence_length, timestamps):
+    """Vue détaillée 'anomaly_status' de la détection d'anomalies par séquence."""
+    timestamps = _timestamp_list(timestamps) if timestamps is not None else None
+    threshold = float(threshold)
+    anomaly_results = []
+    
+    for i, (is_anomaly, error) in enumerate(zip(anomalies, mse)):
+        result = {
+            "sequence_idx": i,
+            "start_idx": i,
+            "end_idx": i + sequence_length - 1,
+            "status": "anomaly" if is_anomaly else "normal",
+            "reconstruction_error": float(error),
+            "threshold": threshold
+        }
+        
+        # Ajouter l'horodatage si disponible
+        if timestamps is not None:
+            result["start_time"] = timestamps[i]
+            result["end_time"] = timestamps[i + sequence_length - 1]
+        
+        anomaly_results.append(result)
+    
+    return anomaly_results
+
+
 class BaseAIOpsModel:
-    """Classe de base pour tous les modèles AIOps."""
+    """
+    Classe de base pour tous les modèles AIOps.
+    
+    Les méthodes listées dans INSTRUMENTED_METHODS sont chronométrées dans
+    toutes les classes dérivées (histogrammes Prometheus et trace par appel,
+    voir aiops.instrumentation). Le temps propre de predict(), hors
+    sous-étapes mesurées, est attribué à l'étape 'postprocess'.
+    
+    Les caractéristiques normalisées vues en prédiction alimentent un
+    moniteur de dérive (voir aiops.drift), comparé à la référence calculée
+    à l'entraînement ; `on_drift(model, report)` est appelé une fois lorsque
+    la dérive dépasse le seuil.
+    """
     
-    def __init__(self, name, version='1.0.0'):
-        """Initialise le modèle avec un nom et une version."""
+    def __init_subclass__(cls, **kwargs):
+        """Instrumente les méthodes d'étape définies par la classe dérivée."""
+        super().__init_subclass__(**kwargs)
+        for method_name, stage_name in INSTRUMENTED_METHODS.items():
+            method = cls.__dict__.get(method_name)
+            if callable(method):
+                self_stage = 'postprocess' if method_name == 'predict' else None
+                setattr(cls, method_name, instrumented(stage_name, self_stage)(method))
+    
+    def __init__(self, name, version='1.0.0', model_dir=None, dtype=None):
+        """
+        Initialise le modèle avec un nom et une version.
+        
+        Args:
+            name: Nom du modèle
+            version: Version du modèle
+            model_dir: Répertoire des artefacts (par défaut MODEL_PATH)
+            dtype: Type flottant des caractéristiques prétraitées (par défaut FEATURE_DTYPE)
+        """
         self.name = name
         self.version = version
+        self.model_dir = model_dir or MODEL_PATH
+        self.dtype = np.dtype(dtype or FEATURE_DTYPE)
         self.model = None
         self.scaler = None
         self.is_trained = False
+        self.drift_monitor = None
+        self.on_drift = None  # Appelé avec (modèle, rapport) lorsque la dérive dépasse le seuil
+        self.pending_save = None  # Future de la dernière sauvegarde en arrière-plan
         
         # Créer les répertoires nécessaires
-        os.makedirs(MODEL_PATH, exist_ok=True)
+        os.makedirs(self.model_dir, exist_ok=True)
         os.makedirs(DATA_PATH, exist_ok=True)
         
         # Chemin du modèle sauvegardé
-        self.model_path = f"{MODEL_PATH}/{self.name}_{self.version}.joblib"
-        self.scaler_path = f"{MODEL_PATH}/{self.name}_{self.version}_scaler.joblib"
+        self._set_version(version)
         
         # Chargement du modèle s'il existe
         self._load_if_exists()
     
+    def _set_version(self, version):
+        """Met à jour la version et les chemins d'artefacts associés."""
+        self.version = version
+        self.model_path = f"{self.model_dir}/{self.name}_{self.version}.joblib"
+        self.scaler_path = f"{self.model_dir}/{self.name}_{self.version}_scaler.joblib"
+        self.drift_path = f"{self.model_dir}/{self.name}_{self.version}_drift.joblib"
+    
     def _load_if_exists(self):
-        """Charge le modèle s'il existe déjà."""
+        """
+        Charge le modèle s'il existe déjà.
+        
+        Les artefacts passent par le registre du processus : un artefact
+        chargé est réutilisé par toutes les instances du processus. Les
+        sauvegardes en cours dans le répertoire sont d'abord terminées.
+        """
+        get_artifact_store().wait(self.model_dir)
         if os.path.exists(self.model_path):
             try:
-                self.model = joblib.load(self.model_path)
+                registry = get_model_registry()
+                previous_model = self.model
+                self.model = registry.load(self.model_path)
                 if os.path.exists(self.scaler_path):
-                    self.scaler = joblib.load(self.scaler_path)
+                    self.scaler = registry.load(self.scaler_path)
+                if os.path.exists(self.drift_path):
+                    self._set_drift_reference(registry.load(self.drift_path))
                 self.is_trained = True
-                print(f"Modèle {self.name} chargé depuis {self.model_path}")
+                if self.model is not previous_model:
+                    print(f"Modèle {self.name} chargé depuis {self.model_path}")
             except Exception as e:
                 print(f"Erreur lors du chargement du modèle {self.name}: {str(e)}")
     
+    def refresh(self, version=None):
+        """
+        Recharge à chaud le modèle si un nouvel artefact a été publié.
+        
+        Args:
+            version: Nouvelle version à charger (par défaut, la version courante)
+            
+        Returns:
+            bool: True si un nouveau modèle a été chargé
+        """
+        previous_version = self.version
+        previous_model, previous_scaler = self.model, self.scaler
+        
+        if version is not None and version != self.version:
+            self._set_version(version)
+        
+        self._load_if_exists()
+        
+        # Le scaler suffit à détecter un rechargement lorsque le modèle est chargé à la demande
+        changed = self.model is not previous_model or self.scaler is not previous_scaler
+        
+        if self.version != previous_version and not changed:
+            self._set_version(previous_version)
+            raise ValueError(f"Aucun artefact trouvé pour la version {version} du modèle {self.name}")
+        
+        return changed
+    
+    def _artifacts(self):
+        """Retourne les objets à sauvegarder, par chemin d'artefact."""
+        artifacts = {self.model_path: self.model}
+        if self.scaler is not None:
+            artifacts[self.scaler_path] = self.scaler
+        if self.drift_monitor is not None:
+            artifacts[self.drift_path] = self.drift_monitor.reference
+        return artifacts
+    
     def save_model(self):
-        """Sauvegarde le modèle et le scaler."""
-        if self.model is not None:
-            joblib.dump(self.model, self.model_path)
-            if self.scaler is not None:
-                joblib.dump(self.scaler, self.scaler_path)
-            print(f"Modèle {self.name} sauvegardé dans {self.model_path}")
+        """
+        Sauvegarde le modèle et ses composants.
+        
+        La sérialisation, l'écriture sur le disque et la publication dans le
+        manifeste du répertoire se font en arrière-plan.
+        
+        Returns:
+            concurrent.futures.Future: Sauvegarde en cours (None si le modèle n'est pas entraîné)
+        """
+        if self.model is None:
+            return None
+        
+        model_path = self.model_path
+        self.pending_save = get_artifact_store().save(
+            self._artifacts(),
+            callback=lambda: print(f"Modèle {self.name} sauvegardé dans {model_path}")
+        )
+        return self.pending_save
+    
+    def wait_saved(self, timeout=None):
+        """
+        Attend la fin de la dernière sauvegarde du modèle.
+        
+        train() retourne avant la fin de l'écriture : c'est ici qu'un échec de
+        la sauvegarde en arrière-plan est signalé à l'appelant.
+        
+        Args:
+            timeout: Délai maximal d'attente (secondes)
+            
+        Returns:
+            dict: Entrées publiées du manifeste, par chemin (None sans sauvegarde en cours)
+            
+        Raises:
+            Exception: L'erreur de la sauvegarde si elle a échoué (les artefacts
+                précédents restent alors publiés)
+        """
+        if self.pending_save is None:
+            return None
+        return self.pending_save.result(timeout)
     
     def preprocess_data(self, data):
         """Prétraitement des données avant entraînement ou prédiction."""
         raise NotImplementedError("Cette méthode doit être implémentée dans les classes dérivées")
     
+    def _feature_matrix(self, data, columns):
+        """
+        Extrait les caractéristiques dans un tableau de type self.dtype.
+        
+        Les colonnes sont converties directement dans le tableau final (une
+        seule copie), puis les valeurs manquantes sont remplacées en place
+        par la moyenne de leur colonne.
+        
+        Args:
+            data: DataFrame pandas
+            columns: Colonnes à extraire, dans l'ordre
+            
+        Returns:
+            numpy.ndarray: Matrice (n, len(columns))
+        """
+        X = np.empty((len(data), len(columns)), dtype=self.dtype)
+        for j, column in enumerate(columns):
+            X[:, j] = data[column].to_numpy()
+        
+        missing = np.isnan(X)
+        if missing.any():
+            rows, cols = np.nonzero(missing)
+            X[rows, cols] = np.nanmean(X, axis=0)[cols]
+        
+        return X
+    
+    def _fit_estimator(self, *args):
+        """
+        Ajuste une copie non entraînée de l'estimateur et la substitue au modèle.
+        
+        L'estimateur chargé est partagé par le registre entre les instances du
+        processus et peut servir à un predict() concurrent : il n'est jamais
+        réajusté en place.
+        
+        Args:
+            *args: Arguments de fit() (X, et y pour un modèle supervisé)
+            
+        Returns:
+            object: Le nouvel estimateur entraîné
+        """
+        from sklearn.base import clone
+        
+        model = clone(self.model)
+        model.fit(*args)
+        self.model = model
+        return model
+    
+    def _scale_features(self, X, columns):
+        """
+        Normalise en place une matrice de caractéristiques avec le scaler.
+        
+        Le scaler est ajusté si le modèle n'est pas encore entraîné. La
+        normalisation est appliquée sur place dans le type de X, sans la
+        conversion en float64 ni la copie de scaler.transform().
+        
+        Args:
+            X: Matrice retournée par _feature_matrix()
+            columns: Noms des colonnes (conservés dans le scaler)
+            
+        Returns:
+            numpy.ndarray: X normalisée
+        """
+        if not self.is_trained:
+            self.scaler.fit(pd.DataFrame(X, columns=columns, copy=False))
+        
+        if self.scaler.mean_ is not None:
+            X -= self.scaler.mean_.astype(X.dtype)
+        if self.scaler.scale_ is not None:
+            X /= self.scaler.scale_.astype(X.dtype)
+        
+        return X
+    
+    def _set_drift_reference(self, reference):
+        """Associe une référence de dérive au modèle, en conservant le moniteur si elle est inchangée."""
+        if reference is None:
+            self.drift_monitor = None
+        elif self.drift_monitor is None or self.drift_monitor.reference is not reference:
+            self.drift_monitor = FeatureDriftMonitor(reference)
+    
+    def _fit_drift_reference(self, X, columns):
+        """
+        Calcule la référence de dérive sur les caractéristiques normalisées d'entraînement.
+        
+        Args:
+            X: Matrice normalisée d'entraînement
+            columns: Noms des caractéristiques
+        """
+        self._set_drift_reference(build_reference(X, columns))
+    
+    def _track_drift(self, X):
+        """
+        Met à jour le moniteur de dérive avec des caractéristiques normalisées de prédiction.
+        
+        Appelée uniquement par les chemins de prédiction : les données
+        d'entraînement et d'évaluation ne sont pas du trafic de production.
+        
+        Args:
+            X: Matrice normalisée (n, n_features)
+        """
+        monitor = self.drift_monitor
+        if monitor is None or not self.is_trained or np.ndim(X) != 2:
+            return
+        if X.shape[1] != len(monitor.reference["columns"]):
+            return
+        
+        with self._stage('drift', len(X)):
+            monitor.update(X)
+            if self.on_drift is not None and not monitor.triggered and monitor.drifted():
+                monitor.triggered = True
+                self.on_drift(self, monitor.report())
+    
+    def drift_report(self):
+        """
+        Retourne l'état de la dérive des caractéristiques depuis le chargement ou le dernier entraînement.
+        
+        Returns:
+            dict: Rapport de FeatureDriftMonitor.report(), ou None sans référence
+        """
+        if self.drift_monitor is None:
+            return None
+        return self.drift_monitor.report()
+    
+    def _reset_drift(self):
+        """Repart de statistiques vides après un réentraînement qui conserve la référence."""
+        if self.drift_monitor is not None:
+            self.drift_monitor.reset()
+    
     def train(self, data):
         """Entraîne le modèle avec les données fournies."""
         raise NotImplementedError("Cette méthode doit être implémentée dans les classes dérivées")
@@ -94,8 +517,54 @@ class BaseAIOpsModel:
         }
         return metadata
     
+    def trace(self):
+        """
+        Collecte le détail des étapes de ce modèle exécutées dans un bloc `with`.
+        
+        Returns:
+            StageTrace: Gestionnaire de contexte retournant le dict de trace
+                ({"stages": {étape: {"seconds", "calls", "rows"}}, "total_seconds"})
+        """
+        return StageTrace(self)
+    
+    def _stage(self, name, rows=None):
+        """Retourne le chronomètre d'une étape interne (ex. 'estimator')."""
+        return stage(self, name, rows)
+    
+    @instrumented('log_prediction')
     def log_prediction(self, input_data, prediction, feedback=None):
-        """Enregistre les prédictions pour traçabilité et amélioration continue."""
+        """
+        Enregistre les prédictions pour traçabilité et amélioration continue.
+        
+        Par défaut, l'entrée est confiée au writer colonnaire partagé du modèle,
+        qui l'écrit en arrière-plan sans bloquer predict(), sous forme de
+        fragments npz dans {DATA_PATH}/{nom}_predictions/ (et non plus dans
+        {DATA_PATH}/{nom}_predictions.jsonl). Le format JSONL historique reste
+        disponible via PREDICTION_LOG_FORMAT=jsonl.
+        
+        Args:
+            input_data: Données d'entrée (DataFrame, dict ou liste de dicts)
+            prediction: Résultat de la prédiction
+            feedback: Retour éventuel sur la prédiction
+        """
+        if PREDICTION_LOG_FORMAT == 'off':
+            return
+        
+        if PREDICTION_LOG_FORMAT != 'jsonl':
+            writer = get_prediction_logger(
+                self.name,
+                f"{DATA_PATH}/{self.name}_predictions",
+                fmt=PREDICTION_LOG_FORMAT,
+                sample_rate=PREDICTION_LOG_SAMPLE_RATE,
+                max_rows_per_entry=PREDICTION_LOG_MAX_ROWS or None,
+                max_files=PREDICTION_LOG_MAX_FILES
+            )
+            writer.submit(input_data, prediction, feedback=feedback, model_version=self.version)
+            return
+        
+        if isinstance(input_data, pd.DataFrame):
+            input_data = input_data.to_dict(orient='records')
+        
         log_entry = {
             "timestamp": pd.Timestamp.now().isoformat(),
             "model_name": self.name,
@@ -107,13 +576,117 @@ class BaseAIOpsModel:
         
         log_path = f"{DATA_PATH}/{self.name}_predictions.jsonl"
         with open(log_path, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+            f.write(json.dumps(log_entry, default=str) + '\n')
+
+
+def _iter_metric_chunks(paths, columns, chunksize):
+    """
+    Lit des fichiers de métriques CSV ou Parquet par blocs de lignes.
+    
+    Args:
+        paths: Chemin ou liste de chemins
+        columns: Colonnes à lire (les autres ne sont pas chargées)
+        chunksize: Nombre de lignes par bloc
+        
+    Yields:
+        DataFrame: Bloc de lignes
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    
+    for path in paths:
+        path = os.fspath(path)
+        if path.endswith('.parquet'):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("pyarrow est nécessaire pour lire les fichiers Parquet")
+            
+            parquet_file = pq.ParquetFile(path)
+            missing = [c for c in columns if c not in parquet_file.schema_arrow.names]
+            if missing:
+                raise ValueError(f"La caractéristique '{missing[0]}' est manquante dans {path}")
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=list(columns)):
+                yield batch.to_pandas()
+        else:
+            try:
+                reader = pd.read_csv(path, usecols=list(columns), chunksize=chunksize)
+            except ValueError as e:
+                raise ValueError(f"Colonnes manquantes dans {path}: {str(e)}")
+            with reader:
+                yield from reader
+
+
+def _roll_forest(forest, fit, new_trees, max_trees):
+    """
+    Ajoute à un ensemble d'arbres entraîné des arbres ajustés sur une nouvelle fenêtre et retire les plus anciens.
+    
+    Les nouveaux arbres sont ajustés par warm_start sur la seule nouvelle
+    fenêtre : le coût dépend de sa taille, pas de l'historique. L'ensemble
+    reçu, éventuellement partagé par le registre, n'est pas modifié.
+    
+    Pour un IsolationForest, les nouveaux arbres tirent le même nombre
+    d'échantillons que les anciens (max_samples_), dont dépend la
+    normalisation commune des profondeurs ; la fenêtre doit contenir au
+    moins max_samples_ lignes (vérifié par l'appelant). Les graines de
+    bagging (_seeds) restent alignées sur estimators_ ; estimators_samples_
+    n'est toutefois significatif que pour les arbres de la dernière fenêtre.
+    
+    Args:
+        forest: IsolationForest ou RandomForest entraîné
+        fit: Fonction ajustant l'ensemble (en mode warm_start) sur la nouvelle fenêtre
+        new_trees: Nombre d'arbres à ajouter
+        max_trees: Nombre maximal d'arbres conservés (les plus anciens sont retirés)
+        
+    Returns:
+        tuple: (forest, retired) - Nouvel ensemble et nombre d'arbres retirés
+    """
+    if max_trees < 1:
+        raise ValueError("Le nombre maximal d'arbres doit être au moins 1")
+    
+    forest = copy.copy(forest)
+    forest.estimators_ = list(forest.estimators_)
+    if hasattr(forest, 'estimators_features_'):
+        forest.estimators_features_ = list(forest.estimators_features_)
+    previous_seeds = getattr(forest, '_seeds', None)
+    
+    # Graine dérivée du dernier arbre : les nouveaux arbres ne rejouent pas les tirages des arbres conservés
+    seed = int(np.random.default_rng(forest.estimators_[-1].random_state).integers(2 ** 31 - 1))
+    params = {"warm_start": True, "n_estimators": len(forest.estimators_) + new_trees, "random_state": seed}
+    max_samples = getattr(forest, 'max_samples_', None)
+    if max_samples is not None:
+        params["max_samples"] = max_samples
+    original_max_samples = forest.get_params().get('max_samples')
+    forest.set_params(**params)
+    fit(forest)
+    
+    # warm_start ne conserve que les graines des nouveaux arbres
+    if previous_seeds is not None and len(previous_seeds) + len(forest._seeds) == len(forest.estimators_):
+        forest._seeds = np.concatenate([previous_seeds, forest._seeds])
+    
+    retired = max(len(forest.estimators_) - max_trees, 0)
+    if retired:
+        del forest.estimators_[:retired]
+        if hasattr(forest, 'estimators_features_'):
+            del forest.estimators_features_[:retired]
+        if previous_seeds is not None:
+            forest._seeds = forest._seeds[retired:]
+        # Profondeurs précalculées par arbre de l'IsolationForest
+        for attribute in ('_average_path_length_per_tree', '_decision_path_lengths'):
+            if hasattr(forest, attribute):
+                setattr(forest, attribute, getattr(forest, attribute)[retired:])
+    
+    forest.set_params(warm_start=False, n_estimators=len(forest.estimators_))
+    if max_samples is not None:
+        forest.set_params(max_samples=original_max_samples)
+    return forest, retired
 
 
 class AnomalyDetectionModel(BaseAIOpsModel):
     """Modèle de détection d'anomalies pour la surveillance des métriques du système."""
     
-    def __init__(self, features=None, contamination=0.01, version='1.0.0'):
+    def __init__(self, features=None, contamination=0.01, version='1.0.0', model_dir=None,
+                 dtype=None):
         """
         Initialise le modèle de détection d'anomalies.
         
@@ -121,8 +694,10 @@ class AnomalyDetectionModel(BaseAIOpsModel):
             features: Liste des caractéristiques à utiliser
             contamination: Pourcentage attendu d'anomalies dans les données
             version: Version du modèle
+            model_dir: Répertoire des artefacts (par défaut MODEL_PATH)
+            dtype: Type flottant des caractéristiques prétraitées (par défaut FEATURE_DTYPE)
         """
-        super().__init__(name="anomaly_detection", version=version)
+        super().__init__(name="anomaly_detection", version=version, model_dir=model_dir, dtype=dtype)
         self.contamination = contamination
         self.features = features or [
             'cpu_usage', 'memory_usage', 'network_in', 'network_out',
@@ -130,6 +705,9 @@ class AnomalyDetectionModel(BaseAIOpsModel):
         ]
         
         if not self.is_trained:
+            from sklearn.ensemble import IsolationForest
+            from sklearn.preprocessing import StandardScaler
+            
             self.model = IsolationForest(
                 contamination=self.contamination,
                 random_state=42,
@@ -153,19 +731,11 @@ class AnomalyDetectionModel(BaseAIOpsModel):
             if feature not in data.columns:
                 raise ValueError(f"La caractéristique '{feature}' est manquante dans les données")
         
-        # Sélectionner uniquement les caractéristiques pertinentes
-        X = data[self.features].copy()
-        
-        # Remplacer les valeurs manquantes
-        X.fillna(X.mean(), inplace=True)
+        # Sélectionner les caractéristiques et remplacer les valeurs manquantes
+        X = self._feature_matrix(data, self.features)
         
         # Normaliser les données
-        if not self.is_trained:
-            X_scaled = self.scaler.fit_transform(X)
-        else:
-            X_scaled = self.scaler.transform(X)
-        
-        return X_scaled
+        return self._scale_features(X, self.features)
     
     def train(self, data):
         """
@@ -178,9 +748,10 @@ class AnomalyDetectionModel(BaseAIOpsModel):
             self: Le modèle entraîné
         """
         X_scaled = self.preprocess_data(data)
+        self._fit_drift_reference(X_scaled, self.features)
         
         # Entraîner le modèle
-        self.model.fit(X_scaled)
+        self._fit_estimator(X_scaled)
         self.is_trained = True
         
         # Sauvegarder le modèle
@@ -188,12 +759,133 @@ class AnomalyDetectionModel(BaseAIOpsModel):
         
         return self
     
-    def predict(self, data):
+    def train_from_files(self, paths, chunksize=100000, sample_size=TRAIN_SAMPLE_SIZE, seed=42):
+        """
+        Entraîne le modèle en une seule passe sur des fichiers trop gros pour la mémoire.
+        
+        Les fichiers CSV ou Parquet sont lus par blocs : le scaler est ajusté
+        de manière incrémentale (partial_fit) et un échantillon uniforme de
+        lignes est maintenu par échantillonnage en réservoir. L'IsolationForest,
+        qui ne sous-échantillonne de toute façon que quelques centaines de
+        lignes par arbre, est ensuite entraîné sur cet échantillon. La mémoire
+        consommée est bornée par chunksize et sample_size, quelle que soit la
+        taille des fichiers.
+        
+        Args:
+            paths: Chemin ou liste de chemins (.csv, .csv.gz, .parquet)
+            chunksize: Nombre de lignes lues par bloc
+            sample_size: Taille de l'échantillon d'entraînement de l'IsolationForest
+            seed: Graine de l'échantillonnage
+            
+        Returns:
+            self: Le modèle entraîné
+        """
+        from sklearn.preprocessing import StandardScaler
+        
+        rng = np.random.default_rng(seed)
+        scaler = StandardScaler()
+        sample = np.empty((sample_size, len(self.features)), dtype=self.dtype)
+        n_seen = 0
+        
+        for chunk in _iter_metric_chunks(paths, self.features, chunksize):
+            X = np.empty((len(chunk), len(self.features)), dtype=self.dtype)
+            for j, feature in enumerate(self.features):
+                X[:, j] = chunk[feature].to_numpy()
+            
+            # Les valeurs manquantes sont ignorées par partial_fit
+            scaler.partial_fit(pd.DataFrame(X, columns=self.features, copy=False))
+            
+            # Remplir d'abord le réservoir, puis remplacer avec une probabilité sample_size / (i + 1)
+            n_fill = min(max(sample_size - n_seen, 0), len(X))
+            sample[n_seen:n_seen + n_fill] = X[:n_fill]
+            if n_fill < len(X):
+                positions = rng.integers(0, np.arange(n_seen + n_fill, n_seen + len(X)) + 1)
+                kept = positions < sample_size
+                sample[positions[kept]] = X[n_fill:][kept]
+            n_seen += len(X)
+        
+        if n_seen == 0:
+            raise ValueError("Aucune donnée lue dans les fichiers d'entraînement")
+        
+        sample = sample[:min(n_seen, sample_size)]
+        
+        # Imputation par la moyenne globale puis normalisation en place
+        missing = np.isnan(sample)
+        if missing.any():
+            sample[missing] = np.broadcast_to(scaler.mean_.astype(self.dtype), sample.shape)[missing]
+        sample -= scaler.mean_.astype(self.dtype)
+        sample /= scaler.scale_.astype(self.dtype)
+        
+        # Entraîner le modèle
+        self.scaler = scaler
+        self._fit_drift_reference(sample, self.features)
+        self._fit_estimator(sample)
+        self.is_trained = True
+        print(f"Modèle {self.name} entraîné sur {len(sample)} lignes échantillonnées parmi {n_seen}")
+        
+        # Sauvegarder le modèle
+        self.save_model()
+        
+        return self
+    
+    def train_incremental(self, data, new_trees=ROLLING_NEW_TREES, max_trees=None):
+        """
+        Réentraîne le modèle sur la fenêtre la plus récente, sans repartir de zéro.
+        
+        Des arbres ajustés sur data seule sont ajoutés à l'IsolationForest et les
+        plus anciens sont retirés (ensemble glissant) ; le seuil de décision est
+        recalculé sur data. Le scaler et la référence de dérive de l'entraînement
+        initial sont conservés ; les statistiques de dérive repartent de zéro, et
+        on_drift peut de nouveau être déclenché. Si le modèle n'est pas entraîné,
+        équivaut à train().
+        
+        Args:
+            data: DataFrame pandas avec les métriques de la nouvelle fenêtre
+            new_trees: Nombre d'arbres ajoutés
+            max_trees: Nombre maximal d'arbres (par défaut, la taille actuelle de l'ensemble)
+            
+        Returns:
+            self: Le modèle mis à jour
+            
+        Raises:
+            ValueError: Si la fenêtre compte moins de lignes que max_samples_ de l'IsolationForest
+        """
+        if not self.is_trained:
+            return self.train(data)
+        
+        X_scaled = self.preprocess_data(data)
+        
+        # Les nouveaux arbres doivent tirer autant d'échantillons que les anciens
+        if len(X_scaled) < self.model.max_samples_:
+            raise ValueError(f"La nouvelle fenêtre doit contenir au moins {self.model.max_samples_} lignes "
+                             f"(max_samples_ de l'IsolationForest), reçu {len(X_scaled)}")
+        
+        forest, retired = _roll_forest(
+            self.model, lambda forest: forest.fit(X_scaled), new_trees, len(self.model.estimators_) if max_trees is None else max_trees
+        )
+        
+        # Seuil recalculé avec l'ensemble final, sur la nouvelle fenêtre
+        if forest.contamination != 'auto':
+            forest.offset_ = np.percentile(forest.score_samples(X_scaled), 100.0 * forest.contamination)
+        
+        self.model = forest
+        self._reset_drift()
+        print(f"Modèle {self.name} mis à jour sur {len(X_scaled)} lignes : "
+              f"{new_trees} arbres ajoutés, {retired} retirés")
+        
+        # Sauvegarder le modèle
+        self.save_model()
+        
+        return self
+    
+    def predict(self, data, compact=False):
         """
         Prédit si les points de données sont des anomalies.
         
         Args:
             data: DataFrame pandas avec les métriques du système
+            compact: Si True, retourne un CompactResult avec des tableaux NumPy
+                ('anomalies', 'scores', 'timestamps') au lieu de dicts par ligne
             
         Returns:
             dict: Résultats avec les points de données et leur statut (anomalie ou normal)
@@ -202,10 +894,28 @@ class AnomalyDetectionModel(BaseAIOpsModel):
             raise ValueError("Le modèle n'est pas entraîné. Appelez d'abord train().")
         
         X_scaled = self.preprocess_data(data)
+        self._track_drift(X_scaled)
         
         # Prédire les anomalies (-1 pour anomalie, 1 pour normal)
-        predictions = self.model.predict(X_scaled)
-        scores = self.model.decision_function(X_scaled)
+        with self._stage('estimator', len(X_scaled)):
+            predictions = self.model.predict(X_scaled)
+            scores = self.model.decision_function(X_scaled)
+        
+        if compact:
+            anomalies = predictions == -1
+            timestamps = data['timestamp'].to_numpy() if 'timestamp' in data.columns else None
+            
+            result = CompactResult({
+                "anomalies_detected": int(anomalies.sum()),
+                "total_points": len(predictions),
+                "anomalies": anomalies,
+                "scores": scores
+            }, {"anomaly_status": (_point_status_view, (anomalies, scores, timestamps))})
+            if timestamps is not None:
+                result["timestamps"] = timestamps
+            
+            self.log_prediction(data, result)
+            return result
         
         # Convertir les prédictions en état d'anomalie
         anomaly_status = [{"status": "anomaly" if p == -1 else "normal", "score": s} 
@@ -217,14 +927,92 @@ class AnomalyDetectionModel(BaseAIOpsModel):
                 anomaly_status[i]['timestamp'] = ts
         
         # Enregistrer les prédictions
-        self.log_prediction(data.to_dict(orient='records'), anomaly_status)
+        self.log_prediction(data, anomaly_status)
         
         return {
             "anomalies_detected": (predictions == -1).sum(),
             "total_points": len(predictions),
             "anomaly_status": anomaly_status
         }
-    
+
+    def _stream_matrix(self, item):
+        """
+        Convertit un élément du flux en matrice de caractéristiques brutes.
+
+        Args:
+            item: Échantillon unique (dict), liste de dicts ou DataFrame pandas
+
+        Returns:
+            tuple: (X, timestamps) - Matrice (n, n_features) de type self.dtype et horodatages éventuels
+        """
+        if isinstance(item, pd.DataFrame):
+            for feature in self.features:
+                if feature not in item.columns:
+                    raise ValueError(f"La caractéristique '{feature}' est manquante dans les données")
+            X = item[self.features].to_numpy(dtype=self.dtype, copy=True)
+            timestamps = item['timestamp'].tolist() if 'timestamp' in item.columns else None
+            return X, timestamps
+
+        samples = [item] if isinstance(item, dict) else list(item)
+        X = np.array(
+            [[sample.get(feature, np.nan) for feature in self.features] for sample in samples],
+            dtype=self.dtype
+        ).reshape(len(samples), len(self.features))
+        timestamps = None
+        if samples and all('timestamp' in sample for sample in samples):
+            timestamps = [sample['timestamp'] for sample in samples]
+        return X, timestamps
+
+    def score_stream(self, stream):
+        """
+        Évalue en continu un flux d'échantillons ou de micro-batchs de métriques.
+
+        Le scaler et l'IsolationForest entraînés sont réutilisés tels quels pour
+        chaque élément : seules les nouvelles données sont traitées, et la mémoire
+        consommée est bornée par la taille du plus grand micro-batch. Les valeurs
+        manquantes sont remplacées par la moyenne d'entraînement du scaler.
+
+        Args:
+            stream: Itérable d'échantillons (dict), de listes de dicts ou de DataFrames
+
+        Yields:
+            dict: Résultat de chaque élément du flux (scores, masque d'anomalies, horodatages)
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle n'est pas entraîné. Appelez d'abord train().")
+
+        # Paramètres de normalisation figés pour toute la durée du flux
+        mean = self.scaler.mean_.astype(self.dtype)
+        scale = self.scaler.scale_.astype(self.dtype)
+
+        for item in stream:
+            X, timestamps = self._stream_matrix(item)
+            if len(X) == 0:
+                continue
+
+            # Imputation par la moyenne d'entraînement puis normalisation en place
+            nan_mask = np.isnan(X)
+            if nan_mask.any():
+                X[nan_mask] = np.broadcast_to(mean, X.shape)[nan_mask]
+            X -= mean
+            X /= scale
+            self._track_drift(X)
+
+            # predict() de l'IsolationForest équivaut au signe de decision_function()
+            scores = self.model.decision_function(X)
+            anomalies = scores < 0
+
+            result = {
+                "anomalies_detected": int(anomalies.sum()),
+                "total_points": len(scores),
+                "scores": scores,
+                "anomalies": anomalies
+            }
+            if timestamps is not None:
+                result["timestamps"] = timestamps
+
+            yield result
+
     def evaluate(self, data, labels=None):
         """
         Évalue les performances du modèle de détection d'anomalies.
@@ -270,28 +1058,156 @@ class AnomalyDetectionModel(BaseAIOpsModel):
         return metrics
 
 
-class ResourcePredictionModel(BaseAIOpsModel):
-    """Modèle de prédiction des besoins en ressources pour l'auto-scaling."""
+class OnlineLagState:
+    """
+    État incrémental des caractéristiques décalées et moyennes mobiles d'une série.
+    
+    Reproduit _create_lagged_features() valeur par valeur : un tampon circulaire
+    conserve l'historique nécessaire et des sommes glissantes évitent de
+    recalculer les moyennes mobiles.
+    """
     
-    def __init__(self, features=None, target='cpu_usage', horizon=12, version='1.0.0'):
+    def __init__(self, lags=(1, 3, 6, 12), windows=(3, 6)):
         """
-        Initialise le modèle de prédiction des ressources.
+        Initialise l'état.
         
         Args:
-            features: Liste des caractéristiques à utiliser
+            lags: Décalages à produire
+            windows: Tailles des moyennes mobiles à produire
+        """
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+        self.history = deque(maxlen=max(max(self.lags), max(self.windows)) + 1)
+        self.sums = {window: 0.0 for window in self.windows}
+    
+    def update(self, value):
+        """Ajoute une nouvelle valeur de la série en O(1)."""
+        for window in self.windows:
+            if len(self.history) >= window:
+                self.sums[window] -= self.history[-window]
+            self.sums[window] += value
+        self.history.append(value)
+    
+    def features(self, prefix):
+        """
+        Retourne les caractéristiques décalées pour la dernière valeur ajoutée.
+        
+        Tant que l'historique est plus court que le décalage demandé, la valeur
+        la plus ancienne connue est utilisée et les moyennes mobiles portent sur
+        les valeurs disponibles, afin de ne jamais écarter d'échantillon.
+        
+        Args:
+            prefix: Nom de la série cible
+            
+        Returns:
+            dict: Caractéristiques nommées comme dans _create_lagged_features()
+        """
+        n = len(self.history)
+        if n == 0:
+            raise ValueError("Aucune valeur n'a été ajoutée à l'état en ligne")
+        
+        features = {}
+        for lag in self.lags:
+            features[f'{prefix}_lag_{lag}'] = self.history[-1 - lag] if n > lag else self.history[0]
+        for window in self.windows:
+            features[f'{prefix}_rolling_mean_{window}'] = self.sums[window] / min(window, n)
+        return features
+
+
+def _attach_shared_matrix(name):
+    """Ouvre un segment de mémoire partagée existant sans le confier au resource tracker."""
+    from multiprocessing import shared_memory
+    
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 : pas de paramètre track
+        return shared_memory.SharedMemory(name=name)
+
+
+def _future_targets(values, horizon):
+    """
+    Construit la matrice des valeurs futures d'une série pour l'apprentissage direct.
+    
+    Args:
+        values: Série cible (tableau 1D)
+        horizon: Nombre de pas futurs
+        
+    Returns:
+        numpy.ndarray: Matrice (n, horizon) où la colonne k contient la valeur à t+k+1 (NaN au-delà de la série)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    future = np.full((len(values), horizon), np.nan)
+    if len(values) > horizon:
+        future[:len(values) - horizon] = np.lib.stride_tricks.sliding_window_view(values[1:], horizon)
+    return future
+
+
+def _fit_resource_target(shm_name, shape, columns, feature_idx, target_idx, mask, scaler, estimator, horizon=0):
+    """
+    Entraîne le scaler et l'estimateur d'une cible sur la matrice partagée.
+    
+    Exécutée dans un processus du pool : seules les lignes et colonnes de la
+    cible sont copiées depuis la mémoire partagée.
+    
+    Args:
+        horizon: Nombre de pas futurs à prédire (0 pour la valeur courante)
+    
+    Returns:
+        tuple: (scaler, estimator) entraînés
+    """
+    shm = _attach_shared_matrix(shm_name)
+    try:
+        matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        X = pd.DataFrame(matrix[np.ix_(mask, feature_idx)], columns=[columns[i] for i in feature_idx])
+        if horizon:
+            y = _future_targets(matrix[:, target_idx], horizon)[mask]
+        else:
+            y = matrix[mask, target_idx]
+        del matrix
+    finally:
+        shm.close()
+    
+    X_scaled = scaler.fit_transform(X)
+    estimator.fit(X_scaled, y)
+    return scaler, estimator
+
+
+class ResourcePredictionModel(BaseAIOpsModel):
+    """Modèle de prédiction des besoins en ressources pour l'auto-scaling."""
+    
+    def __init__(self, features=None, target='cpu_usage', horizon=12, version='1.0.0', multi_horizon=False,
+                 model_dir=None, dtype=None):
+        """
+        Initialise le modèle de prédiction des ressources.
+        
+        Args:
+            features: Liste des caractéristiques à utiliser
             target: Métrique cible à prédire
             horizon: Horizon de prédiction (en unités de temps)
             version: Version du modèle
+            multi_horizon: Si True, le modèle prédit directement les `horizon` pas
+                futurs en une seule passe (artefact distinct, suffixé par l'horizon)
+            model_dir: Répertoire des artefacts (par défaut MODEL_PATH)
+            dtype: Type flottant des caractéristiques prétraitées (par défaut FEATURE_DTYPE)
         """
-        super().__init__(name=f"resource_prediction_{target}", version=version)
+        name = f"resource_prediction_{target}"
+        if multi_horizon:
+            name = f"{name}_h{horizon}"
+        super().__init__(name=name, version=version, model_dir=model_dir, dtype=dtype)
         self.target = target
         self.horizon = horizon
+        self.multi_horizon = multi_horizon
         self.features = features or [
             'cpu_usage', 'memory_usage', 'request_rate', 'time_of_day', 
             'day_of_week', 'pods_running'
         ]
+        self.feature_state = None  # État en ligne utilisé par predict_next()
         
         if not self.is_trained:
+            from sklearn.ensemble import RandomForestRegressor
+            from sklearn.preprocessing import StandardScaler
+            
             self.model = RandomForestRegressor(
                 n_estimators=100,
                 max_depth=10,
@@ -299,65 +1215,52 @@ class ResourcePredictionModel(BaseAIOpsModel):
             )
             self.scaler = StandardScaler()
     
+    # Caractéristiques temporelles, calculées par le pipeline partagé (aiops.features)
+    TIME_FEATURES = [
+        'hour', 'minute', 'day_of_week', 'month', 'is_weekend',
+        'time_of_day', 'time_sin', 'time_cos', 'day_sin', 'day_cos'
+    ]
+    
     def _add_time_features(self, data):
-        """Ajoute des caractéristiques temporelles au DataFrame."""
-        # Vérifier si timestamp existe et est au bon format
-        if 'timestamp' in data.columns:
-            if not pd.api.types.is_datetime64_any_dtype(data['timestamp']):
-                data['timestamp'] = pd.to_datetime(data['timestamp'])
-            
-            # Ajouter des caractéristiques temporelles
-            data['hour'] = data['timestamp'].dt.hour
-            data['minute'] = data['timestamp'].dt.minute
-            data['day_of_week'] = data['timestamp'].dt.dayofweek
-            data['month'] = data['timestamp'].dt.month
-            data['is_weekend'] = data['timestamp'].dt.dayofweek.isin([5, 6]).astype(int)
-            
-            # Caractéristique cyclique pour l'heure (pour capturer la nature cyclique du temps)
-            data['time_of_day'] = data['hour'] + data['minute'] / 60.0
-            data['time_sin'] = np.sin(2 * np.pi * data['time_of_day'] / 24.0)
-            data['time_cos'] = np.cos(2 * np.pi * data['time_of_day'] / 24.0)
-            
-            # Caractéristique cyclique pour le jour de la semaine
-            data['day_sin'] = np.sin(2 * np.pi * data['day_of_week'] / 7.0)
-            data['day_cos'] = np.cos(2 * np.pi * data['day_of_week'] / 7.0)
+        """
+        Retourne un nouveau DataFrame enrichi des caractéristiques temporelles.
+        
+        Les caractéristiques sont partagées avec les autres modèles évalués sur
+        le même DataFrame, et data n'est pas modifié.
+        """
+        return get_feature_pipeline().transform(data, self.TIME_FEATURES)
+    
+    def _add_lag_columns(self, data, lags=[1, 3, 6, 12]):
+        """Ajoute les colonnes décalées et moyennes mobiles de la cible, sans supprimer de lignes."""
+        for lag in lags:
+            data[f'{self.target}_lag_{lag}'] = data[self.target].shift(lag)
+        
+        # Ajouter des moyennes mobiles
+        data[f'{self.target}_rolling_mean_3'] = data[self.target].rolling(window=3).mean()
+        data[f'{self.target}_rolling_mean_6'] = data[self.target].rolling(window=6).mean()
         
         return data
     
     def _create_lagged_features(self, data, lags=[1, 3, 6, 12]):
         """Crée des caractéristiques décalées pour la série temporelle."""
         if self.target in data.columns:
-            for lag in lags:
-                data[f'{self.target}_lag_{lag}'] = data[self.target].shift(lag)
-            
-            # Ajouter des moyennes mobiles
-            data[f'{self.target}_rolling_mean_3'] = data[self.target].rolling(window=3).mean()
-            data[f'{self.target}_rolling_mean_6'] = data[self.target].rolling(window=6).mean()
+            data = self._add_lag_columns(data, lags)
             
             # Supprimer les lignes avec des valeurs NaN dues aux lags
             data = data.dropna()
         
         return data
     
-    def preprocess_data(self, data):
+    def _feature_columns(self, df):
         """
-        Prétraite les données pour la prédiction des ressources.
+        Sélectionne les colonnes de caractéristiques d'un DataFrame enrichi.
         
         Args:
-            data: DataFrame pandas avec les métriques du système
+            df: DataFrame avec caractéristiques temporelles et décalées
             
         Returns:
-            tuple: (X, y) - Features prétraitées et valeurs cibles
+            list: Noms des colonnes, dans l'ordre attendu par le scaler
         """
-        # Copier les données pour éviter de modifier l'original
-        df = data.copy()
-        
-        # Ajouter des caractéristiques temporelles
-        df = self._add_time_features(df)
-        
-        # Créer des caractéristiques décalées si on prédit une série temporelle
-        df = self._create_lagged_features(df)
-        
         # Sélectionner les caractéristiques pour l'entraînement
         available_features = [f for f in self.features if f in df.columns]
         
@@ -374,8 +1277,29 @@ class ResourcePredictionModel(BaseAIOpsModel):
         if not available_features:
             raise ValueError("Aucune caractéristique disponible après prétraitement")
         
+        return available_features
+    
+    def preprocess_data(self, data):
+        """
+        Prétraite les données pour la prédiction des ressources.
+        
+        Args:
+            data: DataFrame pandas avec les métriques du système
+            
+        Returns:
+            tuple: (X, y) - Features prétraitées et valeurs cibles
+        """
+        # Ajouter des caractéristiques temporelles (nouveau DataFrame, l'original n'est pas modifié)
+        df = self._add_time_features(data)
+        
+        # Créer des caractéristiques décalées si on prédit une série temporelle
+        df = self._create_lagged_features(df)
+        
+        # Sélectionner les caractéristiques pour l'entraînement
+        available_features = self._feature_columns(df)
+        
         # Sélectionner X et y
-        X = df[available_features]
+        X = df[available_features].astype(self.dtype, copy=False)
         y = df[self.target] if self.target in df.columns else None
         
         # Normaliser les données
@@ -389,23 +1313,56 @@ class ResourcePredictionModel(BaseAIOpsModel):
         
         return (X_scaled, y)
     
-    def train(self, data):
+    def _training_data(self, data):
         """
-        Entraîne le modèle de prédiction des ressources.
+        Prépare les caractéristiques et la cible d'entraînement.
+        
+        En mode multi-horizon, la cible est la matrice des `horizon` valeurs
+        futures, construite une seule fois ; les lignes sans futur complet
+        sont écartées.
         
         Args:
             data: DataFrame pandas avec les métriques du système
             
         Returns:
-            self: Le modèle entraîné
+            tuple: (X, y) - Features prétraitées et cible (vecteur ou matrice)
         """
+        if self.multi_horizon:
+            data = data.reset_index(drop=True)
+        
         X_scaled, y = self.preprocess_data(data)
         
         if y is None:
             raise ValueError(f"La cible '{self.target}' n'est pas présente dans les données")
         
+        if not self.multi_horizon:
+            return X_scaled, y
+        
+        future = _future_targets(data[self.target].to_numpy(dtype=np.float64), self.horizon)
+        future = future[y.index.to_numpy()]
+        valid = ~np.isnan(future).any(axis=1)
+        
+        if not valid.any():
+            raise ValueError(f"Pas assez de données pour un horizon de {self.horizon} pas")
+        
+        return X_scaled[valid], future[valid]
+    
+    def train(self, data):
+        """
+        Entraîne le modèle de prédiction des ressources.
+        
+        Args:
+            data: DataFrame pandas avec les métriques du système
+            
+        Returns:
+            self: Le modèle entraîné
+        """
+        X_scaled, y = self._training_data(data)
+        if self.scaler is not None:
+            self._fit_drift_reference(X_scaled, list(self.scaler.feature_names_in_))
+        
         # Entraîner le modèle
-        self.model.fit(X_scaled, y)
+        self._fit_estimator(X_scaled, y)
         self.is_trained = True
         
         # Sauvegarder le modèle
@@ -413,12 +1370,141 @@ class ResourcePredictionModel(BaseAIOpsModel):
         
         return self
     
-    def predict(self, data):
+    def train_incremental(self, data, new_trees=ROLLING_NEW_TREES, max_trees=None):
+        """
+        Réentraîne le modèle sur la fenêtre la plus récente, sans repartir de zéro.
+        
+        Des arbres ajustés sur data seule sont ajoutés à la forêt et les plus
+        anciens sont retirés (ensemble glissant). Le scaler et la référence de
+        dérive de l'entraînement initial sont conservés ; les statistiques de
+        dérive repartent de zéro, et on_drift peut de nouveau être déclenché.
+        Si le modèle n'est pas entraîné, équivaut à train().
+        
+        Args:
+            data: DataFrame pandas avec les métriques de la nouvelle fenêtre
+            new_trees: Nombre d'arbres ajoutés
+            max_trees: Nombre maximal d'arbres (par défaut, la taille actuelle de la forêt)
+            
+        Returns:
+            self: Le modèle mis à jour
+        """
+        if not self.is_trained:
+            return self.train(data)
+        
+        X_scaled, y = self._training_data(data)
+        
+        self.model, retired = _roll_forest(
+            self.model, lambda forest: forest.fit(X_scaled, y), new_trees, len(self.model.estimators_) if max_trees is None else max_trees
+        )
+        self._reset_drift()
+        print(f"Modèle {self.name} mis à jour sur {len(X_scaled)} lignes : "
+              f"{new_trees} arbres ajoutés, {retired} retirés")
+        
+        # Sauvegarder le modèle
+        self.save_model()
+        
+        return self
+    
+    @classmethod
+    def train_multi_target(cls, data, targets, features=None, horizon=12, version='1.0.0', max_workers=None,
+                           multi_horizon=False):
+        """
+        Entraîne un modèle par cible en parallèle à partir d'une matrice commune.
+        
+        Les caractéristiques temporelles et décalées de toutes les cibles sont
+        calculées une seule fois, puis la matrice est placée en mémoire partagée
+        et chaque cible est entraînée dans un processus du pool. Les lignes
+        retenues pour chaque cible sont les mêmes qu'avec train(), et chaque
+        modèle est sauvegardé par save_model().
+        
+        Args:
+            data: DataFrame pandas avec les métriques du système
+            targets: Liste des métriques cibles
+            features: Liste des caractéristiques à utiliser
+            horizon: Horizon de prédiction (en unités de temps)
+            version: Version des modèles
+            max_workers: Nombre de processus (par défaut, un par cible dans la limite des CPU)
+            multi_horizon: Entraîner des modèles de prévision directe multi-horizon
+            
+        Returns:
+            dict: Modèles entraînés, indexés par cible
+        """
+        from multiprocessing import shared_memory
+        from concurrent.futures import ProcessPoolExecutor
+        from sklearn.base import clone
+        
+        models = {target: cls(features=features, target=target, horizon=horizon, version=version,
+                              multi_horizon=multi_horizon)
+                  for target in targets}
+        
+        for target in targets:
+            if target not in data.columns:
+                raise ValueError(f"La cible '{target}' n'est pas présente dans les données")
+        
+        # Caractéristiques communes, calculées une seule fois
+        df = models[targets[0]]._add_time_features(data)
+        base_valid = ~df.isna().any(axis=1).to_numpy()
+        
+        jobs = {}
+        for target, model in models.items():
+            lag_start = len(df.columns)
+            df = model._add_lag_columns(df)
+            lag_columns = list(df.columns[lag_start:])
+            
+            # Mêmes lignes que le dropna() de _create_lagged_features()
+            mask = base_valid & ~df[lag_columns].isna().any(axis=1).to_numpy()
+            if multi_horizon:
+                mask &= ~np.isnan(_future_targets(df[target].to_numpy(dtype=np.float64), horizon)).any(axis=1)
+            jobs[target] = (model._feature_columns(df), mask)
+        
+        columns = list(dict.fromkeys(
+            [c for feature_columns, _ in jobs.values() for c in feature_columns] + list(targets)
+        ))
+        matrix = df[columns].to_numpy(dtype=np.float64)
+        
+        shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        try:
+            shared = np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)
+            shared[:] = matrix
+            del matrix, shared
+            
+            max_workers = max_workers or min(len(targets), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {}
+                for target, (feature_columns, mask) in jobs.items():
+                    model = models[target]
+                    futures[target] = executor.submit(
+                        _fit_resource_target,
+                        shm.name,
+                        (len(df), len(columns)),
+                        columns,
+                        [columns.index(c) for c in feature_columns],
+                        columns.index(target),
+                        mask,
+                        clone(model.scaler),
+                        clone(model.model),
+                        horizon if multi_horizon else 0
+                    )
+                
+                for target, future in futures.items():
+                    model = models[target]
+                    model.scaler, model.model = future.result()
+                    model.is_trained = True
+                    model.save_model()
+        finally:
+            shm.close()
+            shm.unlink()
+        
+        return models
+    
+    def predict(self, data, compact=False):
         """
         Prédit les besoins futurs en ressources.
         
         Args:
             data: DataFrame pandas avec les métriques du système
+            compact: Si True, retourne un CompactResult où 'predictions' et
+                'timestamps' sont des tableaux NumPy plutôt que des listes
             
         Returns:
             dict: Prédictions des besoins en ressources
@@ -427,32 +1513,137 @@ class ResourcePredictionModel(BaseAIOpsModel):
             raise ValueError("Le modèle n'est pas entraîné. Appelez d'abord train().")
         
         X_scaled, _ = self.preprocess_data(data)
+        self._track_drift(X_scaled)
         
-        # Prédire les valeurs
-        predictions = self.model.predict(X_scaled)
+        # Prédire les valeurs (matrice (n, horizon) en mode multi-horizon)
+        with self._stage('estimator', len(X_scaled)):
+            predictions = self.model.predict(X_scaled)
+        
+        # En multi-horizon, la prévision porte sur les pas suivant la dernière observation
+        reference = predictions[-1] if self.multi_horizon else predictions
         
         # Préparer le résultat
         result = {
             "target": self.target,
-            "predictions": predictions.tolist(),
-            "mean_prediction": np.mean(predictions),
-            "min_prediction": np.min(predictions),
-            "max_prediction": np.max(predictions),
+            "predictions": predictions if compact else predictions.tolist(),
+            "mean_prediction": np.mean(reference),
+            "min_prediction": np.min(reference),
+            "max_prediction": np.max(reference),
         }
+        if compact:
+            result = CompactResult(result)
+        
+        if self.multi_horizon:
+            result["horizon"] = self.horizon
+            result["forecast"] = reference if compact else reference.tolist()
         
         # Ajouter l'horodatage si disponible
         if 'timestamp' in data.columns:
-            result["timestamps"] = data['timestamp'].tolist()
-        
-        # Estimer les besoins en ressources
+            result["timestamps"] = data['timestamp'].to_numpy() if compact else data['timestamp'].tolist()
+            
+            if self.multi_horizon and len(data) > 1:
+                timestamps = pd.to_datetime(data['timestamp'])
+                step = timestamps.diff().median()
+                forecast_times = pd.date_range(timestamps.iloc[-1] + step, periods=self.horizon, freq=step)
+                result["forecast_timestamps"] = (forecast_times.to_numpy() if compact
+                                                 else forecast_times.tolist())
+        
+        # Estimer les besoins en ressources (pic de la prévision en multi-horizon)
         if self.target == 'cpu_usage':
             # Exemple simple: ajouter 20% de marge aux prédictions maximales
-            result["recommended_cpu_limit"] = np.max(predictions) * 1.2
+            result["recommended_cpu_limit"] = np.max(reference) * 1.2
         elif self.target == 'memory_usage':
-            result["recommended_memory_limit"] = np.max(predictions) * 1.2
+            result["recommended_memory_limit"] = np.max(reference) * 1.2
         
         # Enregistrer les prédictions
-        self.log_prediction(data.to_dict(orient='records'), result)
+        self.log_prediction(data, result)
+        
+        return result
+    
+    def _time_feature_values(self, timestamp):
+        """Calcule pour un seul horodatage les caractéristiques de _add_time_features()."""
+        ts = pd.Timestamp(timestamp)
+        time_of_day = ts.hour + ts.minute / 60.0
+        
+        return {
+            'hour': ts.hour,
+            'minute': ts.minute,
+            'day_of_week': ts.dayofweek,
+            'month': ts.month,
+            'is_weekend': int(ts.dayofweek in (5, 6)),
+            'time_of_day': time_of_day,
+            'time_sin': np.sin(2 * np.pi * time_of_day / 24.0),
+            'time_cos': np.cos(2 * np.pi * time_of_day / 24.0),
+            'day_sin': np.sin(2 * np.pi * ts.dayofweek / 7.0),
+            'day_cos': np.cos(2 * np.pi * ts.dayofweek / 7.0)
+        }
+    
+    def reset_feature_state(self, history=None):
+        """
+        Réinitialise l'état en ligne de predict_next().
+        
+        Args:
+            history: DataFrame optionnel des dernières observations, utilisé pour
+                amorcer les tampons de décalage
+        """
+        self.feature_state = OnlineLagState()
+        
+        if history is not None and self.target in history.columns:
+            values = history[self.target].dropna().to_numpy(dtype=np.float64)
+            for value in values[-self.feature_state.history.maxlen:]:
+                self.feature_state.update(float(value))
+    
+    def predict_next(self, sample):
+        """
+        Prédit la cible pour un nouvel échantillon en O(caractéristiques).
+        
+        Les décalages et moyennes mobiles sont tirés de l'état en ligne mis à
+        jour à chaque appel : il n'est pas nécessaire de renvoyer l'historique.
+        
+        Args:
+            sample: Dict des métriques courantes (doit contenir la cible)
+            
+        Returns:
+            dict: Prédiction pour l'échantillon
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle n'est pas entraîné. Appelez d'abord train().")
+        
+        if sample.get(self.target) is None:
+            raise ValueError(f"La cible '{self.target}' est manquante dans l'échantillon")
+        
+        if self.feature_state is None:
+            self.reset_feature_state()
+        
+        self.feature_state.update(float(sample[self.target]))
+        
+        row = dict(sample)
+        if row.get('timestamp') is not None:
+            row.update(self._time_feature_values(row['timestamp']))
+        row.update(self.feature_state.features(self.target))
+        
+        # Même ordre de colonnes que lors de l'entraînement du scaler
+        try:
+            x = np.array([row[name] for name in self.scaler.feature_names_in_], dtype=self.dtype)
+        except KeyError as e:
+            raise ValueError(f"La caractéristique {e} est manquante dans l'échantillon")
+        
+        x = (x - self.scaler.mean_) / self.scaler.scale_
+        output = np.atleast_1d(self.model.predict(x.reshape(1, -1))[0])
+        
+        result = {
+            "target": self.target,
+            "prediction": float(output[0])
+        }
+        if self.multi_horizon:
+            result["forecast"] = output.tolist()
+        if row.get('timestamp') is not None:
+            result["timestamp"] = row['timestamp']
+        
+        if self.target == 'cpu_usage':
+            result["recommended_cpu_limit"] = float(np.max(output)) * 1.2
+        elif self.target == 'memory_usage':
+            result["recommended_memory_limit"] = float(np.max(output)) * 1.2
         
         return result
     
@@ -470,10 +1661,7 @@ class ResourcePredictionModel(BaseAIOpsModel):
         if not self.is_trained:
             raise ValueError("Le modèle n'est pas entraîné. Appelez d'abord train().")
         
-        X_scaled, y = self.preprocess_data(data)
-        
-        if y is None:
-            raise ValueError(f"La cible '{self.target}' n'est pas présente dans les données")
+        X_scaled, y = self._training_data(data)
         
         # Faire des prédictions
         y_pred = self.model.predict(X_scaled)
@@ -495,10 +1683,113 @@ class ResourcePredictionModel(BaseAIOpsModel):
         return metrics
 
 
+def _stratified_sample(groups, sizes, sample_size, rng):
+    """
+    Tire un échantillon stratifié par groupe, à allocation proportionnelle.
+    
+    Args:
+        groups: Indice de groupe (0..k-1) de chaque point
+        sizes: Effectif de chaque groupe
+        sample_size: Taille visée de l'échantillon
+        rng: Générateur numpy
+        
+    Returns:
+        tuple: (indices, quotas) - Indices triés des points tirés et effectif tiré par groupe
+    """
+    n = len(groups)
+    if sample_size >= n:
+        return np.arange(n), sizes
+    
+    # Au moins deux points par groupe lorsque c'est possible, pour estimer sa variance
+    quotas = np.minimum(sizes, np.maximum(np.round(sample_size * sizes / n).astype(np.int64), 2))
+    
+    # Ordre aléatoire à l'intérieur de chaque groupe, puis les `quota` premiers points
+    order = rng.permutation(n)
+    order = order[np.argsort(groups[order], kind='stable')]
+    ranks = np.arange(n) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    selected = order[ranks < np.repeat(quotas, sizes)]
+    
+    return np.sort(selected), quotas
+
+
+def _silhouette_estimate(X, labels, sample_size, confidence=0.95, seed=42, working_memory=None):
+    """
+    Estime le score silhouette sur un échantillon stratifié par cluster.
+    
+    Le silhouette de chaque point tiré est exact : ses distances à tous les
+    points sont calculées par blocs de taille bornée (working_memory) puis
+    sommées par cluster, sans jamais former la matrice n x n. Le score est la
+    moyenne stratifiée des silhouettes, avec un intervalle de confiance
+    normal (correction de population finie) ; il est exact, et l'intervalle
+    de largeur nulle, si l'échantillon couvre tous les points.
+    
+    Args:
+        X: Matrice (n, n_features) des points hors bruit
+        labels: Clusters des points
+        sample_size: Taille de l'échantillon stratifié
+        confidence: Niveau de l'intervalle de confiance
+        seed: Graine de l'échantillonnage
+        working_memory: Mémoire maximale (Mo) d'un bloc de distances
+        
+    Returns:
+        dict: Score silhouette, bornes de l'intervalle de confiance et taille de l'échantillon
+    """
+    from scipy.stats import norm
+    from sklearn.metrics import pairwise_distances_chunked
+    
+    _, groups, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    sample, quotas = _stratified_sample(groups, sizes, sample_size, np.random.default_rng(seed))
+    
+    # Points triés par cluster : les sommes de distances par cluster sont contiguës
+    starts = np.cumsum(sizes) - sizes
+    X_sorted = X[np.argsort(groups, kind='stable')]
+    
+    def cluster_sums(distances, start):
+        return np.add.reduceat(distances, starts, axis=1)
+    
+    sums = np.vstack(list(pairwise_distances_chunked(
+        X[sample], X_sorted, reduce_func=cluster_sums, working_memory=working_memory
+    )))
+    
+    rows = np.arange(len(sample))
+    sample_groups = groups[sample]
+    own_sizes = sizes[sample_groups]
+    
+    # a : distance moyenne au propre cluster (hors le point lui-même), b : au cluster voisin le plus proche
+    a = sums[rows, sample_groups] / np.maximum(own_sizes - 1, 1)
+    mean_distances = sums / sizes
+    mean_distances[rows, sample_groups] = np.inf
+    b = mean_distances.min(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        silhouettes = np.nan_to_num((b - a) / np.maximum(a, b))
+    silhouettes[own_sizes == 1] = 0.0
+    
+    # Moyenne stratifiée et variance de l'estimateur
+    weights = sizes / sizes.sum()
+    means = np.bincount(sample_groups, weights=silhouettes, minlength=len(sizes)) / quotas
+    squares = np.bincount(sample_groups, weights=silhouettes ** 2, minlength=len(sizes))
+    variances = np.maximum(squares - quotas * means ** 2, 0.0) / np.maximum(quotas - 1, 1)
+    variance = np.sum(weights ** 2 * variances / quotas * (1 - quotas / sizes))
+    
+    score = float(np.sum(weights * means))
+    margin = float(norm.ppf(0.5 + confidence / 2) * np.sqrt(variance))
+    
+    return {
+        "silhouette_score": score,
+        "silhouette_ci_low": score - margin,
+        "silhouette_ci_high": score + margin,
+        "silhouette_sample_size": int(len(sample))
+    }
+
+
 class ClusteringModel(BaseAIOpsModel):
     """Modèle de clustering pour regrouper des comportements similaires."""
     
-    def __init__(self, features=None, eps=0.5, min_samples=5, version='1.0.0'):
+    # Caractéristiques temporelles du pipeline partagé ; time_of_day est ici la fraction de la journée
+    TIME_FEATURES = {'hour': 'hour', 'day_of_week': 'day_of_week', 'time_of_day': 'hour_fraction'}
+    
+    def __init__(self, features=None, eps=0.5, min_samples=5, version='1.0.0', model_dir=None,
+                 dtype=None):
         """
         Initialise le modèle de clustering.
         
@@ -507,8 +1798,10 @@ class ClusteringModel(BaseAIOpsModel):
             eps: Distance maximale entre deux points pour être considérés comme voisins
             min_samples: Nombre minimum de points pour former un cluster dense
             version: Version du modèle
+            model_dir: Répertoire des artefacts (par défaut MODEL_PATH)
+            dtype: Type flottant des caractéristiques prétraitées (par défaut FEATURE_DTYPE)
         """
-        super().__init__(name="workload_clustering", version=version)
+        super().__init__(name="workload_clustering", version=version, model_dir=model_dir, dtype=dtype)
         self.eps = eps
         self.min_samples = min_samples
         self.features = features or [
@@ -517,6 +1810,9 @@ class ClusteringModel(BaseAIOpsModel):
         ]
         
         if not self.is_trained:
+            from sklearn.cluster import DBSCAN
+            from sklearn.preprocessing import StandardScaler
+            
             self.model = DBSCAN(
                 eps=self.eps,
                 min_samples=self.min_samples,
@@ -525,6 +1821,77 @@ class ClusteringModel(BaseAIOpsModel):
             )
             self.scaler = StandardScaler()
     
+    def _index_path(self):
+        """Retourne le chemin de l'index des échantillons cœurs."""
+        return f"{self.model_dir}/{self.name}_{self.version}_core_index.joblib"
+    
+    def _load_if_exists(self):
+        """Surcharge pour charger aussi l'index des échantillons cœurs."""
+        self.core_index = None
+        self.core_labels = None
+        super()._load_if_exists()
+        
+        if not self.is_trained:
+            return
+        
+        index_path = self._index_path()
+        if os.path.exists(index_path):
+            try:
+                components = get_model_registry().load(index_path)
+                self.core_index = components["core_index"]
+                self.core_labels = components["core_labels"]
+            except Exception as e:
+                print(f"Erreur lors du chargement de l'index du modèle {self.name}: {str(e)}")
+        
+        # Modèle sauvegardé sans index : le reconstruire depuis le DBSCAN entraîné
+        if self.core_labels is None:
+            self._build_core_index()
+    
+    def _artifacts(self):
+        """Surcharge pour sauvegarder aussi l'index des échantillons cœurs."""
+        artifacts = super()._artifacts()
+        if self.core_labels is not None:
+            artifacts[self._index_path()] = {"core_index": self.core_index, "core_labels": self.core_labels}
+        return artifacts
+    
+    def _build_core_index(self):
+        """Construit un KDTree sur les échantillons cœurs du DBSCAN entraîné."""
+        from sklearn.neighbors import KDTree
+        
+        core_samples = getattr(self.model, 'components_', None)
+        if core_samples is None:
+            return
+        
+        self.core_labels = self.model.labels_[self.model.core_sample_indices_]
+        self.core_index = KDTree(core_samples) if len(core_samples) > 0 else None
+    
+    def assign_clusters(self, X_scaled):
+        """
+        Assigne des points normalisés aux clusters appris, sans réentraîner DBSCAN.
+        
+        Chaque point reçoit le cluster de l'échantillon cœur le plus proche s'il
+        se trouve à une distance inférieure ou égale à eps, et -1 (bruit) sinon,
+        comme les points frontières de DBSCAN. Le coût est O(log n) par point.
+        
+        Args:
+            X_scaled: Tableau normalisé de forme (n, n_features)
+            
+        Returns:
+            numpy.ndarray: Étiquette de cluster de chaque point
+        """
+        if self.core_labels is None:
+            self._build_core_index()
+        
+        if self.core_index is None or len(X_scaled) == 0:
+            return np.full(len(X_scaled), -1, dtype=np.int64)
+        
+        distances, indices = self.core_index.query(X_scaled, k=1)
+        return np.where(
+            distances[:, 0] <= self.model.eps,
+            self.core_labels[indices[:, 0]],
+            -1
+        )
+    
     def preprocess_data(self, data):
         """
         Prétraite les données pour le clustering.
@@ -535,14 +1902,8 @@ class ClusteringModel(BaseAIOpsModel):
         Returns:
             DataFrame prétraité avec les caractéristiques normalisées
         """
-        # Ajouter des caractéristiques temporelles si timestamp est présent
-        if 'timestamp' in data.columns:
-            if not pd.api.types.is_datetime64_any_dtype(data['timestamp']):
-                data['timestamp'] = pd.to_datetime(data['timestamp'])
-            
-            data['hour'] = data['timestamp'].dt.hour
-            data['day_of_week'] = data['timestamp'].dt.dayofweek
-            data['time_of_day'] = data['hour'] / 24.0
+        # Ajouter des caractéristiques temporelles si timestamp est présent (sans modifier data)
+        data = get_feature_pipeline().transform(data, self.TIME_FEATURES)
         
         # Sélectionner les caractéristiques disponibles
         available_features = [f for f in self.features if f in data.columns]
@@ -550,18 +1911,11 @@ class ClusteringModel(BaseAIOpsModel):
         if not available_features:
             raise ValueError("Aucune caractéristique disponible pour le clustering")
         
-        X = data[available_features].copy()
-        
-        # Remplacer les valeurs manquantes
-        X.fillna(X.mean(), inplace=True)
+        # Sélectionner les caractéristiques et remplacer les valeurs manquantes
+        X = self._feature_matrix(data, available_features)
         
         # Normaliser les données
-        if not self.is_trained:
-            X_scaled = self.scaler.fit_transform(X)
-        else:
-            X_scaled = self.scaler.transform(X)
-        
-        return X_scaled
+        return self._scale_features(X, available_features)
     
     def train(self, data):
         """
@@ -574,10 +1928,12 @@ class ClusteringModel(BaseAIOpsModel):
             self: Le modèle entraîné
         """
         X_scaled = self.preprocess_data(data)
+        self._fit_drift_reference(X_scaled, list(self.scaler.feature_names_in_))
         
         # Entraîner le modèle
-        self.model.fit(X_scaled)
+        self._fit_estimator(X_scaled)
         self.is_trained = True
+        self._build_core_index()
         
         # Analyser les résultats du clustering
         labels = self.model.labels_
@@ -592,12 +1948,14 @@ class ClusteringModel(BaseAIOpsModel):
         
         return self
     
-    def predict(self, data):
+    def predict(self, data, compact=False):
         """
         Assigne des clusters aux nouvelles données.
         
         Args:
             data: DataFrame pandas avec les métriques du système
+            compact: Si True, retourne un CompactResult avec les tableaux NumPy
+                'labels' et 'timestamps' ; 'clusters' devient une vue construite à la demande
             
         Returns:
             dict: Résultats du clustering
@@ -606,9 +1964,27 @@ class ClusteringModel(BaseAIOpsModel):
             raise ValueError("Le modèle n'est pas entraîné. Appelez d'abord train().")
         
         X_scaled = self.preprocess_data(data)
+        self._track_drift(X_scaled)
         
-        # Prédire les clusters
-        cluster_labels = self.model.fit_predict(X_scaled)
+        # Assigner les points aux clusters appris
+        with self._stage('estimator', len(X_scaled)):
+            cluster_labels = self.assign_clusters(X_scaled)
+        
+        if compact:
+            unique_labels, counts = np.unique(cluster_labels, return_counts=True)
+            timestamps = data['timestamp'].to_numpy() if 'timestamp' in data.columns else None
+            
+            result = CompactResult({
+                "n_clusters": int(np.sum(unique_labels != -1)),
+                "n_noise": int(counts[unique_labels == -1].sum()),
+                "cluster_sizes": {str(label): int(count) for label, count in zip(unique_labels, counts)},
+                "labels": cluster_labels
+            }, {"clusters": (_clusters_view, (cluster_labels, timestamps))})
+            if timestamps is not None:
+                result["timestamps"] = timestamps
+            
+            self.log_prediction(data, result)
+            return result
         
         # Préparer le résultat
         clusters = {}
@@ -624,25 +2000,36 @@ class ClusteringModel(BaseAIOpsModel):
             else:
                 clusters[label_str].append({"index": i})
         
+        n_noise = int(np.count_nonzero(cluster_labels == -1))
         result = {
-            "n_clusters": len(set(cluster_labels)) - (1 if -1 in cluster_labels else 0),
-            "n_noise": list(cluster_labels).count(-1),
+            "n_clusters": len(clusters) - (1 if n_noise else 0),
+            "n_noise": n_noise,
             "cluster_sizes": {label: len(items) for label, items in clusters.items()},
             "clusters": clusters
         }
         
         # Enregistrer les prédictions
-        self.log_prediction(data.to_dict(orient='records'), result)
+        self.log_prediction(data, result)
         
         return result
     
-    def evaluate(self, data, labels=None):
+    def evaluate(self, data, labels=None, sample_size=None, confidence=0.95, seed=42):
         """
         Évalue la qualité du clustering.
         
+        Le score silhouette est estimé sur un échantillon stratifié par cluster,
+        avec un intervalle de confiance, et les distances sont calculées par
+        blocs de mémoire bornée (EVAL_WORKING_MEMORY_MB) : le coût est
+        O(sample_size x n) au lieu de O(n²). Les scores de Calinski-Harabasz
+        et de Davies-Bouldin, linéaires en n, portent sur tous les points.
+        
         Args:
             data: DataFrame pandas avec les métriques du système
             labels: Étiquettes réelles des clusters (si disponibles)
+            sample_size: Taille de l'échantillon du score silhouette
+                (par défaut EVAL_SILHOUETTE_SAMPLE_SIZE ; score exact si elle couvre tous les points)
+            confidence: Niveau de l'intervalle de confiance du score silhouette
+            seed: Graine de l'échantillonnage
             
         Returns:
             dict: Métriques de qualité du clustering
@@ -652,37 +2039,41 @@ class ClusteringModel(BaseAIOpsModel):
         
         X_scaled = self.preprocess_data(data)
         
-        # Prédire les clusters
-        cluster_labels = self.model.fit_predict(X_scaled)
+        # Assigner les points aux clusters appris
+        cluster_labels = self.assign_clusters(X_scaled)
+        
+        # Effectifs des clusters, calculés une seule fois
+        unique_labels, counts = np.unique(cluster_labels, return_counts=True)
+        cluster_counts = counts[unique_labels != -1]
+        n_clusters = len(cluster_counts)
+        n_noise = int(counts[unique_labels == -1].sum())
         
         # Calculer des métriques internes (sans besoin d'étiquettes réelles)
-        from sklearn.metrics import silhouette_score, calinski_harabasz_score, davies_bouldin_score
+        from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score
         
         metrics = {}
-        n_clusters = len(set(cluster_labels)) - (1 if -1 in cluster_labels else 0)
         
         if n_clusters > 1:
             # Filtrer les points de bruit pour calculer les scores
             non_noise_mask = cluster_labels != -1
-            if non_noise_mask.sum() > 1:
-                metrics["silhouette_score"] = silhouette_score(
-                    X_scaled[non_noise_mask], cluster_labels[non_noise_mask]
-                )
-                metrics["calinski_harabasz_score"] = calinski_harabasz_score(
-                    X_scaled[non_noise_mask], cluster_labels[non_noise_mask]
-                )
-                metrics["davies_bouldin_score"] = davies_bouldin_score(
-                    X_scaled[non_noise_mask], cluster_labels[non_noise_mask]
-                )
+            X_clusters, clusters = X_scaled[non_noise_mask], cluster_labels[non_noise_mask]
+            
+            with self._stage('silhouette', len(X_clusters)):
+                metrics.update(_silhouette_estimate(
+                    X_clusters, clusters,
+                    sample_size or EVAL_SILHOUETTE_SAMPLE_SIZE,
+                    confidence=confidence,
+                    seed=seed,
+                    working_memory=EVAL_WORKING_MEMORY_MB
+                ))
+            metrics["calinski_harabasz_score"] = calinski_harabasz_score(X_clusters, clusters)
+            metrics["davies_bouldin_score"] = davies_bouldin_score(X_clusters, clusters)
         
         # Ajouter des statistiques sur les clusters
-        cluster_counts = np.bincount(cluster_labels[cluster_labels != -1] 
-                                     if -1 in cluster_labels else cluster_labels)
-        
         metrics.update({
             "n_clusters": n_clusters,
-            "n_noise_points": list(cluster_labels).count(-1),
-            "noise_percentage": list(cluster_labels).count(-1) / len(cluster_labels) * 100,
+            "n_noise_points": n_noise,
+            "noise_percentage": n_noise / len(cluster_labels) * 100,
             "avg_cluster_size": np.mean(cluster_counts) if len(cluster_counts) > 0 else 0,
             "min_cluster_size": np.min(cluster_counts) if len(cluster_counts) > 0 else 0,
             "max_cluster_size": np.max(cluster_counts) if len(cluster_counts) > 0 else 0
@@ -700,10 +2091,207 @@ class ClusteringModel(BaseAIOpsModel):
         return metrics
 
 
+@functools.lru_cache(maxsize=None)
+def _configure_tf_threads():
+    """Applique une fois la configuration des threads TensorFlow, avant toute exécution."""
+    import tensorflow as tf
+    
+    try:
+        if DEEP_INFERENCE_INTRA_THREADS:
+            tf.config.threading.set_intra_op_parallelism_threads(DEEP_INFERENCE_INTRA_THREADS)
+        if DEEP_INFERENCE_INTER_THREADS:
+            tf.config.threading.set_inter_op_parallelism_threads(DEEP_INFERENCE_INTER_THREADS)
+    except RuntimeError:
+        print("Configuration des threads TensorFlow ignorée: le runtime est déjà initialisé")
+
+
+def _load_keras_model(path):
+    """Charge un autoencoder Keras sauvegardé, sans désérialiser sa compilation."""
+    from tensorflow import keras
+    
+    model = keras.models.load_model(path, compile=False)
+    model.compile(optimizer='adam', loss='mse')
+    return model
+
+
+def _clone_keras_model(model):
+    """Copie un autoencoder Keras (architecture et poids), compilé à nouveau."""
+    from tensorflow import keras
+    
+    # Depuis la configuration seule : la compilation (métriques d'entraînement) n'est pas copiée
+    clone = keras.Model.from_config(model.get_config())
+    clone.set_weights(model.get_weights())
+    clone.compile(optimizer='adam', loss='mse')
+    return clone
+
+
+def _export_inference_graph(keras_model, sequence_length, n_features, path):
+    """
+    Exporte l'erreur de reconstruction de l'autoencoder en graphe TensorFlow.
+    
+    Le graphe a une signature fixe (batch variable, float32) et calcule
+    directement l'erreur MSE par séquence : seules n valeurs sortent du graphe
+    au lieu des reconstructions complètes.
+    
+    Args:
+        keras_model: Autoencoder entraîné
+        sequence_length: Longueur des séquences
+        n_features: Nombre de caractéristiques
+        path: Répertoire de destination (temporaire, renommé par le store d'artefacts)
+    """
+    import tensorflow as tf
+    from tensorflow import keras
+    
+    def errors(x):
+        reconstructions = keras_model(x, training=False)
+        return tf.reduce_mean(tf.square(x - reconstructions), axis=[1, 2])
+    
+    archive = keras.export.ExportArchive()
+    archive.track(keras_model)
+    archive.add_endpoint(
+        name="errors",
+        fn=errors,
+        input_signature=[tf.TensorSpec([None, sequence_length, n_features], tf.float32)]
+    )
+    archive.write_out(path, verbose=False)
+
+
+class _InferenceGraph:
+    """Graphe d'inférence exporté de l'autoencoder, chargé sans Keras."""
+    
+    def __init__(self, path, xla=None):
+        """
+        Charge le graphe exporté.
+        
+        Args:
+            path: Répertoire de l'export
+            xla: Si True, compile le graphe avec XLA (par défaut DEEP_INFERENCE_XLA)
+        """
+        import tensorflow as tf
+        
+        _configure_tf_threads()
+        self._tf = tf
+        self.module = tf.saved_model.load(path)
+        self.xla = DEEP_INFERENCE_XLA if xla is None else xla
+        self._errors = tf.function(self.module.errors, jit_compile=True) if self.xla else self.module.errors
+    
+    def __call__(self, batch):
+        """
+        Calcule l'erreur de reconstruction MSE de chaque séquence du batch.
+        
+        Avec XLA, le batch est complété jusqu'à la puissance de deux
+        supérieure pour limiter le nombre de formes compilées.
+        """
+        n = len(batch)
+        batch = np.asarray(batch, dtype=np.float32)
+        if self.xla:
+            padded = 1 << max(n - 1, 0).bit_length()
+            if padded != n:
+                batch = np.concatenate([batch, np.zeros((padded - n,) + batch.shape[1:], dtype=np.float32)])
+        return self._errors(self._tf.constant(batch)).numpy()[:n]
+
+
+@functools.lru_cache(maxsize=None)
+def _window_batches_class():
+    """Définit à la demande le générateur de batchs, qui dépend de Keras."""
+    from tensorflow import keras
+    
+    class _WindowBatches(keras.utils.Sequence):
+        """Batchs de séquences extraits à la demande d'une vue glissante sans copie."""
+        
+        def __init__(self, windows, indices, batch_size, shuffle=False):
+            """
+            Initialise le générateur de batchs.
+        
+            Args:
+                windows: Séquences (vue glissante) de forme (n, sequence_length, n_features)
+                indices: Indices des séquences à parcourir
+                batch_size: Taille du batch
+                shuffle: Mélanger les indices à chaque époque
+            """
+            super().__init__()
+            self.windows = windows
+            self.indices = np.array(indices)
+            self.batch_size = batch_size
+            self.shuffle = shuffle
+            if self.shuffle:
+                np.random.shuffle(self.indices)
+        
+        def __len__(self):
+            return math.ceil(len(self.indices) / self.batch_size)
+        
+        def __getitem__(self, idx):
+            # L'indexation avancée ne copie que les séquences du batch
+            batch = self.windows[self.indices[idx * self.batch_size:(idx + 1) * self.batch_size]]
+            return batch, batch
+        
+        def on_epoch_end(self):
+            if self.shuffle:
+                np.random.shuffle(self.indices)
+        
+    return _WindowBatches
+
+
+@functools.lru_cache(maxsize=None)
+def _error_stats_classes():
+    """Définit à la demande la métrique et le callback de statistiques d'erreurs, qui dépendent de Keras."""
+    from tensorflow import keras
+    
+    class _ReconstructionErrorStats(keras.metrics.Metric):
+        """Conserve les erreurs MSE par séquence d'une passe, dans un tampon circulaire."""
+        
+        def __init__(self, capacity, name='reconstruction_error', **kwargs):
+            super().__init__(name=name, **kwargs)
+            self.capacity = capacity
+            self.count = self.add_variable(shape=(), initializer='zeros', dtype='int64', name='count')
+            self.total = self.add_variable(shape=(), initializer='zeros', dtype='float64', name='total')
+            self.errors = self.add_variable(shape=(capacity,), initializer='zeros', dtype='float32', name='errors')
+        
+        def update_state(self, y_true, y_pred, sample_weight=None):
+            errors = keras.ops.mean(keras.ops.square(y_true - y_pred), axis=(1, 2))
+            n = keras.ops.shape(errors)[0]
+            positions = (self.count + keras.ops.arange(n, dtype='int64')) % self.capacity
+            self.errors.assign(keras.ops.scatter_update(self.errors, positions[:, None], errors))
+            self.count.assign_add(keras.ops.cast(n, 'int64'))
+            self.total.assign_add(keras.ops.sum(keras.ops.cast(errors, 'float64')))
+        
+        def result(self):
+            return self.total / keras.ops.cast(keras.ops.maximum(self.count, 1), 'float64')
+        
+        def reset_state(self):
+            for variable in (self.count, self.total):
+                variable.assign(keras.ops.zeros_like(variable))
+        
+        def values(self):
+            """Retourne une copie des erreurs de la passe courante."""
+            count = min(int(self.count.numpy()), self.capacity)
+            return np.array(self.errors.numpy()[:count])
+    
+    class _ErrorStatsRecorder(keras.callbacks.Callback):
+        """Conserve les erreurs de l'époque dont les poids sont retenus."""
+        
+        def __init__(self, metric, monitor):
+            super().__init__()
+            self.metric = metric
+            self.monitor = monitor
+            self.best = math.inf
+            self.best_errors = None
+        
+        def on_epoch_end(self, epoch, logs=None):
+            # En fin d'époque, l'état de la métrique est celui de la passe de validation
+            current = (logs or {}).get(self.monitor, math.inf)
+            if self.best_errors is None or current < self.best:
+                self.best = current
+                self.best_errors = self.metric.values()
+    
+    return _ReconstructionErrorStats, _ErrorStatsRecorder
+
+
 class DeepLearningAnomalyModel(BaseAIOpsModel):
     """Modèle d'anomalie basé sur les réseaux de neurones pour les séquences temporelles."""
     
-    def __init__(self, features=None, sequence_length=10, hidden_size=64, version='1.0.0'):
+    def __init__(self, features=None, sequence_length=10, hidden_size=64, version='1.0.0', model_dir=None,
+                 dtype=None, threshold_quantile=None):
         """
         Initialise le modèle d'anomalie basé sur l'autoencoder.
         
@@ -712,8 +2300,12 @@ class DeepLearningAnomalyModel(BaseAIOpsModel):
             sequence_length: Longueur de la séquence temporelle
             hidden_size: Taille de la couche cachée de l'autoencoder
             version: Version du modèle
+            model_dir: Répertoire des artefacts (par défaut MODEL_PATH)
+            dtype: Type flottant des caractéristiques prétraitées (par défaut FEATURE_DTYPE)
+            threshold_quantile: Quantile des erreurs de reconstruction retenu comme seuil
+                (par défaut DEEP_THRESHOLD_QUANTILE ; 0 pour moyenne + 3 écarts-types)
         """
-        super().__init__(name="deep_anomaly_detection", version=version)
+        # Définis avant le chargement : les composants sauvegardés les remplacent
         self.sequence_length = sequence_length
         self.hidden_size = hidden_size
         self.features = features or [
@@ -721,13 +2313,23 @@ class DeepLearningAnomalyModel(BaseAIOpsModel):
             'disk_io_read', 'disk_io_write', 'request_latency', 'error_rate'
         ]
         self.threshold = None  # Seuil d'anomalie, déterminé après entraînement
+        self.threshold_quantile = DEEP_THRESHOLD_QUANTILE if threshold_quantile is None else threshold_quantile
+        self.error_sketch = None  # Esquisse des erreurs de reconstruction des données normales
+        self.inference = None  # Graphe d'inférence exporté, utilisé en priorité par predict()
+        
+        _configure_tf_threads()
+        super().__init__(name="deep_anomaly_detection", version=version, model_dir=model_dir, dtype=dtype)
         
         if not self.is_trained:
+            from sklearn.preprocessing import StandardScaler
+            
             self.scaler = StandardScaler()
             self._build_model()
     
     def _build_model(self):
         """Construit le modèle d'autoencoder."""
+        from tensorflow import keras
+        
         # Nombre de caractéristiques
         n_features = len(self.features)
         
@@ -753,28 +2355,61 @@ class DeepLearningAnomalyModel(BaseAIOpsModel):
         """
         Crée des séquences temporelles à partir des données.
         
+        Les séquences sont des vues glissantes en lecture seule sur le tableau
+        d'origine : aucune donnée n'est copiée, quelle que soit la longueur
+        de la série.
+        
         Args:
             data: DataFrame pandas avec les métriques
             
         Returns:
-            numpy.ndarray: Séquences pour l'entraînement
+            numpy.ndarray: Séquences pour l'entraînement, de forme (n, sequence_length, n_features)
         """
-        X = []
+        data = np.asarray(data)
+        if len(data) < self.sequence_length:
+            return np.empty((0, self.sequence_length, data.shape[1]), dtype=data.dtype)
         
-        for i in range(len(data) - self.sequence_length + 1):
-            X.append(data[i:(i + self.sequence_length)])
+        windows = np.lib.stride_tricks.sliding_window_view(data, self.sequence_length, axis=0)
         
-        return np.array(X)
+        # sliding_window_view place la fenêtre en dernier axe : (n, features, sequence_length)
+        return windows.transpose(0, 2, 1)
     
-    def preprocess_data(self, data):
+    def _reconstruction_errors(self, X_sequences, chunk_size=None):
         """
-        Prétraite les données pour la détection d'anomalies.
+        Calcule l'erreur de reconstruction MSE de chaque séquence par blocs.
+        
+        Le graphe d'inférence exporté est utilisé s'il est chargé, sinon le
+        modèle Keras.
+        
+        Args:
+            X_sequences: Séquences (éventuellement vues sans copie)
+            chunk_size: Nombre de séquences par bloc (par défaut PREDICT_CHUNK_SIZE)
+            
+        Returns:
+            numpy.ndarray: Erreur MSE par séquence
+        """
+        chunk_size = chunk_size or PREDICT_CHUNK_SIZE
+        mse = np.empty(len(X_sequences), dtype=np.float64)
+        
+        for start in range(0, len(X_sequences), chunk_size):
+            batch = np.ascontiguousarray(X_sequences[start:start + chunk_size])
+            if self.inference is not None:
+                mse[start:start + len(batch)] = self.inference(batch)
+            else:
+                reconstructions = self._keras_model().predict_on_batch(batch)
+                mse[start:start + len(batch)] = np.mean(np.square(batch - reconstructions), axis=(1, 2))
+        
+        return mse
+    
+    def _scaled_matrix(self, data):
+        """
+        Sélectionne et normalise les caractéristiques, sans créer de séquences.
         
         Args:
             data: DataFrame pandas avec les métriques du système
             
         Returns:
-            numpy.ndarray: Données prétraitées sous forme de séquences
+            numpy.ndarray: Matrice normalisée (n, n_features)
         """
         # S'assurer que toutes les caractéristiques sont présentes
         available_features = [f for f in self.features if f in data.columns]
@@ -785,106 +2420,386 @@ class DeepLearningAnomalyModel(BaseAIOpsModel):
         # Mettre à jour la liste des caractéristiques disponibles
         self.features = available_features
         
-        # Sélectionner uniquement les caractéristiques pertinentes
-        X = data[self.features].copy()
+        # Sélectionner les caractéristiques, remplacer les valeurs manquantes et normaliser
+        return self._scale_features(self._feature_matrix(data, self.features), self.features)
+    
+    def preprocess_data(self, data):
+        """
+        Prétraite les données pour la détection d'anomalies.
         
-        # Remplacer les valeurs manquantes
-        X.fillna(X.mean(), inplace=True)
+        Args:
+            data: DataFrame pandas avec les métriques du système
+            
+        Returns:
+            numpy.ndarray: Données prétraitées sous forme de séquences
+        """
+        # Créer des séquences (vues sans copie, du même type que la matrice normalisée)
+        return self._create_sequences(self._scaled_matrix(data))
+    
+    def _window_dataset(self, X, starts, batch_size, shuffle=False):
+        """
+        Construit un pipeline tf.data qui extrait les séquences à la volée.
         
-        # Normaliser les données
-        if not self.is_trained:
-            X_scaled = self.scaler.fit_transform(X)
+        Seule la matrice normalisée (n, n_features) est placée en mémoire :
+        chaque batch rassemble ses séquences par tf.gather à partir des indices
+        de début, en parallèle de l'entraînement (prefetch).
+        
+        Args:
+            X: Tenseur de la matrice normalisée
+            starts: Indices de début des séquences à parcourir
+            batch_size: Taille du batch
+            shuffle: Mélanger les séquences à chaque époque
+            
+        Returns:
+            tf.data.Dataset: Paires (séquences, séquences)
+        """
+        import tensorflow as tf
+        
+        offsets = tf.range(self.sequence_length, dtype=tf.int64)
+        
+        def windows(batch_starts):
+            sequences = tf.gather(X, batch_starts[:, None] + offsets)
+            return sequences, sequences
+        
+        dataset = tf.data.Dataset.from_tensor_slices(np.asarray(starts, dtype=np.int64))
+        if shuffle:
+            dataset = dataset.shuffle(len(starts), reshuffle_each_iteration=True)
+        return (dataset.batch(batch_size)
+                .map(windows, num_parallel_calls=tf.data.AUTOTUNE)
+                .prefetch(tf.data.AUTOTUNE))
+    
+    def _fit_streaming(self, X, epochs, batch_size, validation_split, patience, record_errors=False):
+        """
+        Entraîne l'autoencoder sur un pipeline tf.data avec arrêt précoce.
+        
+        Avec record_errors, les erreurs de reconstruction sont accumulées par
+        une métrique pendant l'entraînement : elles proviennent de la passe de
+        validation (mode inférence, dernières séquences seulement) de l'époque
+        dont les poids sont conservés, ou de sa passe d'entraînement (dropout
+        actif) en l'absence de validation.
+        
+        Args:
+            X: Matrice normalisée retournée par _scaled_matrix()
+            epochs: Nombre maximal d'époques
+            batch_size: Taille du batch
+            validation_split: Proportion des séquences de validation
+            patience: Nombre d'époques sans amélioration avant l'arrêt précoce
+            record_errors: Collecter les erreurs MSE pendant l'entraînement
+        
+        Returns:
+            tuple: (history, errors) - Historique Keras et erreurs MSE retenues (None sans record_errors)
+        """
+        import tensorflow as tf
+        from tensorflow import keras
+        
+        X = X.astype(np.float32, copy=False)
+        n_sequences = len(X) - self.sequence_length + 1
+        if n_sequences < 10:
+            raise ValueError("Pas assez de données pour l'entraînement (moins de 10 séquences)")
+        
+        # Même découpage que validation_split : les dernières séquences servent à la validation
+        starts = np.arange(n_sequences)
+        n_val = int(n_sequences * validation_split)
+        n_train = n_sequences - n_val
+        
+        X_tensor = tf.constant(X)
+        train_dataset = self._window_dataset(X_tensor, starts[:n_train], batch_size, shuffle=True)
+        val_dataset = self._window_dataset(X_tensor, starts[n_train:], batch_size) if n_val else None
+        
+        model = self._keras_model()
+        monitor = 'val_loss' if n_val else 'loss'
+        callbacks = [keras.callbacks.EarlyStopping(monitor=monitor, patience=patience, restore_best_weights=True)]
+        recorder = None
+        if record_errors:
+            error_stats = _error_stats_classes()[0](n_val or n_train)
+            model.compile(optimizer=model.optimizer or 'adam', loss='mse', metrics=[error_stats])
+            recorder = _error_stats_classes()[1](error_stats, monitor)
+            callbacks.append(recorder)
+        
+        history = model.fit(
+            train_dataset,
+            validation_data=val_dataset,
+            epochs=epochs,
+            shuffle=False,  # Le pipeline mélange déjà les séquences
+            callbacks=callbacks,
+            verbose=1
+        )
+        
+        return history, recorder.best_errors if recorder is not None else None
+    
+    def _update_threshold(self, errors):
+        """
+        Ajoute des erreurs de reconstruction à l'esquisse et recalcule le seuil.
+        
+        L'esquisse chargée peut être partagée par le registre : elle est copiée
+        avant d'être modifiée.
+        
+        Args:
+            errors: Erreurs MSE par séquence de données normales
+        """
+        sketch = self.error_sketch.copy() if self.error_sketch is not None else QuantileSketch()
+        self.error_sketch = sketch.update(errors)
+        
+        if self.threshold_quantile:
+            self.threshold = sketch.quantile(self.threshold_quantile)
+            print(f"Seuil d'anomalie défini à: {self.threshold} (quantile {self.threshold_quantile}, "
+                  f"{sketch.count} séquences)")
         else:
-            X_scaled = self.scaler.transform(X)
+            # Moyenne + 3 écarts-types des erreurs MSE, exacts dans l'esquisse
+            self.threshold = sketch.mean + 3 * sketch.std
+            print(f"Seuil d'anomalie défini à: {self.threshold} ({sketch.count} séquences)")
+    
+    def update_threshold(self, data):
+        """
+        Met à jour le seuil avec de nouvelles données normales, sans réentraîner.
         
-        # Créer des séquences
-        X_sequences = self._create_sequences(X_scaled)
+        Les erreurs de reconstruction des nouvelles séquences sont ajoutées à
+        l'esquisse des erreurs, et seuls les composants sont sauvegardés.
         
-        return X_sequences
+        Args:
+            data: DataFrame pandas de métriques considérées comme normales
+            
+        Returns:
+            self: Le modèle mis à jour
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle n'est pas entraîné. Appelez d'abord train().")
+        
+        self._update_threshold(self._reconstruction_errors(self.preprocess_data(data)))
+        self._save_components()
+        return self
     
-    def train(self, data, epochs=50, batch_size=32, validation_split=0.2):
+    def train(self, data, epochs=50, batch_size=32, validation_split=0.2, chunked=False, streaming=True,
+              patience=5, threshold_from_training=False):
         """
         Entraîne le modèle d'autoencoder pour la détection d'anomalies.
         
+        Par défaut, les séquences sont construites à la volée par un pipeline
+        tf.data et l'entraînement s'arrête lorsque la perte de validation ne
+        s'améliore plus. Le seuil est calculé, comme sans pipeline, sur les
+        erreurs de reconstruction de toutes les séquences en mode inférence,
+        par blocs de vues glissantes (sans matérialiser les séquences).
+        
         Args:
             data: DataFrame pandas avec les métriques du système
-            epochs: Nombre d'époques d'entraînement
+            epochs: Nombre maximal d'époques d'entraînement
             batch_size: Taille du batch
             validation_split: Proportion des données à utiliser pour la validation
+            chunked: Si True, les batchs sont extraits à la demande des vues glissantes,
+                sans jamais matérialiser l'ensemble des séquences (sans arrêt précoce)
+            streaming: Si True (et chunked False), utilise le pipeline tf.data avec arrêt précoce ;
+                si False, entraîne sur les séquences matérialisées pendant `epochs` époques
+            patience: Nombre d'époques sans amélioration avant l'arrêt précoce
+            threshold_from_training: Avec streaming, calcule le seuil sur les erreurs collectées
+                pendant l'entraînement (validation de la meilleure époque) plutôt que par une
+                passe d'inférence sur toutes les séquences : plus rapide, mais le seuil diffère
             
         Returns:
             self: Le modèle entraîné
         """
-        X_sequences = self.preprocess_data(data)
+        # La sauvegarde précédente lit encore les poids de l'autoencoder (son éventuel
+        # échec reste signalé par wait_saved())
+        get_artifact_store().wait(self.model_dir)
+        
+        # Le graphe exporté correspond aux anciens poids : il est remplacé après l'entraînement.
+        # L'autoencoder chargé est partagé par le registre : une copie est entraînée
+        self.model = _clone_keras_model(self._keras_model())
+        self.inference = None
+        
+        # Les erreurs du nouvel autoencoder remplacent celles de l'ancien
+        self.error_sketch = None
+        
+        X_scaled = self._scaled_matrix(data)
+        self._fit_drift_reference(X_scaled, self.features)
+        
+        if streaming and not chunked:
+            history, errors = self._fit_streaming(X_scaled, epochs, batch_size, validation_split, patience,
+                                                  record_errors=threshold_from_training)
+            print(f"Entraînement arrêté après {len(history.epoch)} époques")
+            
+            if errors is None:
+                errors = self._reconstruction_errors(self._create_sequences(X_scaled))
+            self._update_threshold(errors)
+            self._save_trained_model()
+            return self
+        
+        X_sequences = self._create_sequences(X_scaled)
         
         # Vérifier s'il y a suffisamment de données
         if len(X_sequences) < 10:
             raise ValueError("Pas assez de données pour l'entraînement (moins de 10 séquences)")
         
         # Entraîner le modèle
-        history = self.model.fit(
-            X_sequences, X_sequences,
-            epochs=epochs,
-            batch_size=batch_size,
-            validation_split=validation_split,
-            shuffle=True,
-            verbose=1
-        )
-        
-        # Calculer les erreurs de reconstruction pour toutes les séquences
-        reconstructions = self.model.predict(X_sequences)
+        if chunked:
+            _WindowBatches = _window_batches_class()
+            
+            # Même découpage que validation_split : les dernières séquences servent à la validation
+            indices = np.arange(len(X_sequences))
+            n_val = int(len(indices) * validation_split)
+            n_train = len(indices) - n_val
+            
+            history = self.model.fit(
+                _WindowBatches(X_sequences, indices[:n_train], batch_size, shuffle=True),
+                validation_data=_WindowBatches(X_sequences, indices[n_train:], batch_size) if n_val else None,
+                epochs=epochs,
+                verbose=1
+            )
+        else:
+            history = self.model.fit(
+                X_sequences, X_sequences,
+                epochs=epochs,
+                batch_size=batch_size,
+                validation_split=validation_split,
+                shuffle=True,
+                verbose=1
+            )
         
-        # Pour chaque séquence, calculer l'erreur MSE
-        mse = np.mean(np.square(X_sequences - reconstructions), axis=(1, 2))
+        # Calculer l'erreur MSE de reconstruction pour toutes les séquences, par blocs
+        mse = self._reconstruction_errors(X_sequences)
         
-        # Définir le seuil comme la moyenne + 3 écarts-types des erreurs MSE
-        self.threshold = np.mean(mse) + 3 * np.std(mse)
-        print(f"Seuil d'anomalie défini à: {self.threshold}")
+        self._update_threshold(mse)
+        self._save_trained_model()
+        return self
+    
+    def _save_trained_model(self):
+        """
+        Sauvegarde l'autoencoder, ses composants et son graphe d'inférence.
         
+        Les trois artefacts sont publiés ensemble en arrière-plan ; le graphe
+        d'inférence est ensuite chargé pour predict(), qui utilise l'autoencoder
+        Keras en attendant.
+        """
         self.is_trained = True
         
         # Sauvegarder le modèle (keras ne fonctionne pas bien avec joblib)
-        self.model.save(f"{MODEL_PATH}/{self.name}_{self.version}.h5")
+        model_h5_path = f"{self.model_dir}/{self.name}_{self.version}.h5"
+        keras_model = self.model
+        writers = {model_h5_path: keras_model.save}
+        callback = None
+        
+        # Exporter le graphe d'inférence, chargé ensuite par les autres instances au démarrage
+        if DEEP_INFERENCE_EXPORT:
+            inference_path = self._inference_path()
+            sequence_length, n_features = self.sequence_length, len(self.features)
+            writers[inference_path] = lambda path: _export_inference_graph(
+                keras_model, sequence_length, n_features, path
+            )
+            
+            def callback():
+                self.inference = get_model_registry().load(self._published_inference_path(),
+                                                           loader=_InferenceGraph)
         
-        # Sauvegarder les autres composants avec joblib
+        self.pending_save = get_artifact_store().save(self._components(), writers=writers, callback=callback)
+        return self.pending_save
+    
+    def _components(self):
+        """Retourne les composants autres que le réseau, sauvegardés avec joblib."""
         joblib_data = {
             "scaler": self.scaler,
             "threshold": self.threshold,
+            "error_sketch": self.error_sketch,
+            "drift_reference": self.drift_monitor.reference if self.drift_monitor is not None else None,
             "features": self.features,
             "sequence_length": self.sequence_length
         }
-        joblib.dump(joblib_data, f"{MODEL_PATH}/{self.name}_{self.version}_components.joblib")
+        components_path = f"{self.model_dir}/{self.name}_{self.version}_components.joblib"
+        return {components_path: joblib_data}
+    
+    def _save_components(self):
+        """Sauvegarde en arrière-plan les composants autres que le réseau."""
+        self.pending_save = get_artifact_store().save(self._components())
+        return self.pending_save
+    
+    def _inference_path(self):
+        """Chemin du graphe d'inférence exporté (nom de son entrée dans le manifeste)."""
+        return f"{self.model_dir}/{self.name}_{self.version}_inference"
+    
+    def _published_inference_path(self):
+        """Répertoire versionné du graphe d'inférence publié, d'après le manifeste."""
+        return get_artifact_store().resolve(self._inference_path(), max_age=get_model_registry().check_interval)
+    
+    def _keras_model(self):
+        """
+        Retourne l'autoencoder Keras, chargé à la demande.
         
-        return self
+        Lorsque le graphe d'inférence exporté a été chargé au démarrage, le
+        modèle Keras n'est nécessaire que pour l'entraînement : il est alors
+        chargé depuis le fichier .h5, ou construit s'il n'existe pas.
+        """
+        if self.model is None:
+            model_h5_path = f"{self.model_dir}/{self.name}_{self.version}.h5"
+            get_artifact_store().wait(self.model_dir)
+            if os.path.exists(model_h5_path):
+                self.model = get_model_registry().load(model_h5_path, loader=_load_keras_model)
+            else:
+                self._build_model()
+        return self.model
     
     def _load_if_exists(self):
-        """Surcharge pour charger le modèle Keras."""
-        model_h5_path = f"{MODEL_PATH}/{self.name}_{self.version}.h5"
-        components_path = f"{MODEL_PATH}/{self.name}_{self.version}_components.joblib"
+        """
+        Surcharge pour charger le graphe d'inférence exporté, ou à défaut le modèle Keras.
+        
+        Le graphe exporté suffit à predict() : le modèle Keras n'est alors
+        chargé qu'à la demande, pour un nouvel entraînement.
+        """
+        get_artifact_store().wait(self.model_dir)
+        model_h5_path = f"{self.model_dir}/{self.name}_{self.version}.h5"
+        components_path = f"{self.model_dir}/{self.name}_{self.version}_components.joblib"
+        inference_path = self._published_inference_path()
+        use_graph = DEEP_INFERENCE_EXPORT and os.path.isdir(inference_path)
         
-        if os.path.exists(model_h5_path) and os.path.exists(components_path):
+        if (use_graph or os.path.exists(model_h5_path)) and os.path.exists(components_path):
             try:
-                # Charger le modèle Keras
-                self.model = keras.models.load_model(model_h5_path)
+                registry = get_model_registry()
+                previous_model, previous_inference = self.model, self.inference
+                
+                if use_graph:
+                    self.inference = registry.load(inference_path, loader=_InferenceGraph)
+                    loaded_path = inference_path
+                else:
+                    self.model = registry.load(model_h5_path, loader=_load_keras_model)
+                    loaded_path = model_h5_path
                 
                 # Charger les autres composants
-                components = joblib.load(components_path)
+                components = registry.load(components_path)
                 self.scaler = components["scaler"]
                 self.threshold = components["threshold"]
+                self.error_sketch = components.get("error_sketch")
+                self._set_drift_reference(components.get("drift_reference"))
                 self.features = components["features"]
                 self.sequence_length = components["sequence_length"]
                 
                 self.is_trained = True
-                print(f"Modèle {self.name} chargé depuis {model_h5_path}")
+                if self.model is not previous_model or self.inference is not previous_inference:
+                    print(f"Modèle {self.name} chargé depuis {loaded_path}")
             except Exception as e:
                 print(f"Erreur lors du chargement du modèle {self.name}: {str(e)}")
     
-    def predict(self, data):
+    def _build_anomaly_status(self, data, anomalies, mse):
+        """
+        Construit la liste détaillée des statuts par séquence.
+        
+        Args:
+            data: DataFrame pandas d'origine
+            anomalies: Masque booléen des séquences anormales
+            mse: Erreurs de reconstruction par séquence
+            
+        Returns:
+            list: Un dict par séquence
+        """
+        timestamps = data['timestamp'].to_numpy() if 'timestamp' in data.columns else None
+        return _sequence_status_view(anomalies, mse, self.threshold, self.sequence_length, timestamps)
+    
+    def predict(self, data, compact=False, chunk_size=None):
         """
         Détecte les anomalies dans les données.
         
         Args:
             data: DataFrame pandas avec les métriques du système
+            compact: Si True, retourne un CompactResult avec des tableaux NumPy par
+                séquence ('anomalies', 'reconstruction_errors', 'start_idx', 'end_idx',
+                'start_times', 'end_times') ; 'anomaly_status' devient une vue construite à la demande
+            chunk_size: Nombre de séquences reconstruites par bloc (par défaut PREDICT_CHUNK_SIZE)
             
         Returns:
             dict: Résultats avec les points de données et leur statut (anomalie ou normal)
@@ -895,52 +2810,329 @@ class DeepLearningAnomalyModel(BaseAIOpsModel):
         if len(data) < self.sequence_length:
             raise ValueError(f"Le DataFrame doit contenir au moins {self.sequence_length} lignes")
         
-        X_sequences = self.preprocess_data(data)
-        
-        # Prédire les reconstructions
-        reconstructions = self.model.predict(X_sequences)
+        X_scaled = self._scaled_matrix(data)
+        self._track_drift(X_scaled)
+        X_sequences = self._create_sequences(X_scaled)
         
-        # Calculer l'erreur MSE pour chaque séquence
-        mse = np.mean(np.square(X_sequences - reconstructions), axis=(1, 2))
+        # Calculer l'erreur MSE de reconstruction de chaque séquence, par blocs bornés
+        with self._stage('estimator', len(X_sequences)):
+            mse = self._reconstruction_errors(X_sequences, chunk_size)
         
         # Déterminer les anomalies
         anomalies = mse > self.threshold
         
-        # Convertir les résultats en données lisibles
-        anomaly_results = []
-        
-        for i, (is_anomaly, error) in enumerate(zip(anomalies, mse)):
-            result = {
-                "sequence_idx": i,
-                "start_idx": i,
-                "end_idx": i + self.sequence_length - 1,
-                "status": "anomaly" if is_anomaly else "normal",
-                "reconstruction_error": float(error),
-                "threshold": float(self.threshold)
-            }
-            
-            # Ajouter l'horodatage si disponible
-            if 'timestamp' in data.columns:
-                result["start_time"] = data['timestamp'].iloc[i]
-                result["end_time"] = data['timestamp'].iloc[i + self.sequence_length - 1]
-            
-            anomaly_results.append(result)
-        
         # Résultat global
-        result = {
+        summary = {
             "anomalies_detected": int(np.sum(anomalies)),
             "total_sequences": len(anomalies),
             "anomaly_percentage": float(np.mean(anomalies) * 100),
             "avg_reconstruction_error": float(np.mean(mse)),
             "max_reconstruction_error": float(np.max(mse)),
-            "threshold": float(self.threshold),
-            "anomaly_status": anomaly_results
+            "threshold": float(self.threshold)
         }
         
+        if compact:
+            timestamps = data['timestamp'].to_numpy() if 'timestamp' in data.columns else None
+            start_idx = np.arange(len(anomalies))
+            end_idx = start_idx + self.sequence_length - 1
+            
+            result = CompactResult(dict(
+                summary,
+                anomalies=anomalies,
+                reconstruction_errors=mse,
+                start_idx=start_idx,
+                end_idx=end_idx
+            ), {"anomaly_status": (_sequence_status_view, (
+                anomalies, mse, float(self.threshold), self.sequence_length, timestamps
+            ))})
+            if timestamps is not None:
+                result["start_times"] = timestamps[start_idx]
+                result["end_times"] = timestamps[end_idx]
+        else:
+            result = dict(summary, anomaly_status=self._build_anomaly_status(data, anomalies, mse))
+        
         # Enregistrer les prédictions
-        self.log_prediction(data.to_dict(orient='records'), result)
+        self.log_prediction(data, result)
+        
+        return result
+
+
+def _fit_arima_series(series_id, values, order, horizon, start_params=None):
+    """
+    Ajuste un ARIMA sur une série, avec démarrage à chaud si des paramètres sont fournis.
+    
+    Exécutée dans un processus du pool ; les erreurs sont retournées plutôt que levées
+    pour qu'une série défaillante n'interrompe pas le lot.
+    
+    Returns:
+        tuple: (series_id, état ajusté ou None, message d'erreur ou None)
+    """
+    import warnings
+    from statsmodels.tsa.arima.model import ARIMA
+    
+    attempts = [start_params, None] if start_params is not None else [None]
+    error = None
+    
+    for params in attempts:
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                fitted = ARIMA(values, order=order).fit(start_params=params)
+            
+            return series_id, {
+                "params": np.asarray(fitted.params),
+                "order": tuple(order),
+                "nobs": int(fitted.nobs),
+                "aic": float(fitted.aic),
+                "warm_start": params is not None,
+                "forecast": np.asarray(fitted.forecast(horizon))
+            }, None
+        except Exception as e:
+            # Un démarrage à chaud qui échoue est retenté à froid
+            error = str(e)
+    
+    return series_id, None, error
+
+
+def _forecast_arima_series(series_id, values, order, horizon, params):
+    """
+    Prévoit une série à partir de paramètres ARIMA déjà ajustés, sans réestimation.
+    
+    Returns:
+        tuple: (series_id, prévision ou None, message d'erreur ou None)
+    """
+    import warnings
+    from statsmodels.tsa.arima.model import ARIMA
+    
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            filtered = ARIMA(values, order=order).filter(params)
+        return series_id, np.asarray(filtered.forecast(horizon)), None
+    except Exception as e:
+        return series_id, None, str(e)
+
+
+class FleetForecastModel(BaseAIOpsModel):
+    """Prévisions statistiques ARIMA pour une flotte de séries univariées (une par pod)."""
+    
+    def __init__(self, order=(1, 1, 1), horizon=12, series_col='series_id', value_col='value',
+                 max_workers=None, version='1.0.0', model_dir=None):
+        """
+        Initialise le modèle de prévision de flotte.
+        
+        Args:
+            order: Ordre (p, d, q) des modèles ARIMA
+            horizon: Horizon de prévision (en unités de temps)
+            series_col: Colonne identifiant la série (pod, service...)
+            value_col: Colonne contenant la valeur à prévoir
+            max_workers: Nombre de processus du pool (par défaut, le nombre de CPU)
+            version: Version du modèle
+            model_dir: Répertoire des artefacts (par défaut MODEL_PATH)
+        """
+        super().__init__(name="fleet_forecast", version=version, model_dir=model_dir)
+        self.order = tuple(order)
+        self.horizon = horizon
+        self.series_col = series_col
+        self.value_col = value_col
+        self.max_workers = max_workers
+        self.failures = {}  # Séries dont le dernier ajustement a échoué
+        
+        if not self.is_trained:
+            # Paramètres ajustés, indexés par série
+            self.model = {}
+    
+    def preprocess_data(self, data):
+        """
+        Regroupe les données par série.
+        
+        Args:
+            data: DataFrame au format long (série, horodatage, valeur) ou dict {série: valeurs}
+            
+        Returns:
+            dict: Valeurs de chaque série, triées par horodatage
+        """
+        if isinstance(data, dict):
+            return {series_id: np.asarray(values, dtype=np.float64) for series_id, values in data.items()}
+        
+        for column in (self.series_col, self.value_col):
+            if column not in data.columns:
+                raise ValueError(f"La colonne '{column}' est manquante dans les données")
+        
+        if 'timestamp' in data.columns:
+            data = data.sort_values([self.series_col, 'timestamp'], kind='stable')
+        
+        series = {}
+        for series_id, group in data.groupby(self.series_col, sort=False):
+            values = group[self.value_col].to_numpy(dtype=np.float64)
+            series[series_id] = values[~np.isnan(values)]
+        return series
+    
+    def _run_pool(self, function, jobs):
+        """
+        Exécute une fonction sur chaque série dans un pool de processus.
+        
+        Args:
+            function: Fonction module-level (_fit_arima_series ou _forecast_arima_series)
+            jobs: Liste de tuples d'arguments, un par série
+            
+        Returns:
+            list: Résultats dans l'ordre des séries
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        if not jobs:
+            return []
+        
+        max_workers = self.max_workers or os.cpu_count() or 1
+        if max_workers == 1 or len(jobs) == 1:
+            return [function(*job) for job in jobs]
+        
+        # Regrouper les séries par lots pour amortir le coût des échanges entre processus
+        chunksize = max(1, len(jobs) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(function, *zip(*jobs), chunksize=chunksize))
+    
+    def train(self, data):
+        """
+        Ajuste un ARIMA par série, en parallèle.
+        
+        Les séries déjà connues repartent de leurs paramètres précédents. En cas
+        d'échec, les paramètres précédents sont conservés et la série est notée
+        dans self.failures.
+        
+        Args:
+            data: DataFrame au format long ou dict {série: valeurs}
+            
+        Returns:
+            self: Le modèle entraîné
+        """
+        series = self.preprocess_data(data)
+        min_length = sum(self.order) + 2
+        
+        jobs = []
+        self.failures = {}
+        for series_id, values in series.items():
+            if len(values) < min_length:
+                self.failures[series_id] = f"Série trop courte ({len(values)} points)"
+                continue
+            previous = self.model.get(series_id)
+            start_params = previous["params"] if previous and previous["order"] == self.order else None
+            jobs.append((series_id, values, self.order, self.horizon, start_params))
+        
+        # Le dict chargé est partagé par le registre : les séries sont ajustées dans une copie
+        model = dict(self.model)
+        n_fitted = 0
+        for series_id, state, error in self._run_pool(_fit_arima_series, jobs):
+            if state is None:
+                self.failures[series_id] = error
+            else:
+                model[series_id] = state
+                n_fitted += 1
+        self.model = model
+        
+        print(f"Séries ajustées: {n_fitted}/{len(series)}")
+        if self.failures:
+            print(f"Séries en échec: {len(self.failures)}")
+        
+        self.is_trained = True
+        self.save_model()
+        
+        return self
+    
+    def predict(self, data, horizon=None, compact=False):
+        """
+        Prévoit chaque série à partir de ses paramètres en cache, sans réajustement.
+        
+        Les séries sans paramètres exploitables reçoivent une prévision naïve
+        (dernière valeur observée répétée) et sont listées dans 'fallback'.
+        
+        Args:
+            data: DataFrame au format long ou dict {série: valeurs}
+            horizon: Horizon de prévision (par défaut, celui du modèle)
+            compact: Si True, retourne un CompactResult avec 'series_ids' et la
+                matrice 'forecasts' (n_series, horizon)
+            
+        Returns:
+            dict: Prévisions par série
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle n'est pas entraîné. Appelez d'abord train().")
+        
+        horizon = horizon or self.horizon
+        series = self.preprocess_data(data)
+        
+        jobs = [(series_id, values, self.model[series_id]["order"], horizon, self.model[series_id]["params"])
+                for series_id, values in series.items()
+                if series_id in self.model and len(values) > 0]
+        
+        forecasts = {}
+        errors = {}
+        with self._stage('estimator', len(jobs)):
+            outcomes = self._run_pool(_forecast_arima_series, jobs)
+        for series_id, forecast, error in outcomes:
+            if forecast is None:
+                errors[series_id] = error
+            else:
+                forecasts[series_id] = forecast
+        
+        fallback = []
+        for series_id, values in series.items():
+            if series_id not in forecasts:
+                last_value = values[-1] if len(values) > 0 else np.nan
+                forecasts[series_id] = np.full(horizon, last_value)
+                fallback.append(series_id)
+        
+        series_ids = list(series)
+        result = {
+            "n_series": len(series_ids),
+            "horizon": horizon,
+            "fallback": fallback,
+            "errors": errors
+        }
+        
+        if compact:
+            result = CompactResult(result)
+            result["series_ids"] = np.array(series_ids)
+            result["forecasts"] = np.vstack([forecasts[series_id] for series_id in series_ids]) \
+                if series_ids else np.empty((0, horizon))
+        else:
+            result["forecasts"] = {series_id: forecasts[series_id].tolist() for series_id in series_ids}
+        
+        self.log_prediction({"n_series": len(series_ids)}, result)
         
         return result
+    
+    def evaluate(self, data, labels=None):
+        """
+        Évalue les prévisions sur les `horizon` derniers points de chaque série.
+        
+        Args:
+            data: DataFrame au format long ou dict {série: valeurs}
+            labels: Non utilisé, inclus pour compatibilité avec l'interface
+            
+        Returns:
+            dict: Métriques de performance agrégées sur la flotte
+        """
+        if not self.is_trained:
+            raise ValueError("Le modèle n'est pas entraîné. Appelez d'abord train().")
+        
+        series = {series_id: values for series_id, values in self.preprocess_data(data).items()
+                  if len(values) > self.horizon}
+        history = {series_id: values[:-self.horizon] for series_id, values in series.items()}
+        
+        result = self.predict(history, compact=True)
+        actual = np.vstack([series[series_id][-self.horizon:] for series_id in result["series_ids"]]) \
+            if len(result["series_ids"]) else np.empty((0, self.horizon))
+        errors = result["forecasts"] - actual
+        
+        return {
+            "n_series": len(series),
+            "mean_absolute_error": float(np.mean(np.abs(errors))) if errors.size else None,
+            "root_mean_squared_error": float(np.sqrt(np.mean(np.square(errors)))) if errors.size else None,
+            "fallback_series": len(result["fallback"]),
+            "failed_fits": len(self.failures)
+        }
 
 
 # D'autres classes AIOps peuvent être ajoutées ici
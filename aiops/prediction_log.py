@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Journalisation bufferisée et colonnaire des prédictions AIOps.
+
+Les entrées sont placées dans une file bornée par predict(), puis regroupées
+par un thread d'arrière-plan et écrites sous forme de fragments compressés
+(.npz, ou Parquet si pyarrow est disponible) avec échantillonnage et rotation.
+Le DataFrame d'entrée n'est pas recopié par predict() : la file en garde une
+copie superficielle (avec le copy-on-write de pandas, les données ne sont
+recopiées que si l'appelant modifie ensuite son DataFrame), et le thread
+d'écriture en échantillonne et copie les lignes.
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import random
+import threading
+import importlib.util
+import numpy as np
+import pandas as pd
+
+# Marqueur d'arrêt du thread d'écriture
+_STOP = object()
+
+# Writers partagés par nom de modèle
+_LOGGERS = {}
+_LOGGERS_LOCK = threading.Lock()
+
+
+class PredictionLogWriter:
+    """Writer asynchrone qui écrit les prédictions par fragments colonnaires."""
+
+    def __init__(self, directory, name, fmt='npz', sample_rate=1.0, max_rows_per_entry=None,
+                 flush_rows=50000, flush_interval=10.0, max_queue=1024, max_files=200, seed=None):
+        """
+        Initialise le writer et démarre son thread d'écriture.
+
+        Args:
+            directory: Répertoire de destination des fragments
+            name: Nom du modèle (préfixe des fichiers)
+            fmt: Format des fragments ('npz' ou 'parquet')
+            sample_rate: Proportion des appels à predict() journalisés
+            max_rows_per_entry: Nombre maximal de lignes conservées par appel (None pour tout garder)
+            flush_rows: Nombre de lignes accumulées déclenchant l'écriture d'un fragment
+            flush_interval: Délai maximal (secondes) avant l'écriture d'un fragment
+            max_queue: Taille maximale de la file (les entrées excédentaires sont abandonnées)
+            max_files: Nombre de fragments conservés avant rotation
+            seed: Graine de l'échantillonnage (optionnel)
+        """
+        if fmt == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+            print("pyarrow n'est pas installé, les prédictions seront journalisées au format npz")
+            fmt = 'npz'
+        if fmt not in ('npz', 'parquet'):
+            raise ValueError(f"Format de journalisation inconnu: {fmt}")
+
+        self.directory = directory
+        self.name = name
+        self.fmt = fmt
+        self.sample_rate = sample_rate
+        self.max_rows_per_entry = max_rows_per_entry
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_files = max_files
+
+        # Compteurs exposés pour la supervision
+        self.submitted = 0
+        self.dropped = 0
+        self.written_chunks = 0
+        self.errors = 0
+
+        self._random = random.Random(seed)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._seq = 0
+        self._closed = False
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"prediction-log-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def _sample_rows(self, n_rows):
+        """Retourne les indices de lignes conservées, ou None pour toutes les lignes."""
+        if self.max_rows_per_entry is None or n_rows <= self.max_rows_per_entry:
+            return None
+        return np.sort(np.array(self._random.sample(range(n_rows), self.max_rows_per_entry)))
+
+    def submit(self, input_data, prediction, feedback=None, model_version=None):
+        """
+        Place une prédiction dans la file d'écriture sans jamais bloquer.
+
+        Args:
+            input_data: Données d'entrée (DataFrame, dict ou liste de dicts)
+            prediction: Résultat retourné par predict()
+            feedback: Retour éventuel sur la prédiction
+            model_version: Version du modèle ayant produit la prédiction
+
+        Returns:
+            bool: True si l'entrée a été acceptée, False si elle est échantillonnée ou abandonnée
+        """
+        if self._closed:
+            return False
+        if self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+            return False
+
+        if isinstance(input_data, pd.DataFrame):
+            # Copie superficielle : l'échantillonnage et la copie des lignes ont lieu
+            # dans le thread d'écriture (voir _take_inputs)
+            inputs = input_data.copy(deep=False)
+        elif isinstance(input_data, dict):
+            inputs = pd.DataFrame([input_data])
+        elif isinstance(input_data, list):
+            inputs = pd.DataFrame(input_data)
+        else:
+            inputs = pd.DataFrame({"data": [str(input_data)]})
+
+        entry = {
+            "timestamp": time.time(),
+            "model_version": model_version,
+            "inputs": inputs,
+            # Les vues détaillées non construites d'un CompactResult ne sont pas journalisées
+            "prediction": (prediction.computed() if hasattr(prediction, 'computed') else dict(prediction))
+            if isinstance(prediction, dict) else prediction,
+            "feedback": feedback
+        }
+
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+        self.submitted += 1
+        return True
+
+    def _take_inputs(self, entry):
+        """
+        Échantillonne les lignes d'entrée d'une entrée et n'en retient qu'une copie (thread d'écriture).
+
+        Args:
+            entry: Entrée de journal retirée de la file
+
+        Returns:
+            dict: L'entrée, avec ses lignes conservées et leurs indices
+        """
+        inputs = entry["inputs"]
+        n_rows = len(inputs)
+        rows = self._sample_rows(n_rows)
+        if rows is not None:
+            inputs = inputs.iloc[rows].copy()
+        inputs.insert(0, "_row", np.arange(n_rows) if rows is None else rows)
+        entry.update(n_rows=n_rows, rows=rows, inputs=inputs)
+        return entry
+
+    def _prediction_tables(self, entry):
+        """
+        Sépare une prédiction en résumé scalaire et en tables par ligne.
+
+        Args:
+            entry: Entrée de journal placée dans la file
+
+        Returns:
+            tuple: (summary, tables) - Champs scalaires et DataFrames des champs séquentiels
+        """
+        prediction = entry["prediction"]
+        if isinstance(prediction, (list, np.ndarray)):
+            prediction = {"prediction": prediction}
+        elif not isinstance(prediction, dict):
+            return {"value": prediction}, {}
+
+        summary, tables = {}, {}
+        for key, value in prediction.items():
+            if not isinstance(value, (list, np.ndarray)) or len(value) == 0:
+                summary[key] = value
+                continue
+
+            if isinstance(value[0], dict):
+                table = pd.DataFrame(value)
+            else:
+                array = np.asarray(value)
+                if array.ndim == 1:
+                    table = pd.DataFrame({key: array})
+                elif array.ndim == 2:
+                    # Sorties multiples (ex. prévision multi-horizon) : une colonne par sortie
+                    table = pd.DataFrame(array, columns=[f"{key}_{i}" for i in range(array.shape[1])])
+                else:
+                    summary[key] = value
+                    continue
+
+            # Les champs alignés sur les entrées suivent le même échantillonnage
+            if len(table) == entry["n_rows"] and entry["rows"] is not None:
+                rows = entry["rows"]
+            else:
+                rows = self._sample_rows(len(table))
+
+            if rows is None:
+                table.insert(0, "_row", np.arange(len(table)))
+            else:
+                table = table.iloc[rows].reset_index(drop=True)
+                table.insert(0, "_row", rows)
+            tables[key] = table
+
+        return summary, tables
+
+    def _build_chunk(self, entries):
+        """Construit les tables colonnaires d'un fragment à partir des entrées."""
+        records = []
+        tables = {"inputs": []}
+
+        for entry_id, entry in enumerate(entries):
+            summary, prediction_tables = self._prediction_tables(entry)
+            records.append({
+                "timestamp": pd.Timestamp(entry["timestamp"], unit='s'),
+                "model_name": self.name,
+                "model_version": entry["model_version"] or "",
+                "n_rows": entry["n_rows"],
+                "prediction": json.dumps(summary, default=str),
+                "feedback": json.dumps(entry["feedback"], default=str)
+            })
+
+            inputs = entry["inputs"]
+            inputs.insert(0, "_entry", entry_id)
+            tables["inputs"].append(inputs)
+
+            for key, table in prediction_tables.items():
+                table.insert(0, "_entry", entry_id)
+                tables.setdefault(f"prediction.{key}", []).append(table)
+
+        chunk = {"entries": pd.DataFrame(records)}
+        for table_name, frames in tables.items():
+            chunk[table_name] = pd.concat(frames, ignore_index=True)
+        return chunk
+
+    def _write_chunk(self, entries):
+        """Écrit un fragment de manière atomique puis applique la rotation."""
+        chunk = self._build_chunk(entries)
+        # Le pid distingue les fragments des workers qui écrivent dans le même répertoire
+        base = f"{self.name}_{time.strftime('%Y%m%dT%H%M%S')}_{os.getpid()}_{self._seq:06d}"
+        self._seq += 1
+
+        if self.fmt == 'parquet':
+            for table_name, frame in chunk.items():
+                path = os.path.join(self.directory, f"{base}.{table_name}.parquet")
+                frame.columns = [str(c) for c in frame.columns]
+                frame.to_parquet(f"{path}.tmp", compression='zstd', index=False)
+                os.replace(f"{path}.tmp", path)
+        else:
+            arrays = {}
+            for table_name, frame in chunk.items():
+                for column in frame.columns:
+                    values = frame[column].to_numpy()
+                    if values.dtype == object:
+                        values = values.astype(str)
+                    arrays[f"{table_name}/{column}"] = values
+            path = os.path.join(self.directory, f"{base}.npz")
+            with open(f"{path}.tmp", 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(f"{path}.tmp", path)
+
+        self.written_chunks += 1
+        self._rotate()
+
+    def _rotate(self):
+        """
+        Supprime les fragments les plus anciens au-delà de max_files.
+
+        Les workers partageant le répertoire appliquent la même rotation : un
+        fragment déjà supprimé par un autre processus est ignoré.
+        """
+        if not self.max_files:
+            return
+        files = [f for f in os.listdir(self.directory)
+                 if f.startswith(f"{self.name}_") and not f.endswith('.tmp')]
+        bases = sorted({f.split('.')[0] for f in files})
+        expired = set(bases[:-self.max_files])
+        for f in files:
+            if f.split('.')[0] in expired:
+                try:
+                    os.remove(os.path.join(self.directory, f))
+                except FileNotFoundError:
+                    pass
+
+    def _flush_pending(self, pending):
+        """Écrit les entrées en attente en isolant les erreurs d'écriture."""
+        if not pending:
+            return
+        try:
+            self._write_chunk(pending)
+        except Exception as e:
+            self.errors += 1
+            print(f"Erreur lors de l'écriture du journal de prédictions {self.name}: {str(e)}")
+
+    def _run(self):
+        """Boucle du thread d'écriture : accumule les entrées et écrit les fragments."""
+        pending = []
+        pending_rows = 0
+        last_flush = time.monotonic()
+
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush_pending(pending)
+                return
+
+            if isinstance(item, threading.Event):
+                self._flush_pending(pending)
+                pending, pending_rows = [], 0
+                last_flush = time.monotonic()
+                item.set()
+                continue
+
+            if item is not None:
+                try:
+                    pending.append(self._take_inputs(item))
+                    pending_rows += len(item["inputs"])
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Erreur lors de la journalisation d'une prédiction {self.name}: {str(e)}")
+
+            if pending_rows >= self.flush_rows or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_pending(pending)
+                pending, pending_rows = [], 0
+                last_flush = time.monotonic()
+
+    def flush(self, timeout=None):
+        """
+        Force l'écriture des entrées en attente.
+
+        Args:
+            timeout: Délai d'attente maximal en secondes (None pour attendre indéfiniment)
+
+        Returns:
+            bool: True si l'écriture a été effectuée dans le délai
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        """Écrit les entrées restantes et arrête le thread d'écriture."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+def get_prediction_logger(name, directory, **kwargs):
+    """
+    Retourne le writer partagé associé à un modèle, en le créant si nécessaire.
+
+    Args:
+        name: Nom du modèle
+        directory: Répertoire de destination des fragments
+        **kwargs: Options transmises à PredictionLogWriter lors de la création
+
+    Returns:
+        PredictionLogWriter: Writer du modèle
+    """
+    with _LOGGERS_LOCK:
+        writer = _LOGGERS.get(name)
+        if writer is None or writer._closed:
+            writer = PredictionLogWriter(directory, name, **kwargs)
+            _LOGGERS[name] = writer
+        return writer
+
+
+@atexit.register
+def close_prediction_loggers():
+    """Vide et ferme tous les writers partagés."""
+    with _LOGGERS_LOCK:
+        writers = list(_LOGGERS.values())
+        _LOGGERS.clear()
+    for writer in writers:
+        writer.close()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Registre des artefacts de modèles AIOps, partagé entre les workers d'un service.
+
+Chaque processus conserve les objets chargés dans un cache LRU borné : les
+instances d'un même modèle partagent un seul objet chargé, et un artefact
+est rechargé dès que le fichier a été remplacé sur le disque.
+
+Le partage entre workers passe par le fork : les arbres scikit-learn
+(RandomForest, IsolationForest) et les KDTree recopient leurs tableaux en
+mémoire privée à la désérialisation, si bien que le mapping mémoire
+(mmap_mode='r') ne partage que les tableaux NumPy stockés tels quels. Les
+artefacts chargés dans le processus maître avant le fork sont en revanche
+partagés copy-on-write par tous les workers, car la prédiction ne modifie
+jamais ces tableaux ; prepare_fork() fige les objets du ramasse-miettes pour
+qu'il n'en recopie pas les pages (voir server.py --processes). Une version
+publiée après le fork est rechargée par chaque worker dans sa mémoire privée.
+
+Les artefacts publiés par le store (voir artifacts.py) sont identifiés par
+leur entrée du manifeste de leur répertoire : un seul examen du manifeste
+couvre tous les artefacts du répertoire.
+"""
+
+import os
+import gc
+import time
+import threading
+from collections import OrderedDict
+
+# Configuration du registre partagé
+MODEL_REGISTRY_MAX_ENTRIES = int(os.environ.get('MODEL_REGISTRY_MAX_ENTRIES', '32'))
+MODEL_REGISTRY_MAX_MB = float(os.environ.get('MODEL_REGISTRY_MAX_MB', '0'))
+MODEL_REGISTRY_MMAP = os.environ.get('MODEL_REGISTRY_MMAP', 'r')
+MODEL_REGISTRY_CHECK_INTERVAL = float(os.environ.get('MODEL_REGISTRY_CHECK_INTERVAL', '2.0'))
+
+_REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+class ModelRegistry:
+    """Cache LRU des artefacts chargés dans le processus, avec rechargement à chaud."""
+
+    def __init__(self, max_entries=32, max_bytes=None, mmap_mode='r', check_interval=2.0):
+        """
+        Initialise le registre.
+
+        Args:
+            max_entries: Nombre maximal d'artefacts gardés en cache
+            max_bytes: Taille cumulée maximale (octets sur disque) des artefacts en cache
+            mmap_mode: Mode de mapping mémoire transmis à joblib.load (None pour désactiver)
+            check_interval: Délai minimal (secondes) entre deux vérifications d'un fichier
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        self.check_interval = check_interval
+
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def _signature(self, path):
+        """Identifie une version d'un artefact : entrée du manifeste, sinon état du fichier."""
+        from .artifacts import get_artifact_store
+
+        entry = get_artifact_store().entry(path, max_age=self.check_interval)
+        if entry is not None:
+            return (entry["sha256"], entry["version"], entry["size"])
+        st = os.stat(path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def load(self, path, loader=None):
+        """
+        Retourne l'objet stocké dans un artefact, depuis le cache si possible.
+
+        Args:
+            path: Chemin de l'artefact
+            loader: Fonction de chargement (par défaut joblib.load en mémoire mappée)
+
+        Returns:
+            object: Objet chargé, partagé entre les appelants du processus
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                fresh = now - entry["checked_at"] < self.check_interval
+                if not fresh:
+                    entry["checked_at"] = now
+                    fresh = self._signature(path) == entry["signature"]
+                if fresh:
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return entry["obj"]
+                self.reloads += 1
+            else:
+                self.misses += 1
+
+        # Chargement hors verrou pour ne pas bloquer les autres artefacts
+        signature = self._signature(path)
+        if loader is not None:
+            obj = loader(path)
+        else:
+            import joblib
+            obj = joblib.load(path, mmap_mode=self.mmap_mode)
+
+        with self._lock:
+            self._entries[path] = {
+                "obj": obj,
+                "signature": signature,
+                "size": signature[2],
+                "checked_at": time.monotonic()
+            }
+            self._entries.move_to_end(path)
+            self._evict()
+
+        return obj
+
+    def _evict(self):
+        """Retire les artefacts les moins récemment utilisés au-delà des limites."""
+        while len(self._entries) > 1:
+            total = sum(entry["size"] for entry in self._entries.values())
+            over_bytes = self.max_bytes and total > self.max_bytes
+            if len(self._entries) <= self.max_entries and not over_bytes:
+                break
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, path=None):
+        """
+        Retire un artefact (ou tous) du cache.
+
+        Args:
+            path: Chemin de l'artefact, ou None pour vider le cache
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def invalidate_directory(self, directory):
+        """
+        Retire du cache tous les artefacts d'un répertoire.
+
+        Args:
+            directory: Répertoire des artefacts (ex. celui d'une entité de la flotte)
+        """
+        prefix = os.path.join(os.path.abspath(directory), '')
+        with self._lock:
+            for path in [p for p in self._entries if os.path.abspath(p).startswith(prefix)]:
+                del self._entries[path]
+
+    def stats(self):
+        """Retourne les statistiques du cache."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(entry["size"] for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "evictions": self.evictions
+            }
+
+
+def prepare_fork():
+    """
+    Prépare le partage copy-on-write des artefacts chargés avec des processus enfants.
+
+    À appeler dans le processus maître, après le chargement des modèles et
+    juste avant les fork : les objets existants sont collectés puis exclus
+    des passes du ramasse-miettes, qui sinon écrirait dans leurs en-têtes et
+    recopierait leurs pages dans chaque worker.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def get_model_registry():
+    """Retourne le registre partagé du processus, configuré par l'environnement."""
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = ModelRegistry(
+                max_entries=MODEL_REGISTRY_MAX_ENTRIES,
+                max_bytes=int(MODEL_REGISTRY_MAX_MB * 1024 * 1024) or None,
+                mmap_mode=None if MODEL_REGISTRY_MMAP in ('', 'none') else MODEL_REGISTRY_MMAP,
+                check_interval=MODEL_REGISTRY_CHECK_INTERVAL
+            )
+        return _REGISTRY
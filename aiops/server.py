@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Service d'inférence asyncio pour les modèles AIOps.
+
+Les requêtes concurrentes adressées à un même modèle sont regroupées en
+micro-batchs : le premier arrivé ouvre une fenêtre bornée par un budget de
+latence (5 ms par défaut) ou un nombre maximal de lignes, puis un seul
+predict() vectorisé est exécuté dans un pool de threads, hors de la boucle
+d'événements, et son résultat est redécoupé par requête.
+
+Seuls les modèles dont les lignes sont indépendantes (détection d'anomalies
+par point, clustering) sont fusionnés ; pour les modèles de séries
+(décalages, séquences), concaténer des requêtes mélangerait les séries :
+leurs requêtes d'un même micro-batch sont exécutées une à une.
+
+Une réponse contient les champs calculés du résultat compact (tableaux par
+ligne et synthèse), que la requête ait été fusionnée ou non ; les vues par
+ligne (anomaly_status, clusters) ne sont pas sérialisées.
+
+Avec --processes N, les modèles sont chargés une fois dans un processus
+maître puis N workers sont créés par fork sur le même socket d'écoute : les
+artefacts scikit-learn sont partagés copy-on-write entre les workers au
+lieu d'être chargés par chacun (voir registry.py).
+
+Usage:
+    python -m aiops.server [--models anomaly_detection workload_clustering] [--port 8080]
+        [--processes 16]
+
+Endpoints:
+    POST /predict/<modèle>  Corps JSON : liste d'enregistrements, {"records": [...]} ou {colonne: [...]}
+    GET  /health            État du service et modèles servis
+    GET  /metrics           Métriques Prometheus (ou statistiques JSON sans prometheus_client)
+"""
+
+import os
+import json
+import time
+import signal
+import socket
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Configuration du service
+INFERENCE_PORT = int(os.environ.get('INFERENCE_PORT', '8080'))
+INFERENCE_MAX_DELAY_MS = float(os.environ.get('INFERENCE_MAX_DELAY_MS', '5'))
+INFERENCE_MAX_BATCH_ROWS = int(os.environ.get('INFERENCE_MAX_BATCH_ROWS', '4096'))
+INFERENCE_MAX_BODY_BYTES = int(os.environ.get('INFERENCE_MAX_BODY_BYTES', str(16 * 1024 * 1024)))
+INFERENCE_PROCESSES = int(os.environ.get('INFERENCE_PROCESSES', '1'))
+
+# Classes servies par défaut, par nom de modèle
+MODEL_CLASSES = {
+    "anomaly_detection": "AnomalyDetectionModel",
+    "workload_clustering": "ClusteringModel",
+    "resource_prediction": "ResourcePredictionModel",
+    "deep_anomaly_detection": "DeepLearningAnomalyModel"
+}
+
+# Modèles chargés par chaque worker après le fork : le runtime TensorFlow n'y survit pas
+FORK_UNSAFE_MODELS = {"deep_anomaly_detection"}
+
+_METRICS = None
+
+
+def _anomaly_summary(part):
+    """Part de résultat de détection d'anomalies précédée de ses champs de synthèse, comme predict()."""
+    return {
+        "anomalies_detected": int(part["anomalies"].sum()),
+        "total_points": len(part["anomalies"]),
+        **part
+    }
+
+
+def _clustering_summary(part):
+    """Part de résultat de clustering précédée de ses champs de synthèse, comme predict()."""
+    labels, counts = np.unique(part["labels"], return_counts=True)
+    return {
+        "n_clusters": int(np.sum(labels != -1)),
+        "n_noise": int(counts[labels == -1].sum()),
+        "cluster_sizes": {str(label): int(count) for label, count in zip(labels, counts)},
+        **part
+    }
+
+
+# Modèles dont les lignes sont indépendantes : fusion possible, synthèse recalculée par requête
+ROW_WISE_SUMMARIES = {
+    "AnomalyDetectionModel": _anomaly_summary,
+    "ClusteringModel": _clustering_summary
+}
+
+
+def _server_metrics():
+    """Crée les métriques Prometheus du service, ou retourne None sans prometheus_client."""
+    global _METRICS
+    if _METRICS is None:
+        try:
+            from prometheus_client import Gauge, Histogram
+        except ImportError:
+            _METRICS = False
+            return None
+
+        _METRICS = {
+            "queue_depth": Gauge('aiops_inference_queue_depth', "Requêtes en attente de micro-batch",
+                                 ['model']),
+            "batch_rows": Histogram('aiops_inference_batch_rows', "Lignes par appel à predict()",
+                                    ['model'], buckets=(1, 4, 16, 64, 256, 1024, 4096, 16384, 65536)),
+            "batch_requests": Histogram('aiops_inference_batch_requests', "Requêtes par micro-batch",
+                                        ['model'], buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)),
+            "request_seconds": Histogram('aiops_inference_request_seconds', "Latence des requêtes",
+                                         ['model'], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                                                             0.1, 0.25, 0.5, 1.0, 2.5, 10.0))
+        }
+    return _METRICS or None
+
+
+def _json_default(value):
+    """Sérialise les types NumPy, pandas et datetime pour json.dumps."""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'M':
+            return value.astype(str).tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _response_fields(result):
+    """Champs sérialisés d'un résultat : les champs calculés d'un résultat compact, sans ses vues."""
+    computed = getattr(result, 'computed', None)
+    return computed() if computed is not None else result
+
+
+def records_to_frame(payload):
+    """
+    Convertit le corps d'une requête en DataFrame.
+
+    Args:
+        payload: Liste d'enregistrements, {"records": [...]} ou dict de colonnes
+
+    Returns:
+        DataFrame: Données de la requête
+    """
+    if isinstance(payload, dict) and "records" in payload:
+        payload = payload["records"]
+    if isinstance(payload, list):
+        return pd.DataFrame.from_records(payload)
+    if isinstance(payload, dict):
+        return pd.DataFrame(payload)
+    raise ValueError("Le corps de la requête doit être une liste d'enregistrements ou un dict de colonnes")
+
+
+class MicroBatcher:
+    """File de requêtes d'un modèle, regroupées en micro-batchs."""
+
+    def __init__(self, key, model, max_delay=0.005, max_batch_rows=4096, workers=1):
+        """
+        Initialise le batcher.
+
+        Args:
+            key: Nom du modèle dans le service
+            model: Modèle AIOps entraîné
+            max_delay: Budget de latence (secondes) d'ouverture d'un micro-batch
+            max_batch_rows: Nombre de lignes au-delà duquel le micro-batch est exécuté sans attendre
+            workers: Threads d'exécution de predict() (1 : appels sérialisés sur le modèle)
+        """
+        self.key = key
+        self.model = model
+        self.max_delay = max_delay
+        self.max_batch_rows = max_batch_rows
+        self.summary = ROW_WISE_SUMMARIES.get(type(model).__name__)
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"inference-{key}")
+        self._queue = None
+        self._task = None
+        self._metrics = _server_metrics()
+
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+        self.max_queue_depth = 0
+        self.last_batch_requests = 0
+
+    def start(self):
+        """Démarre la boucle de regroupement dans la boucle d'événements courante."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Arrête la boucle de regroupement et le pool de threads."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    def _observe_queue(self):
+        """Met à jour la profondeur de file observée."""
+        depth = self._queue.qsize()
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        if self._metrics:
+            self._metrics["queue_depth"].labels(self.key).set(depth)
+
+    async def submit(self, frame):
+        """
+        Soumet une requête et attend son résultat.
+
+        Args:
+            frame: DataFrame de la requête
+
+        Returns:
+            dict: Résultat de predict() propre à la requête
+        """
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((frame, future))
+        self._observe_queue()
+        try:
+            return await future
+        finally:
+            if self._metrics:
+                self._metrics["request_seconds"].labels(self.key).observe(time.perf_counter() - start)
+
+    async def _run(self):
+        """Boucle de regroupement : la première requête ouvre la fenêtre de latence."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.max_delay
+
+            while rows < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            self._observe_queue()
+            await self._process(batch, rows)
+
+    async def _process(self, batch, rows):
+        """Exécute un micro-batch dans le pool de threads et distribue les résultats."""
+        frames = [frame for frame, _ in batch]
+        loop = asyncio.get_running_loop()
+        function = self._predict_merged if self.summary is not None and len(frames) > 1 else self._predict_each
+        outcomes = await loop.run_in_executor(self._executor, function, frames)
+
+        self.requests += len(batch)
+        self.batches += 1
+        self.rows += rows
+        self.last_batch_requests = len(batch)
+        if self._metrics:
+            self._metrics["batch_requests"].labels(self.key).observe(len(batch))
+
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def _predict_each(self, frames):
+        """Exécute predict() requête par requête, en isolant les erreurs."""
+        outcomes = []
+        for frame in frames:
+            try:
+                outcomes.append(_response_fields(self.model.predict(frame, compact=True)))
+                if self._metrics:
+                    self._metrics["batch_rows"].labels(self.key).observe(len(frame))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+    def _mergeable(self, frame):
+        """
+        Prépare une requête pour la fusion, ou retourne None si elle doit être exécutée seule.
+
+        Une requête est fusionnable si elle contient toutes les caractéristiques
+        du modèle (les caractéristiques temporelles se déduisent de 'timestamp')
+        et si chacune a au moins une valeur. Ses valeurs manquantes sont
+        remplacées par la moyenne de la requête, comme lors d'un predict() seul :
+        le résultat ne dépend pas des autres requêtes du micro-batch.
+        """
+        derived = getattr(self.model, 'TIME_FEATURES', ())
+        columns = [c for c in self.model.features if not ('timestamp' in frame.columns and c in derived)]
+        if any(c not in frame.columns for c in columns):
+            return None
+
+        fill = {}
+        for column in columns:
+            try:
+                values = frame[column].to_numpy(dtype=self.model.dtype, na_value=np.nan)
+            except (TypeError, ValueError):
+                return None
+            missing = np.isnan(values)
+            if missing.all():
+                return None
+            if missing.any():
+                fill[column] = values[~missing].mean()
+        return frame.fillna(fill) if fill else frame
+
+    def _predict_merged(self, frames):
+        """
+        Exécute un seul predict() par groupe de requêtes compatibles puis redécoupe le résultat.
+
+        Seules les requêtes qui fournissent toutes 'timestamp', ou toutes les
+        caractéristiques temporelles, sont concaténées : sinon les lignes sans
+        horodatage recevraient des caractéristiques temporelles manquantes à la
+        place des leurs. Les tableaux alignés sur les lignes sont découpés par
+        requête et les champs de synthèse recalculés. Les requêtes non
+        fusionnables (par exemple sans une caractéristique) ou seules de leur
+        groupe sont exécutées seules, et chaque requête d'un groupe est rejouée
+        seule si son predict() fusionné échoue.
+        """
+        prepared = [self._mergeable(frame) for frame in frames]
+        groups = {}
+        for i, frame in enumerate(prepared):
+            if frame is not None:
+                groups.setdefault('timestamp' in frame.columns, []).append(i)
+
+        outcomes = [None] * len(frames)
+        alone = [i for i, frame in enumerate(prepared) if frame is None]
+        for merged in groups.values():
+            if len(merged) < 2 or not self._predict_group(merged, prepared, outcomes):
+                alone.extend(merged)
+
+        for i, outcome in zip(alone, self._predict_each([frames[i] for i in alone])):
+            outcomes[i] = outcome
+        return outcomes
+
+    def _predict_group(self, merged, prepared, outcomes):
+        """Exécute le predict() fusionné d'un groupe et remplit outcomes ; retourne False en cas d'échec."""
+        sizes = [len(prepared[i]) for i in merged]
+        try:
+            result = self.model.predict(pd.concat([prepared[i] for i in merged], ignore_index=True),
+                                        compact=True)
+        except Exception:
+            return False
+
+        if self._metrics:
+            self._metrics["batch_rows"].labels(self.key).observe(sum(sizes))
+
+        total = sum(sizes)
+        per_row = {key: value for key, value in _response_fields(result).items()
+                   if isinstance(value, np.ndarray) and len(value) == total}
+        offset = 0
+        for i, size in zip(merged, sizes):
+            part = {key: value[offset:offset + size] for key, value in per_row.items()}
+            outcomes[i] = self.summary(part)
+            offset += size
+        return True
+
+    def stats(self):
+        """Retourne les statistiques du batcher."""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_requests": self.requests / self.batches if self.batches else 0.0,
+            "last_batch_requests": self.last_batch_requests,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth
+        }
+
+
+class InferenceServer:
+    """Serveur HTTP minimal (asyncio) exposant les modèles via des micro-batchs."""
+
+    def __init__(self, models, host='0.0.0.0', port=INFERENCE_PORT, max_delay_ms=INFERENCE_MAX_DELAY_MS,
+                 max_batch_rows=INFERENCE_MAX_BATCH_ROWS, workers=1, sock=None):
+        """
+        Initialise le serveur.
+
+        Args:
+            models: Dict {nom: modèle entraîné}
+            host: Adresse d'écoute
+            port: Port d'écoute (0 pour un port libre)
+            max_delay_ms: Budget de latence d'un micro-batch en millisecondes
+            max_batch_rows: Nombre maximal de lignes par micro-batch
+            workers: Threads d'exécution par modèle
+            sock: Socket d'écoute déjà ouvert (partagé entre workers), à la place de host/port
+        """
+        self.host = host
+        self.port = port
+        self.sock = sock
+        self.batchers = {
+            key: MicroBatcher(key, model, max_delay_ms / 1000.0, max_batch_rows, workers)
+            for key, model in models.items()
+        }
+        self._server = None
+
+    async def start(self):
+        """Démarre les batchers et l'écoute HTTP."""
+        for batcher in self.batchers.values():
+            batcher.start()
+        if self.sock is not None:
+            self._server = await asyncio.start_server(self._handle, sock=self.sock)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        print(f"Service d'inférence AIOps à l'écoute sur {self.host}:{self.port} "
+              f"(modèles: {', '.join(self.batchers)})")
+
+    async def stop(self):
+        """Arrête l'écoute HTTP et les batchers."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for batcher in self.batchers.values():
+            await batcher.stop()
+
+    async def serve_forever(self):
+        """Démarre le serveur et le sert jusqu'à annulation."""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def predict(self, key, payload):
+        """
+        Prédit pour une requête, via le micro-batch du modèle.
+
+        Args:
+            key: Nom du modèle
+            payload: Corps de requête (voir records_to_frame) ou DataFrame
+
+        Returns:
+            dict: Résultat propre à la requête
+        """
+        if key not in self.batchers:
+            raise KeyError(key)
+        frame = payload if isinstance(payload, pd.DataFrame) else records_to_frame(payload)
+        return await self.batchers[key].submit(frame)
+
+    def stats(self):
+        """Retourne les statistiques de tous les batchers."""
+        return {key: batcher.stats() for key, batcher in self.batchers.items()}
+
+    def _metrics_body(self):
+        """Corps de l'endpoint /metrics."""
+        if _server_metrics():
+            from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+            return 200, generate_latest(), CONTENT_TYPE_LATEST
+        return 200, json.dumps(self.stats()).encode('utf-8'), 'application/json'
+
+    async def _route(self, method, path, body):
+        """Traite une requête HTTP et retourne (statut, corps, type de contenu)."""
+        if method == 'GET' and path == '/health':
+            return 200, {"status": "ok", "models": list(self.batchers)}, None
+        if method == 'GET' and path == '/metrics':
+            return self._metrics_body()
+        if method == 'POST' and path.startswith('/predict/'):
+            key = path[len('/predict/'):]
+            if key not in self.batchers:
+                return 404, {"error": f"Modèle inconnu: {key}"}, None
+            try:
+                payload = json.loads(body or b'null')
+                return 200, await self.predict(key, payload), None
+            except ValueError as e:
+                return 400, {"error": str(e)}, None
+            except Exception as e:
+                return 500, {"error": str(e)}, None
+        return 404, {"error": f"Ressource inconnue: {method} {path}"}, None
+
+    async def _handle(self, reader, writer):
+        """Sert les requêtes d'une connexion HTTP/1.1 (keep-alive)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', '0'))
+                if length > INFERENCE_MAX_BODY_BYTES:
+                    status, body, content_type = 413, {"error": "Corps de requête trop volumineux"}, None
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, body, content_type = await self._route(method, path.split('?', 1)[0], body)
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+
+                if content_type is None:
+                    body = json.dumps(body, default=_json_default).encode('utf-8')
+                    content_type = 'application/json'
+
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def load_models(keys):
+    """
+    Construit les modèles servis à partir de leurs artefacts.
+
+    Args:
+        keys: Noms des modèles (voir MODEL_CLASSES)
+
+    Returns:
+        dict: {nom: modèle entraîné}
+    """
+    from . import models as aiops_models
+
+    loaded = {}
+    for key in keys:
+        model = getattr(aiops_models, MODEL_CLASSES[key])()
+        if not model.is_trained:
+            print(f"Modèle {key} non entraîné, il ne sera pas servi")
+            continue
+        loaded[key] = model
+    return loaded
+
+
+def serve_prefork(keys, processes, host='0.0.0.0', port=INFERENCE_PORT, **server_kwargs):
+    """
+    Sert les modèles depuis plusieurs workers qui partagent les artefacts chargés.
+
+    Les modèles sont chargés dans le processus maître avant les fork, puis
+    chaque worker sert son propre InferenceServer sur le socket d'écoute
+    commun. Les modèles de FORK_UNSAFE_MODELS sont chargés par chaque worker.
+
+    Args:
+        keys: Noms des modèles (voir MODEL_CLASSES)
+        processes: Nombre de workers
+        host: Adresse d'écoute
+        port: Port d'écoute
+        **server_kwargs: Paramètres transmis à InferenceServer
+    """
+    from .registry import prepare_fork
+    from .prediction_log import close_prediction_loggers
+
+    shared = load_models([key for key in keys if key not in FORK_UNSAFE_MODELS])
+    sock = socket.create_server((host, port))
+    prepare_fork()
+
+    children = []
+    for _ in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                models = dict(shared)
+                models.update(load_models([key for key in keys if key in FORK_UNSAFE_MODELS]))
+                asyncio.run(InferenceServer(models, sock=sock, **server_kwargs).serve_forever())
+            except KeyboardInterrupt:
+                pass
+            except Exception as e:
+                print(f"Erreur du worker d'inférence {os.getpid()}: {e}")
+                status = 1
+            finally:
+                # os._exit n'exécute pas les fonctions atexit
+                close_prediction_loggers()
+                os._exit(status)
+        children.append(pid)
+
+    print(f"{processes} workers d'inférence démarrés (pid {', '.join(map(str, children))})")
+    remaining = set(children)
+
+    def stop_workers(signum=None, frame=None):
+        for pid in remaining:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    try:
+        while remaining:
+            remaining.discard(os.wait()[0])
+    except KeyboardInterrupt:
+        stop_workers()
+        for pid in remaining:
+            os.waitpid(pid, 0)
+    finally:
+        sock.close()
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Service d'inférence AIOps par micro-batchs")
+    parser.add_argument('--models', nargs='+', default=list(MODEL_CLASSES),
+                        choices=list(MODEL_CLASSES), help='Modèles à servir')
+    parser.add_argument('--host', default='0.0.0.0', help="Adresse d'écoute")
+    parser.add_argument('--port', type=int, default=INFERENCE_PORT, help="Port d'écoute")
+    parser.add_argument('--max-delay-ms', type=float, default=INFERENCE_MAX_DELAY_MS,
+                        help="Budget de latence d'un micro-batch (ms)")
+    parser.add_argument('--max-batch-rows', type=int, default=INFERENCE_MAX_BATCH_ROWS,
+                        help='Nombre maximal de lignes par micro-batch')
+    parser.add_argument('--workers', type=int, default=1, help="Threads d'exécution par modèle")
+    parser.add_argument('--processes', type=int, default=INFERENCE_PROCESSES,
+                        help='Processus workers partageant les modèles chargés (fork)')
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        serve_prefork(args.models, args.processes, host=args.host, port=args.port,
+                      max_delay_ms=args.max_delay_ms, max_batch_rows=args.max_batch_rows,
+                      workers=args.workers)
+        return
+
+    server = InferenceServer(load_models(args.models), host=args.host, port=args.port,
+                             max_delay_ms=args.max_delay_ms, max_batch_rows=args.max_batch_rows,
+                             workers=args.workers)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Esquisse de quantiles en flux (t-digest fusionnable).
+
+Les valeurs observées sont résumées par un nombre borné de centroïdes
+(moyenne, poids), plus fins aux extrémités de la distribution qu'en son
+centre : les quantiles élevés utilisés comme seuils d'anomalie restent
+précis sans conserver les valeurs. L'esquisse se met à jour par lots,
+se fusionne avec une autre esquisse (données de plusieurs workers ou
+fenêtres) et se sérialise avec joblib comme les autres composants.
+"""
+
+import math
+
+import numpy as np
+
+# Facteur de compression par défaut (précision contre nombre de centroïdes)
+DEFAULT_COMPRESSION = 200
+
+
+class QuantileSketch:
+    """
+    t-digest fusionnable, avec comptage, somme et somme des carrés exacts.
+
+    Exemple:
+        sketch = QuantileSketch()
+        sketch.update(errors)
+        threshold = sketch.quantile(0.99)
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, buffer_size=None):
+        """
+        Initialise une esquisse vide.
+
+        Args:
+            compression: Facteur de compression (précision contre nombre de centroïdes)
+            buffer_size: Valeurs accumulées avant compression (par défaut 5 x compression)
+        """
+        self.compression = compression
+        self.buffer_size = buffer_size or 5 * compression
+
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer = []
+        self._buffered = 0
+
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        """
+        Ajoute un lot de valeurs à l'esquisse.
+
+        Args:
+            values: Valeurs (tableau ou séquence), les NaN sont ignorés
+
+        Returns:
+            self: L'esquisse mise à jour
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.total_sq += float(np.dot(values, values))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= self.buffer_size:
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Fusionne une autre esquisse dans celle-ci.
+
+        Args:
+            other: QuantileSketch à fusionner (non modifiée)
+
+        Returns:
+            self: L'esquisse fusionnée
+        """
+        other._compress()
+        if not other.count:
+            return self
+
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        self._compress(other.means, other.weights)
+        return self
+
+    def copy(self):
+        """Retourne une copie indépendante de l'esquisse."""
+        self._compress()
+        sketch = QuantileSketch(self.compression, self.buffer_size)
+        return sketch.merge(self)
+
+    def _compress(self, means=None, weights=None):
+        """Fusionne le tampon (et des centroïdes supplémentaires) dans les centroïdes."""
+        parts_means = [self.means]
+        parts_weights = [self.weights]
+        if means is not None:
+            parts_means.append(np.asarray(means, dtype=np.float64))
+            parts_weights.append(np.asarray(weights, dtype=np.float64))
+        if self._buffer:
+            parts_means.extend(self._buffer)
+            parts_weights.extend(np.ones(len(values)) for values in self._buffer)
+            self._buffer = []
+            self._buffered = 0
+        if len(parts_means) == 1:
+            return
+
+        means = np.concatenate(parts_means)
+        weights = np.concatenate(parts_weights)
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        # Échelle k2 (log-odds) : un centroïde couvre au plus une unité de k(q),
+        # les centroïdes se resserrent en proportion de q et 1-q près des extrémités
+        total = weights.sum()
+        q_left = np.clip((np.cumsum(weights) - weights) / total, 1e-12, 1 - 1e-12)
+        normalizer = 4 * math.log(max(total / self.compression, 1.0)) + 24
+        k = self.compression / normalizer * np.log(q_left / (1 - q_left))
+        groups = np.floor(k)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        """
+        Estime un ou plusieurs quantiles.
+
+        Args:
+            q: Quantile(s) dans [0, 1]
+
+        Returns:
+            float ou numpy.ndarray: Valeur(s) estimée(s), NaN si l'esquisse est vide
+        """
+        self._compress()
+        q = np.asarray(q, dtype=np.float64)
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("Les quantiles doivent être compris entre 0 et 1")
+        if not self.count:
+            return float('nan') if q.ndim == 0 else np.full(q.shape, np.nan)
+
+        # Chaque centroïde est placé au centre de sa masse cumulée, bornée par les extrêmes
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centers, self.weights.sum()]
+        values = np.r_[self.min, self.means, self.max]
+        result = np.interp(q * self.weights.sum(), positions, values)
+        return float(result) if result.ndim == 0 else result
+
+    def cdf(self, x):
+        """
+        Estime la proportion des valeurs inférieures ou égales à x.
+
+        Args:
+            x: Valeur(s)
+
+        Returns:
+            float ou numpy.ndarray: Proportion(s) dans [0, 1]
+        """
+        self._compress()
+        x = np.asarray(x, dtype=np.float64)
+        if not self.count:
+            return float('nan') if x.ndim == 0 else np.full(x.shape, np.nan)
+
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centers, self.weights.sum()]
+        values = np.r_[self.min, self.means, self.max]
+        result = np.interp(x, values, positions) / self.weights.sum()
+        return float(result) if result.ndim == 0 else result
+
+    @property
+    def mean(self):
+        """Moyenne exacte des valeurs observées."""
+        return self.total / self.count if self.count else float('nan')
+
+    @property
+    def std(self):
+        """Écart-type exact (population) des valeurs observées."""
+        if not self.count:
+            return float('nan')
+        return math.sqrt(max(self.total_sq / self.count - self.mean ** 2, 0.0))
+
+    def __getstate__(self):
+        self._compress()
+        return self.__dict__.copy()
+
+    def __len__(self):
+        return self.count